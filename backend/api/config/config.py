@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 import yaml
 import os
+from typing import List, Optional
 
 
 @dataclass
@@ -10,6 +11,9 @@ class PostgreConfig:
     password: str
     host: str
     port: str
+    pool_min_size: int
+    pool_max_size: int
+    pool_timeout: int
 
 
 @dataclass
@@ -28,6 +32,10 @@ class ServerConfig:
     daemon_path: str
     venv_path: str
     debug: bool
+    default_page_size: int
+    max_page_size: int
+    # monitoring_events partitions older than this many months are dropped, kept forever when unset
+    events_retention_months: Optional[int] = None
 
 
 @dataclass
@@ -37,12 +45,25 @@ class RedisConfig:
     db: int
 
 
+@dataclass
+class SnapshotRetentionTier:
+    # snapshots older than after_days are thinned to one per interval_hours
+    after_days: int
+    interval_hours: int
+
+
+@dataclass
+class SnapshotRetentionConfig:
+    tiers: List[SnapshotRetentionTier]
+
+
 @dataclass
 class Config:
     postgres: PostgreConfig
     s3: S3Config
     server: ServerConfig
     redis: RedisConfig
+    snapshot_retention: Optional[SnapshotRetentionConfig] = None
 
 
 def parse_config() -> Config:
@@ -54,4 +75,7 @@ def parse_config() -> Config:
         s3=S3Config(**data["s3"]),
         server=ServerConfig(**data["server"]),
         redis=RedisConfig(**data["redis"]),
+        snapshot_retention=SnapshotRetentionConfig(
+            tiers=[SnapshotRetentionTier(**tier) for tier in data["snapshot_retention"]["tiers"]],
+        ) if data.get("snapshot_retention") else None,
     )
@@ -5,6 +5,7 @@ from flasgger import Swagger, swag_from
 from flask import (
     flash,
     Flask,
+    g,
     jsonify,
     redirect,
     request,
@@ -26,28 +27,65 @@ from api.model.channel import (
     update_channel,
     get_all_channels,
     get_channel_by_name,
+    get_existing_channel_ids,
 )
 from api.model.monitoring_event import (
     get_monitoring_event_by_id,
     update_monitoring_event_status,
     filter_monitoring_events,
     filter_monitoring_events_for_report,
+    get_existing_monitoring_event_ids,
+    get_monitoring_event_counts,
+    iter_report_rows,
+    ReportRow,
 )
 from api.model.resource import (
+    NewResource,
+    Resource as MonitoredResource,
+    ResourceUpdate,
     create_resource,
+    create_resources,
     get_resource_by_id,
+    get_resources_by_ids,
+    set_resources_enabled,
     update_resource,
+    update_resources,
     get_all_resources,
 )
+from api.model.cache import (
+    CHANNEL_CACHE_KEY,
+    DIFF_CACHE_KEY,
+    DIFF_CACHE_TTL,
+    RESOURCE_CACHE_KEY,
+    configure_cache,
+    get_cache_stats,
+    invalidate,
+    read_through,
+)
+from api.model.connection_pool import get_pool_stats, transaction
+from api.model.host_breaker import (
+    HostBreaker,
+    get_host_breaker,
+    get_all_host_breakers,
+)
+from api.model.event_stream import (
+    get_event_stream_stats,
+    stream_events,
+    subscribe,
+    unsubscribe,
+)
+from api.model.snapshot import get_previous_snapshot_id, get_snapshot_times, search_snapshot_texts
+from api.model.url_capture import get_capture_stats
 from api.model.user import (
     create_user,
     get_user_by_id,
     get_user_by_email,
     get_user_by_username,
     get_md5,
+    invalidate_user_cache,
 )
 from api.model.redis_interactor import (
-    check_jwt,
+    check_jwts,
     delete_jwt,
     save_jwt,
 )
@@ -65,6 +103,7 @@ from api.validators import (
     get_interval,
     validate_monitoring_event_status,
     validate_date_time,
+    validate_snapshot_id,
 )
 import jwt
 import csv
@@ -76,17 +115,40 @@ import time
 import base64
 import logging
 import uuid
+import zlib
 from api.model.s3_interactor import (
     get_object,
-    get_object_created_at
+    get_objects_created_at,
+    has_object,
+    get_snapshot_text,
+    put_object,
+    save_snapshot_text,
 )
+from api.util.diff import DIFF_GRANULARITIES, diff_texts
 from api.util.html_parser import extract_text_from_html
+from api.util.lemmatizer import lemmatize
+from api.util.metrics import get_latency_stats
+from api.util.pagination import decode_cursor, encode_cursor
+from api.util.screenshot_jobs import (
+    ScreenshotJob,
+    get_screenshot_job,
+    get_screenshot_queue_stats,
+    submit_screenshot_job,
+)
+from api.util.rendition import (
+    RENDITION_FORMATS,
+    RENDITION_WIDTHS,
+    get_rendition_name,
+    render_screenshot,
+)
 from api.util.utility import (
     create_daemon_cron_job_for_resource,
     update_daemon_cron_job_for_resource,
+    sync_daemon_cron_jobs_for_resources,
     get_last_snapshot_id,
     get_snapshot_times_by_resource_id,
     get_url_image_base_64,
+    schedule_maintenance,
 )
 from functools import wraps
 import urllib.parse
@@ -113,7 +175,8 @@ from api.model.admin_models import (
     MonitoringEventStatus
 )
 import os
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 import yaml
 import hashlib
 from wtforms import SelectField
@@ -158,28 +221,64 @@ def before_request():
     request.request_id = str(uuid.uuid4())
 
 
+# identity of the request is resolved lazily and at most once: the redis
+# check, jwt decoding and user lookup results are kept in flask.g and shared
+# by the hooks, token_required and the handlers
+def get_request_tokens() -> List[str]:
+    tokens = []
+    bearer = request.headers.get("Authorization")
+    if bearer and len(bearer.split()) == 2:
+        tokens.append(bearer.split()[1])
+    admin_token = request.cookies.get("admin_token")
+    if admin_token:
+        tokens.append(admin_token)
+    return tokens
+
+
+def is_jwt_active(token: str) -> bool:
+    active = g.setdefault("jwt_active", {})
+    if token not in active:
+        # a request may carry both the bearer token and the admin cookie,
+        # all of them are checked in one round trip
+        unchecked = [t for t in dict.fromkeys(get_request_tokens() + [token]) if t not in active]
+        active.update(check_jwts(cfg.redis, unchecked))
+    return active[token]
+
+
+def get_jwt_email(token: str) -> Optional[str]:
+    emails = g.setdefault("jwt_emails", {})
+    if token not in emails:
+        try:
+            emails[token] = jwt.decode(token, cfg.server.secret_key, algorithms="HS256").get("user")
+        except Exception:
+            emails[token] = None
+    return emails[token]
+
+
+def get_request_user(email: str):
+    users = g.setdefault("request_users", {})
+    if email not in users:
+        users[email] = get_user_by_email(cfg.postgres, email)
+    return users[email]
+
+
 @app.before_request
 def load_user_from_jwt():
-    if request.path.startswith('/static') or request.path == '/login' or request.path == '/users/login':
+    if not request.path.startswith('/admin'):
         return
-    
+
     bearer = request.headers.get("Authorization")
     if bearer and len(bearer.split()) == 2:
         token = bearer.split()[1]
-        if check_jwt(cfg.redis, token):
-            try:
-                payload = jwt.decode(token, cfg.server.secret_key, algorithms="HS256")
-                email = payload.get("user")
-                
-                if email:
-                    user = get_user_by_email(cfg.postgres, email)
-                    if user and user.is_admin:
-                        login_user(User.query.get(user.id))
-                    elif request.path.startswith('/admin'):
-                        return jsonify({"error": "Admin access required"}), 403
-            except Exception as e:
-                if request.path.startswith('/admin'):
-                    return jsonify({"error": "Invalid token"}), 401
+        if is_jwt_active(token):
+            email = get_jwt_email(token)
+            if email is None:
+                return jsonify({"error": "Invalid token"}), 401
+            user = get_request_user(email)
+            if user and user.is_admin:
+                login_user(User.query.get(user.id))
+            else:
+                return jsonify({"error": "Admin access required"}), 403
 
 
 @app.before_request
@@ -193,16 +292,15 @@ def check_admin_access():
         if not token:
             token = request.cookies.get('admin_token')
         
-        if not token or not check_jwt(cfg.redis, token):
+        if not token or not is_jwt_active(token):
             return redirect(url_for('admin_login'))
         
-        try:
-            email = jwt.decode(token, cfg.server.secret_key, algorithms="HS256")["user"]
-            user = get_user_by_email(cfg.postgres, email)
-            if not user or not user.is_admin:
-                return jsonify({"error": "Admin access required"}), 403
-        except Exception:
+        email = get_jwt_email(token)
+        if email is None:
             return redirect(url_for('admin_login'))
+        user = get_request_user(email)
+        if not user or not user.is_admin:
+            return jsonify({"error": "Admin access required"}), 403
 
 
 @app.after_request
@@ -214,10 +312,7 @@ def after_request(response):
         if len(data) == 2:
             token = bearer.split()[1]
             if token:
-                try:
-                    email = jwt.decode(token, cfg.server.secret_key, algorithms="HS256")["user"]
-                except Exception as error:
-                    pass
+                email = get_jwt_email(token) or email
     log_data = {
         "request_id": getattr(request, "request_id", ""),
         "path": request.path,
@@ -240,6 +335,7 @@ CORS(app, origins=["http://localhost:5173"], supports_credentials=True)
 
 cfg = parse_config()
 print(cfg)
+configure_cache(cfg.redis)
 
 app.config['SECRET_KEY'] = cfg.server.secret_key
 app.config['SQLALCHEMY_DATABASE_URI'] = f'postgresql://{cfg.postgres.user}:{cfg.postgres.password}@{cfg.postgres.host}:{cfg.postgres.port}/{cfg.postgres.database}'
@@ -278,6 +374,12 @@ class UserModelView(AdminModelView):
         if is_created:
             model.password = generate_password_hash(form.password.data)
 
+    def after_model_change(self, form, model, is_created):
+        invalidate_user_cache()
+
+    def after_model_delete(self, model):
+        invalidate_user_cache()
+
 
 class ResourceModelView(AdminModelView):
     column_list = ['id', 'name', 'url', 'enabled', 'make_screenshot', 'interval', 'starts_from']
@@ -289,6 +391,12 @@ class ResourceModelView(AdminModelView):
         }
     }
 
+    def after_model_change(self, form, model, is_created):
+        invalidate(cfg.postgres, [RESOURCE_CACHE_KEY.format(model.id)])
+
+    def after_model_delete(self, model):
+        invalidate(cfg.postgres, [RESOURCE_CACHE_KEY.format(model.id)])
+
 
 class ChannelModelView(AdminModelView):
     column_list = ['id', 'name', 'type', 'enabled']
@@ -300,6 +408,12 @@ class ChannelModelView(AdminModelView):
         }
     }
 
+    def after_model_change(self, form, model, is_created):
+        invalidate(cfg.postgres, [CHANNEL_CACHE_KEY.format(model.id)])
+
+    def after_model_delete(self, model):
+        invalidate(cfg.postgres, [CHANNEL_CACHE_KEY.format(model.id)])
+
 
 class ChannelResourceModelView(AdminModelView):
     column_list = ['channel_id', 'resource_id', 'enabled']
@@ -379,13 +493,12 @@ def token_required(f):
         token = data[1]
         if not token:
             return jsonify({"error": "token is missing"}), 403
-        if not check_jwt(cfg.redis, token) and not cfg.server.debug:
+        if not cfg.server.debug and not is_jwt_active(token):
             return jsonify({"error": "token is invalid/expired"}), 401
-        try:
-            email = jwt.decode(token, cfg.server.secret_key, algorithms="HS256")["user"]
-        except Exception as error:
+        email = get_jwt_email(token)
+        if email is None:
             return jsonify({"error": "token is invalid/expired"}), 401
-        user = get_user_by_email(cfg.postgres, email)
+        user = get_request_user(email)
         if user is None:
             return jsonify({"error": f"user {email} not found"}), 401
         if user.deleted_at is not None:
@@ -395,6 +508,66 @@ def token_required(f):
     return decorated
 
 
+# list endpoints are paginated by an opaque cursor over their sort key,
+# offset/limit is still accepted but deprecated
+@dataclass
+class PageArgs:
+    offset: Optional[int]
+    limit: int
+    after: Optional[List[str]]
+
+
+def parse_page_args(cursor_size: int) -> Tuple[Optional[PageArgs], Optional[str]]:
+    offset = request.args.get("offset")
+    limit = request.args.get("limit")
+    cursor = request.args.get("cursor")
+    if offset is not None and cursor is not None:
+        return None, "cursor and offset can not be used together"
+    if offset is not None and not offset.isdigit():
+        return None, "offset is invalid"
+    if limit is not None and (not limit.isdigit() or int(limit) == 0):
+        return None, "limit is invalid"
+    after = None
+    if cursor is not None:
+        after = decode_cursor(cursor, cursor_size)
+        if after is None:
+            return None, "cursor is invalid"
+    page_size = int(limit) if limit is not None else cfg.server.default_page_size
+    return PageArgs(
+        offset=int(offset) if offset is not None else None,
+        limit=min(page_size, cfg.server.max_page_size),
+        after=after,
+    ), None
+
+
+def paginated_response(body: Dict[str, Any], page: PageArgs, next_cursor: Optional[str]) -> Tuple[Response, int]:
+    body["next_cursor"] = next_cursor
+    response = jsonify(body)
+    if page.offset is not None:
+        response.headers["Deprecation"] = "true"
+    return response, 200
+
+
+def parse_events_page_args() -> Tuple[Optional[PageArgs], Optional[tuple], Optional[str]]:
+    page, error = parse_page_args(2)
+    if error is not None:
+        return None, None, error
+    if page.after is None:
+        return page, None, None
+    try:
+        return page, (datetime.datetime.fromisoformat(page.after[0]), page.after[1]), None
+    except ValueError:
+        return None, None, "cursor is invalid"
+
+
+def events_page_response(events: List[Any], page: PageArgs) -> Tuple[Response, int]:
+    next_cursor = None
+    if len(events) > page.limit:
+        events = events[:page.limit]
+        next_cursor = encode_cursor(events[-1].created_at, events[-1].id)
+    return paginated_response({"events": events}, page, next_cursor)
+
+
 @app.route("/liveness")
 @swag_from({
     "summary": "Проверка работоспособности сервиса",
@@ -635,13 +808,12 @@ def info():
     token = data[1]
     if not token:
         return jsonify({"error": "token is missing"}), 403
-    if not check_jwt(cfg.redis, token) and not cfg.server.debug:
+    if not cfg.server.debug and not is_jwt_active(token):
         return jsonify({"error": "token is invalid/expired"}), 401
-    try:
-        email = jwt.decode(token, cfg.server.secret_key, algorithms="HS256")["user"]
-    except Exception as error:
+    email = get_jwt_email(token)
+    if email is None:
         return jsonify({"error": "token is invalid/expired"}), 401
-    user = get_user_by_email(cfg.postgres, email)
+    user = get_request_user(email)
     if user is None:
         return jsonify({"error": f"user {email} not found"}), 404
     return jsonify(
@@ -709,7 +881,7 @@ def logout():
     token = data[1]
     if not token:
         return jsonify({"error": "token is missing"}), 403
-    if not check_jwt(cfg.redis, token):
+    if not is_jwt_active(token):
         return jsonify({"error": "token is invalid/expired"}), 401
     delete_jwt(cfg.redis, token)
     logout_user()
@@ -968,6 +1140,27 @@ def new_channel():
             "required": True,
             "type": "string",
             "description": "JWT токен в формате 'bearer: {token}'"
+        },
+        {
+            "name": "cursor",
+            "in": "query",
+            "required": False,
+            "type": "string",
+            "description": "Курсор следующей страницы из поля next_cursor предыдущего ответа"
+        },
+        {
+            "name": "limit",
+            "in": "query",
+            "required": False,
+            "type": "integer",
+            "description": "Размер страницы (ограничен настройкой сервера max_page_size)"
+        },
+        {
+            "name": "offset",
+            "in": "query",
+            "required": False,
+            "type": "integer",
+            "description": "Смещение (устарело, используйте cursor)"
         }
     ],
     "security": [{"Bearer": []}],
@@ -989,7 +1182,17 @@ def new_channel():
                                 "params": {"type": "object", "description": "Параметры канала в формате строки задающей JSON"}
                             }
                         }
-                    }
+                    },
+                    "next_cursor": {"type": "string", "description": "Курсор следующей страницы, null если страниц больше нет"}
+                }
+            }
+        },
+        400: {
+            "description": "Ошибка в параметрах пагинации",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
                 }
             }
         },
@@ -1014,25 +1217,31 @@ def new_channel():
     }
 })
 def find_all_channels():
-    if (request.args.get("offset") is not None) != (request.args.get("limit") is not None):
+    if request.args.get("offset") is not None and request.args.get("limit") is None:
         return jsonify({"error": "offset and limit must be used together"}), 400
-    channels = get_all_channels(cfg.postgres, request.args.get("offset"), request.args.get("limit"))
-    return (
-        jsonify(
-            {
-                "channels": [
-                    {
-                        "id": channel.id,
-                        "type": channel.type,
-                        "name": channel.name,
-                        "enabled": channel.enabled,
-                        "params": json.dumps(channel.params),
-                    }
-                    for channel in channels
-                ]
-            }
-        ),
-        200,
+    page, error = parse_page_args(2)
+    if error is not None:
+        return jsonify({"error": error}), 400
+    channels = get_all_channels(cfg.postgres, page.offset, page.limit + 1, page.after)
+    next_cursor = None
+    if len(channels) > page.limit:
+        channels = channels[:page.limit]
+        next_cursor = encode_cursor(channels[-1].name, channels[-1].id)
+    return paginated_response(
+        {
+            "channels": [
+                {
+                    "id": channel.id,
+                    "type": channel.type,
+                    "name": channel.name,
+                    "enabled": channel.enabled,
+                    "params": json.dumps(channel.params),
+                }
+                for channel in channels
+            ]
+        },
+        page,
+        next_cursor,
     )
 
 
@@ -1321,6 +1530,91 @@ def delete_channel(channel_id: str):
     return jsonify({}), 200
 
 
+def parse_new_resource(body: Dict[str, Any]) -> Tuple[Optional[NewResource], Optional[str]]:
+    url = body.get("url")
+    if not url:
+        return None, "url is missing"
+    if not validate_url(url):
+        return None, "url is invalid"
+    name = body.get("name")
+    if not name:
+        return None, "name is missing"
+    if not validate_name(name):
+        return None, "name is invalid"
+    description = body.get("description")
+    if not description:
+        description = ""
+    if not validate_description(description):
+        return None, "description is invalid"
+    keywords = body.get("keywords")
+    if keywords is not None and not validate_keywords(keywords):
+        return None, "keywords are invalid"
+    interval = body.get("interval")
+    if not interval:
+        return None, "interval is missing"
+    starts_from = body.get("starts_from")
+    if starts_from is not None:
+        starts_from = validate_date_time(starts_from)
+        if not starts_from:
+            return None, "starts_from is invalid. Expected Unix timestamp (integer)"
+    if not validate_interval(interval):
+        return None, "interval is invalid"
+    interval = get_interval(interval)
+    make_screenshot = False
+    sensitivity = body.get("sensitivity")
+    if sensitivity:
+        make_screenshot = True
+    zone_type = None
+    polygon = None
+    if sensitivity:
+        zone_type = body.get("zone_type")
+        if not zone_type:
+            return None, "zone_type is missing"
+        if zone_type not in ["fullPage", "zone"]:
+            return None, "zone_type is invalid"
+        polygon = None
+        if zone_type == "zone":
+            polygon = body.get("areas")
+            if polygon:
+                for area in polygon:
+                    area["sensitivity"] = sensitivity
+                    if not validate_polygon(area):
+                        return None, "polygon is invalid"
+        else:
+            polygon = {"sensitivity": sensitivity}
+    channels = body.get("channels")
+    if channels is None:
+        return None, "at least one channel should be specified"
+    return NewResource(
+        url=url,
+        name=name,
+        description=description,
+        keywords=keywords,
+        interval=interval,
+        starts_from=starts_from,
+        make_screenshot=make_screenshot,
+        polygon=polygon,
+        channels=channels,
+    ), None
+
+
+def resource_to_json(resource: MonitoredResource, channels: Optional[List[str]]) -> Dict[str, Any]:
+    return {
+        "id": resource.id,
+        "url": resource.url,
+        "name": resource.name,
+        "description": resource.description,
+        "channels": channels,
+        "keywords": resource.keywords,
+        "interval": resource.interval,
+        # Convert starts_from to Unix timestamp for response
+        "starts_from": int(resource.starts_from.timestamp()) if resource.starts_from else None,
+        "make_screenshot": resource.make_screenshot,
+        "enabled": resource.enabled,
+        "areas": resource.polygon,
+    }
+
+
 @app.route("/resources/create", methods=["POST"])
 @token_required
 @swag_from({
@@ -1465,129 +1759,120 @@ def delete_channel(channel_id: str):
 })
 def new_resource():
     body = request.get_json()
-    url = body.get("url")
-    if not url:
-        return jsonify({"error": "url is missing"}), 400
-    if not validate_url(url):
-        return jsonify({"error": "url is invalid"}), 400
-    name = body.get("name")
-    if not name:
-        return jsonify({"error": "name is missing"}), 400
-    if not validate_name(name):
-        return jsonify({"error": "name is invalid"}), 400
-    description = body.get("description")
-    if not description:
-        description = ""
-    if not validate_description(description):
-        return jsonify({"error": "description is invalid"}), 400
-    keywords = body.get("keywords")
-    if keywords is not None and not validate_keywords(keywords):
-        return jsonify({"error": "keywords are invalid"}), 400
-    interval = body.get("interval")
-    if not interval:
-        return jsonify({"error": "interval is missing"}), 400
-    starts_from = body.get("starts_from")
-    if starts_from is not None:
-        starts_from = validate_date_time(starts_from)
-        if not starts_from:
-            return (
-                jsonify(
-                    {
-                        "error": "starts_from is invalid. Expected Unix timestamp (integer)"
-                    }
-                ),
-                400,
-            )
-    if not validate_interval(interval):
-        return jsonify({"error": "interval is invalid"}), 400
-    interval = get_interval(interval)
-    make_screenshot = False
-    sensitivity = body.get("sensitivity")
-    if sensitivity:
-        make_screenshot = True
-    zone_type = None
-    polygon = None
-    if sensitivity:
-        zone_type = body.get("zone_type")
-        if not zone_type:
-            return jsonify({"error": "zone_type is missing"}), 400
-        if zone_type not in ["fullPage", "zone"]:
-            return jsonify({"error": "zone_type is invalid"}), 400
-        polygon = None
-        if zone_type == "zone":
-            polygon = body.get("areas")
-            if polygon:
-                for area in polygon:
-                    area["sensitivity"] = sensitivity
-                    if not validate_polygon(area):
-                        return jsonify({"error": "polygon is invalid"}), 400
-        else:
-            polygon = {"sensitivity": sensitivity}
-    channels = body.get("channels")
-    if channels is None:
-        return jsonify({"error": "at least one channel should be specified"}), 400
-    for channel_id in channels:
-        channel = get_channel_by_id(cfg.postgres, channel_id)
-        if channel is None:
-            return jsonify({"error": f"channel {channel_id} not found"}), 404
-    resource = create_resource(
-        cfg.postgres,
-        url,
-        name,
-        description,
-        keywords,
-        interval,
-        starts_from,
-        make_screenshot,
-        polygon,
-    )
-    for channel_id in channels:
-        create_channel_resource(cfg.postgres, channel_id, resource.id)
+    definition, error = parse_new_resource(body)
+    if error is not None:
+        return jsonify({"error": error}), 400
+    with transaction(cfg.postgres) as unit_of_work:
+        for channel_id in definition.channels:
+            channel = get_channel_by_id(cfg.postgres, channel_id)
+            if channel is None:
+                return jsonify({"error": f"channel {channel_id} not found"}), 404
+        resource = create_resource(
+            cfg.postgres,
+            definition.url,
+            definition.name,
+            definition.description,
+            definition.keywords,
+            definition.interval,
+            definition.starts_from,
+            definition.make_screenshot,
+            definition.polygon,
+        )
+        for channel_id in definition.channels:
+            create_channel_resource(cfg.postgres, channel_id, resource.id)
 
-    if not create_daemon_cron_job_for_resource(resource, cfg.server):
-        return jsonify({"error": "failed to create daemon cron job"}), 500
+        if not create_daemon_cron_job_for_resource(resource, cfg.server):
+            unit_of_work.rollback()
+            return jsonify({"error": "failed to create daemon cron job"}), 500
 
-    # Convert starts_from to Unix timestamp for response
-    starts_from_timestamp = (
-        int(resource.starts_from.timestamp()) if resource.starts_from else None
-    )
+    return jsonify({"resource": resource_to_json(resource, definition.channels)}), 201
 
-    return (
-        jsonify(
-            {
-                "resource": {
-                    "id": resource.id,
-                    "url": resource.url,
-                    "name": resource.name,
-                    "description": resource.description,
-                    "channels": channels,
-                    "keywords": resource.keywords,
-                    "interval": resource.interval,
-                    "starts_from": starts_from_timestamp,
-                    "make_screenshot": resource.make_screenshot,
-                    "enabled": resource.enabled,
-                    "areas": resource.polygon,
-                }
-            }
-        ),
-        201,
-    )
 
+BULK_MAX_RESOURCES = 1000
+BULK_ACTIONS = ["create", "update", "disable"]
+BULK_UPDATE_FIELDS = ["description", "keywords", "interval", "starts_from", "enabled"]
 
-@app.route("/resources/<resource_id>", methods=["GET"])
+
+def parse_resource_update(item: Dict[str, Any]) -> Tuple[Optional[ResourceUpdate], Optional[str]]:
+    unsupported = [field for field in ["channels", "areas", "sensitivity", "zone_type"] if field in item]
+    if len(unsupported) > 0:
+        return None, f"{', '.join(unsupported)} can only be changed with PATCH /resources/<resource_id>"
+    description = item.get("description")
+    if description is not None and not validate_description(description):
+        return None, "description is invalid"
+    keywords = item.get("keywords")
+    if keywords is not None and not validate_keywords(keywords):
+        return None, "keywords are invalid"
+    interval = item.get("interval")
+    if interval is not None:
+        if not validate_interval(interval):
+            return None, "interval is invalid"
+        interval = get_interval(interval)
+    enabled = item.get("enabled")
+    if enabled is not None and not isinstance(enabled, bool):
+        return None, "enabled is invalid"
+    starts_from = item.get("starts_from")
+    if starts_from is not None:
+        starts_from = validate_date_time(starts_from)
+        if not starts_from:
+            return None, "starts_from is invalid. Expected Unix timestamp (integer)"
+    return ResourceUpdate(
+        resource_id=item.get("id"),
+        description=description,
+        keywords=keywords,
+        interval=interval,
+        enabled=enabled,
+        starts_from=starts_from,
+    ), None
+
+
+@app.route("/resources/bulk", methods=["POST"])
 @token_required
 @swag_from({
-    "summary": "Получение информации о ресурсе по ID",
+    "summary": "Массовое создание, изменение и отключение ресурсов",
+    "description": "Все элементы проверяются до изменений, корректные элементы применяются в одной транзакции, расписания проверок записываются одной операцией. Результат возвращается для каждого элемента в порядке запроса.",
     "tags": ["resources"],
     "security": [{"Bearer": []}],
+    "consumes": ["application/json"],
+    "produces": ["application/json"],
     "parameters": [
         {
-            "name": "resource_id",
-            "in": "path",
+            "name": "body",
+            "in": "body",
             "required": True,
-            "type": "string",
-            "format": "uuid",
-            "description": "Уникальный идентификатор ресурса"
+            "schema": {
+                "type": "object",
+                "required": ["resources"],
+                "properties": {
+                    "resources": {
+                        "type": "array",
+                        "maxItems": BULK_MAX_RESOURCES,
+                        "items": {
+                            "type": "object",
+                            "required": ["action"],
+                            "properties": {
+                                "action": {
+                                    "type": "string",
+                                    "enum": BULK_ACTIONS,
+                                    "description": "create принимает те же поля, что и /resources/create; update и disable требуют id"
+                                },
+                                "id": {"type": "string", "format": "uuid", "description": "ID ресурса для update и disable"},
+                                "url": {"type": "string"},
+                                "name": {"type": "string"},
+                                "description": {"type": "string"},
+                                "keywords": {"type": "array", "items": {"type": "string"}},
+                                "interval": {"type": "string"},
+                                "starts_from": {"type": "integer"},
+                                "enabled": {"type": "boolean", "description": "Только для update"},
+                                "sensitivity": {"type": "number", "description": "Только для create"},
+                                "zone_type": {"type": "string", "enum": ["fullPage", "zone"], "description": "Только для create"},
+                                "areas": {"type": "array", "items": {"type": "object"}, "description": "Только для create"},
+                                "channels": {"type": "array", "items": {"type": "string", "format": "uuid"}, "description": "Только для create"}
+                            }
+                        }
+                    }
+                }
+            }
         },
         {
             "name": "Authorization",
@@ -1599,34 +1884,20 @@ def new_resource():
     ],
     "responses": {
         200: {
-            "description": "Информация о ресурсе",
+            "description": "Результаты по элементам",
             "schema": {
                 "type": "object",
                 "properties": {
-                    "resource": {
-                        "type": "object",
-                        "properties": {
-                            "id": {"type": "string", "format": "uuid", "description": "Уникальный идентификатор ресурса"},
-                            "url": {"type": "string", "description": "URL ресурса для мониторинга"},
-                            "name": {"type": "string", "description": "Название ресурса"},
-                            "description": {"type": "string", "description": "Описание ресурса"},
-                            "channels": {
-                                "type": "array", 
-                                "items": {"type": "string", "format": "uuid"},
-                                "description": "Список ID активных каналов для оповещения"
-                            },
-                            "keywords": {
-                                "type": "array", 
-                                "items": {"type": "string"},
-                                "description": "Ключевые слова для мониторинга"
-                            },
-                            "interval": {"type": "string", "description": "Интервал проверки ресурса в формате cron выражения"},
-                            "starts_from": {"type": "integer", "description": "Unix timestamp времени начала мониторинга"},
-                            "make_screenshot": {"type": "boolean", "description": "Флаг создания и сравнения скриншотов"},
-                            "enabled": {"type": "boolean", "description": "Статус активности ресурса"},
-                            "areas": {
-                                "type": "object", 
-                                "description": "Настройки областей для скриншотов и их чувствительности"
+                    "results": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "index": {"type": "integer", "description": "Позиция элемента в запросе"},
+                                "action": {"type": "string"},
+                                "status": {"type": "integer", "description": "201 для созданных, 200 для измененных, 400 или 404 для отклоненных ресурсов"},
+                                "resource": {"type": "object", "description": "Ресурс в формате /resources/<resource_id>"},
+                                "error": {"type": "string"}
                             }
                         }
                     }
@@ -1634,7 +1905,7 @@ def new_resource():
             }
         },
         400: {
-            "description": "Неверный формат идентификатора ресурса",
+            "description": "Неверный формат запроса",
             "schema": {
                 "type": "object",
                 "properties": {
@@ -1660,8 +1931,8 @@ def new_resource():
                 }
             }
         },
-        404: {
-            "description": "Ресурс не найден",
+        500: {
+            "description": "Не удалось записать расписания проверок, изменения отменены",
             "schema": {
                 "type": "object",
                 "properties": {
@@ -1671,7 +1942,193 @@ def new_resource():
         }
     }
 })
-def get_resource(resource_id: str):
+def bulk_resources():
+    body = request.get_json()
+    items = body.get("resources")
+    if type(items) is not list or len(items) == 0:
+        return jsonify({"error": "resources should be non-empty list"}), 400
+    if len(items) > BULK_MAX_RESOURCES:
+        return jsonify({"error": f"at most {BULK_MAX_RESOURCES} resources can be changed at once"}), 400
+    results: List[Dict[str, Any]] = []
+    creates: List[Tuple[Dict[str, Any], NewResource]] = []
+    updates: List[Tuple[Dict[str, Any], ResourceUpdate]] = []
+    disables: List[Tuple[Dict[str, Any], str]] = []
+    for index, item in enumerate(items):
+        action = item.get("action") if isinstance(item, dict) else None
+        result = {"index": index, "action": action}
+        results.append(result)
+        if action not in BULK_ACTIONS:
+            result.update({"status": 400, "error": "action is invalid"})
+            continue
+        if action == "create":
+            definition, error = parse_new_resource(item)
+            if error is not None:
+                result.update({"status": 400, "error": error})
+                continue
+            creates.append((result, definition))
+            continue
+        if not isinstance(item.get("id"), str) or not validate_uuid(item["id"]):
+            result.update({"status": 400, "error": "id is invalid"})
+            continue
+        if action == "update":
+            update, error = parse_resource_update(item)
+            if error is not None:
+                result.update({"status": 400, "error": error})
+                continue
+            updates.append((result, update))
+        else:
+            disables.append((result, item["id"]))
+
+    # channel references and target resources are checked with one query each
+    existing_channels = get_existing_channel_ids(
+        cfg.postgres,
+        list({channel_id for _, definition in creates for channel_id in definition.channels}),
+    )
+    valid_creates = []
+    for result, definition in creates:
+        missing = [channel_id for channel_id in definition.channels if channel_id not in existing_channels]
+        if len(missing) > 0:
+            result.update({"status": 404, "error": f"channel {missing[0]} not found"})
+            continue
+        valid_creates.append((result, definition))
+    existing_resources = get_resources_by_ids(
+        cfg.postgres,
+        list({update.resource_id for _, update in updates} | {resource_id for _, resource_id in disables}),
+    )
+    valid_updates = []
+    for result, update in updates:
+        if update.resource_id not in existing_resources:
+            result.update({"status": 404, "error": f"resource {update.resource_id} not found"})
+            continue
+        valid_updates.append((result, update))
+    valid_disables = []
+    for result, resource_id in disables:
+        if resource_id not in existing_resources:
+            result.update({"status": 404, "error": f"resource {resource_id} not found"})
+            continue
+        valid_disables.append((result, resource_id))
+
+    # all writes and the schedules succeed or fail together
+    with transaction(cfg.postgres) as unit_of_work:
+        created = create_resources(cfg.postgres, [definition for _, definition in valid_creates])
+        for (result, definition), resource in zip(valid_creates, created):
+            result.update({"status": 201, "resource": resource_to_json(resource, definition.channels)})
+        update_resources(cfg.postgres, [update for _, update in valid_updates])
+        set_resources_enabled(cfg.postgres, [resource_id for _, resource_id in valid_disables], False)
+        changed = get_resources_by_ids(
+            cfg.postgres,
+            list({update.resource_id for _, update in valid_updates} | {resource_id for _, resource_id in valid_disables}),
+        )
+        for result, update in valid_updates:
+            result.update({"status": 200, "resource": resource_to_json(changed[update.resource_id], None)})
+        for result, resource_id in valid_disables:
+            result.update({"status": 200, "resource": resource_to_json(changed[resource_id], None)})
+
+        scheduled = created + list(changed.values())
+        if len(scheduled) > 0 and not sync_daemon_cron_jobs_for_resources(scheduled, cfg.server):
+            unit_of_work.rollback()
+            return jsonify({"error": "failed to update daemon cron jobs"}), 500
+    return jsonify({"results": results}), 200
+
+
+@app.route("/resources/<resource_id>", methods=["GET"])
+@token_required
+@swag_from({
+    "summary": "Получение информации о ресурсе по ID",
+    "tags": ["resources"],
+    "security": [{"Bearer": []}],
+    "parameters": [
+        {
+            "name": "resource_id",
+            "in": "path",
+            "required": True,
+            "type": "string",
+            "format": "uuid",
+            "description": "Уникальный идентификатор ресурса"
+        },
+        {
+            "name": "Authorization",
+            "in": "header",
+            "required": True,
+            "type": "string",
+            "description": "JWT токен в формате 'bearer: {token}'"
+        }
+    ],
+    "responses": {
+        200: {
+            "description": "Информация о ресурсе",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "resource": {
+                        "type": "object",
+                        "properties": {
+                            "id": {"type": "string", "format": "uuid", "description": "Уникальный идентификатор ресурса"},
+                            "url": {"type": "string", "description": "URL ресурса для мониторинга"},
+                            "name": {"type": "string", "description": "Название ресурса"},
+                            "description": {"type": "string", "description": "Описание ресурса"},
+                            "channels": {
+                                "type": "array", 
+                                "items": {"type": "string", "format": "uuid"},
+                                "description": "Список ID активных каналов для оповещения"
+                            },
+                            "keywords": {
+                                "type": "array", 
+                                "items": {"type": "string"},
+                                "description": "Ключевые слова для мониторинга"
+                            },
+                            "interval": {"type": "string", "description": "Интервал проверки ресурса в формате cron выражения"},
+                            "starts_from": {"type": "integer", "description": "Unix timestamp времени начала мониторинга"},
+                            "make_screenshot": {"type": "boolean", "description": "Флаг создания и сравнения скриншотов"},
+                            "enabled": {"type": "boolean", "description": "Статус активности ресурса"},
+                            "areas": {
+                                "type": "object", 
+                                "description": "Настройки областей для скриншотов и их чувствительности"
+                            }
+                        }
+                    }
+                }
+            }
+        },
+        400: {
+            "description": "Неверный формат идентификатора ресурса",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        },
+        401: {
+            "description": "Ошибка авторизации",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        },
+        403: {
+            "description": "Доступ запрещен",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        },
+        404: {
+            "description": "Ресурс не найден",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        }
+    }
+})
+def get_resource(resource_id: str):
     if not validate_uuid(resource_id):
         return jsonify({"error": "resource_id is invalid"}), 400
     resource = get_resource_by_id(cfg.postgres, resource_id)
@@ -1835,109 +2292,122 @@ def get_resource(resource_id: str):
                     "error": {"type": "string"}
                 }
             }
+        },
+        500: {
+            "description": "Не удалось обновить расписание проверок, изменения отменены",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
         }
     }
 })
 def patch_resorce(resource_id: str):
     if not validate_uuid(resource_id):
         return jsonify({"error": "resource_id is invalid"}), 400
-    resource = get_resource_by_id(cfg.postgres, resource_id)
-    if resource is None:
-        return jsonify({"error": f"resource {resource_id} not found"}), 404
-    body = request.get_json()
-    description = body.get("description")
-    if description is not None and not validate_description(description):
-        return jsonify({"error": "description is invalid"}), 400
-    keywords = body.get("keywords")
-    if keywords is not None and not validate_keywords(keywords):
-        return jsonify({"error": "keywords are invalid"}), 400
-    interval = body.get("interval")
-    if interval is not None:
-        if not validate_interval(interval):
-            return jsonify({"error": "interval is invalid"}), 400
-        interval = get_interval(interval)
-    enabled = body.get("enabled")
-    polygon = body.get("areas")
-    if polygon is not None:
-        if type(polygon) != type(resource.polygon):
-            return jsonify({"error": "polygon is invalid"}), 400
-        if isinstance(polygon, list) and len(resource.polygon) > 0:
-            polygon[0]['sensitivity'] = resource.polygon[0]['sensitivity']
-        else:
-            polygon['sensitivity'] = resource.polygon['sensitivity']
-    if polygon is None:
-        polygon = resource.polygon
-    channels = body.get("channels")
-    if channels is not None:
-        for channel_id in channels:
-            if not validate_uuid(channel_id):
-                return jsonify({"error": f"channel uuid {channel_id} is invalid"}), 400
-            channel = get_channel_by_id(cfg.postgres, channel_id)
-            if channel is None:
-                return jsonify({"error": f"channel {channel_id} not found"}), 404
-    
-    sensitivity = body.get("sensitivity")
-    if sensitivity is not None:
-        if (not isinstance(sensitivity, float) and not isinstance(sensitivity, int)) or (sensitivity < 0 or sensitivity > 100):
-            return jsonify({"error": "sensitivity is invalid"}), 400
-        polygon['sensitivity'] = sensitivity
-
-    # Handle starts_from in PATCH request
-    starts_from = body.get("starts_from")
-    if starts_from is not None:
-        starts_from = validate_date_time(starts_from)
-        if not starts_from:
-            return (
-                jsonify(
-                    {
-                        "error": "starts_from is invalid. Expected Unix timestamp (integer)"
-                    }
-                ),
-                400,
-            )
-
-    update_resource(
-        cfg.postgres,
-        resource_id,
-        description,
-        keywords,
-        interval,
-        enabled,
-        polygon,
-        starts_from,
-    )
-    new_resource = get_resource_by_id(cfg.postgres, resource_id)
+    # reads, the update, channel links and the schedule change share one transaction
+    with transaction(cfg.postgres) as unit_of_work:
+        resource = get_resource_by_id(cfg.postgres, resource_id)
+        if resource is None:
+            return jsonify({"error": f"resource {resource_id} not found"}), 404
+        body = request.get_json()
+        description = body.get("description")
+        if description is not None and not validate_description(description):
+            return jsonify({"error": "description is invalid"}), 400
+        keywords = body.get("keywords")
+        if keywords is not None and not validate_keywords(keywords):
+            return jsonify({"error": "keywords are invalid"}), 400
+        interval = body.get("interval")
+        if interval is not None:
+            if not validate_interval(interval):
+                return jsonify({"error": "interval is invalid"}), 400
+            interval = get_interval(interval)
+        enabled = body.get("enabled")
+        polygon = body.get("areas")
+        if polygon is not None:
+            if type(polygon) != type(resource.polygon):
+                return jsonify({"error": "polygon is invalid"}), 400
+            if isinstance(polygon, list) and len(resource.polygon) > 0:
+                polygon[0]['sensitivity'] = resource.polygon[0]['sensitivity']
+            else:
+                polygon['sensitivity'] = resource.polygon['sensitivity']
+        if polygon is None:
+            polygon = resource.polygon
+        channels = body.get("channels")
+        if channels is not None:
+            for channel_id in channels:
+                if not validate_uuid(channel_id):
+                    return jsonify({"error": f"channel uuid {channel_id} is invalid"}), 400
+                channel = get_channel_by_id(cfg.postgres, channel_id)
+                if channel is None:
+                    return jsonify({"error": f"channel {channel_id} not found"}), 404
+
+        sensitivity = body.get("sensitivity")
+        if sensitivity is not None:
+            if (not isinstance(sensitivity, float) and not isinstance(sensitivity, int)) or (sensitivity < 0 or sensitivity > 100):
+                return jsonify({"error": "sensitivity is invalid"}), 400
+            polygon['sensitivity'] = sensitivity
+
+        # Handle starts_from in PATCH request
+        starts_from = body.get("starts_from")
+        if starts_from is not None:
+            starts_from = validate_date_time(starts_from)
+            if not starts_from:
+                return (
+                    jsonify(
+                        {
+                            "error": "starts_from is invalid. Expected Unix timestamp (integer)"
+                        }
+                    ),
+                    400,
+                )
+
+        update_resource(
+            cfg.postgres,
+            resource_id,
+            description,
+            keywords,
+            interval,
+            enabled,
+            polygon,
+            starts_from,
+        )
+        new_resource = get_resource_by_id(cfg.postgres, resource_id)
 
-    if channels is not None:
-        update_resource_channels(cfg.postgres, resource_id, channels)
+        if channels is not None:
+            update_resource_channels(cfg.postgres, resource_id, channels)
 
-    update_daemon_cron_job_for_resource(new_resource, cfg.server)
+        if not update_daemon_cron_job_for_resource(new_resource, cfg.server):
+            unit_of_work.rollback()
+            return jsonify({"error": "failed to update daemon cron job"}), 500
 
-    # Convert starts_from to Unix timestamp for response
-    starts_from_timestamp = (
-        int(new_resource.starts_from.timestamp()) if new_resource.starts_from else None
-    )
+        # Convert starts_from to Unix timestamp for response
+        starts_from_timestamp = (
+            int(new_resource.starts_from.timestamp()) if new_resource.starts_from else None
+        )
 
-    return (
-        jsonify(
-            {
-                "resource": {
-                    "id": new_resource.id,
-                    "url": new_resource.url,
-                    "name": new_resource.name,
-                    "description": new_resource.description,
-                    "channels": channels,
-                    "keywords": new_resource.keywords,
-                    "interval": new_resource.interval,
-                    "starts_from": starts_from_timestamp,
-                    "make_screenshot": new_resource.make_screenshot,
-                    "enabled": new_resource.enabled,
-                    "areas": new_resource.polygon,
+        return (
+            jsonify(
+                {
+                    "resource": {
+                        "id": new_resource.id,
+                        "url": new_resource.url,
+                        "name": new_resource.name,
+                        "description": new_resource.description,
+                        "channels": channels,
+                        "keywords": new_resource.keywords,
+                        "interval": new_resource.interval,
+                        "starts_from": starts_from_timestamp,
+                        "make_screenshot": new_resource.make_screenshot,
+                        "enabled": new_resource.enabled,
+                        "areas": new_resource.polygon,
+                    }
                 }
-            }
-        ),
-        200,
-    )
+            ),
+            200,
+        )
 
 
 @app.route("/resources/<resource_id>", methods=["DELETE"])
@@ -2051,18 +2521,30 @@ def patch_resorce(resource_id: str):
                     "error": {"type": "string"}
                 }
             }
+        },
+        500: {
+            "description": "Не удалось обновить расписание проверок, изменения отменены",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
         }
     }
 })
 def delete_resource(resource_id: str):
     if not validate_uuid(resource_id):
         return jsonify({"error": "resource_id is invalid"}), 400
-    resource = get_resource_by_id(cfg.postgres, resource_id)
-    if resource is None:
-        return jsonify({"error": f"resource {resource_id} not found"}), 404
-    update_resource(cfg.postgres, resource_id, None, None, None, False, None)
-    resource = get_resource_by_id(cfg.postgres, resource_id)
-    update_daemon_cron_job_for_resource(resource, cfg.server)
+    with transaction(cfg.postgres) as unit_of_work:
+        resource = get_resource_by_id(cfg.postgres, resource_id)
+        if resource is None:
+            return jsonify({"error": f"resource {resource_id} not found"}), 404
+        update_resource(cfg.postgres, resource_id, None, None, None, False, None)
+        resource = get_resource_by_id(cfg.postgres, resource_id)
+        if not update_daemon_cron_job_for_resource(resource, cfg.server):
+            unit_of_work.rollback()
+            return jsonify({"error": "failed to update daemon cron job"}), 500
     return jsonify({}), 200
 
 
@@ -2079,6 +2561,27 @@ def delete_resource(resource_id: str):
             "required": True,
             "type": "string",
             "description": "JWT токен в формате 'bearer: {token}'"
+        },
+        {
+            "name": "cursor",
+            "in": "query",
+            "required": False,
+            "type": "string",
+            "description": "Курсор следующей страницы из поля next_cursor предыдущего ответа"
+        },
+        {
+            "name": "limit",
+            "in": "query",
+            "required": False,
+            "type": "integer",
+            "description": "Размер страницы (ограничен настройкой сервера max_page_size)"
+        },
+        {
+            "name": "offset",
+            "in": "query",
+            "required": False,
+            "type": "integer",
+            "description": "Смещение (устарело, используйте cursor)"
         }
     ],
     "responses": {
@@ -2116,7 +2619,17 @@ def delete_resource(resource_id: str):
                                 }
                             }
                         }
-                    }
+                    },
+                    "next_cursor": {"type": "string", "description": "Курсор следующей страницы, null если страниц больше нет"}
+                }
+            }
+        },
+        400: {
+            "description": "Ошибка в параметрах пагинации",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
                 }
             }
         },
@@ -2141,9 +2654,16 @@ def delete_resource(resource_id: str):
     }
 })
 def all_resources():
-    if (request.args.get("offset") is not None) != (request.args.get("limit") is not None):
+    if request.args.get("offset") is not None and request.args.get("limit") is None:
         return jsonify({"error": "offset and limit must be used together"}), 400
-    resources = get_all_resources(cfg.postgres, request.args.get("offset"), request.args.get("limit"))
+    page, error = parse_page_args(2)
+    if error is not None:
+        return jsonify({"error": error}), 400
+    resources = get_all_resources(cfg.postgres, page.offset, page.limit + 1, page.after)
+    next_cursor = None
+    if len(resources) > page.limit:
+        resources = resources[:page.limit]
+        next_cursor = encode_cursor(resources[-1].name, resources[-1].id)
     result = []
     for resource in resources:
         all_channels = get_channel_resource_by_resource_id(cfg.postgres, resource.id)
@@ -2172,7 +2692,7 @@ def all_resources():
                 "areas": resource.polygon,
             }
         )
-    return jsonify({"resources": result}), 200
+    return paginated_response({"resources": result}, page, next_cursor)
 
 
 @app.route("/add_channel_to_resource/", methods=["POST"])
@@ -2696,6 +3216,43 @@ def update_event(event_id: str):
     return jsonify({}), 200
 
 
+SNAPSHOT_CACHE_CONTROL = "private, max-age=31536000, immutable"
+# for representations whose meaning can change, e.g. diffs against the
+# previous snapshot which retention may delete
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def snapshot_etag(snapshot_id: str, representation: str) -> str:
+    # snapshot objects are never rewritten and their numbers are never
+    # reused, so the name identifies every representation built from them
+    return f"{snapshot_id}-{representation}"
+
+
+def snapshot_not_modified(bucket_name: str, object_name: str, etag: str) -> Optional[Response]:
+    """Answers If-None-Match without downloading the object, None when the full response is needed."""
+    if not request.if_none_match.contains_weak(etag) or not has_object(cfg.s3, bucket_name, object_name):
+        return None
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = SNAPSHOT_CACHE_CONTROL
+    return response
+
+
+def snapshot_response(response: Response,
+                      content: bytes,
+                      representation: str,
+                      accept_ranges: bool = False,
+                      cache_control: str = SNAPSHOT_CACHE_CONTROL,
+                      etag: Optional[str] = None) -> Response:
+    # representations computed on request, like diffs, are identified by
+    # their content
+    response.set_etag(etag or f"{hashlib.sha256(content).hexdigest()[:32]}-{representation}")
+    response.headers["Cache-Control"] = cache_control
+    if accept_ranges:
+        return response.make_conditional(request, accept_ranges=True, complete_length=len(content))
+    return response.make_conditional(request)
+
+
 @app.route("/events/<snapshot_id>/screenshot", methods=["GET"])
 @token_required
 @swag_from({
@@ -2716,6 +3273,20 @@ def update_event(event_id: str):
             "required": True,
             "type": "string",
             "description": "JWT токен в формате 'bearer: {token}'"
+        },
+        {
+            "name": "raw",
+            "in": "query",
+            "required": False,
+            "type": "boolean",
+            "description": "Вернуть содержимое файла без JSON-обертки, поддерживается заголовок Range"
+        },
+        {
+            "name": "If-None-Match",
+            "in": "header",
+            "required": False,
+            "type": "string",
+            "description": "ETag ранее полученного ответа, при совпадении возвращается 304"
         }
     ],
     "responses": {
@@ -2732,6 +3303,12 @@ def update_event(event_id: str):
                 }
             }
         },
+        206: {
+            "description": "Часть файла при запросе с raw=true и заголовком Range"
+        },
+        304: {
+            "description": "Содержимое не изменилось (совпал If-None-Match)"
+        },
         401: {
             "description": "Ошибка авторизации",
             "schema": {
@@ -2762,18 +3339,25 @@ def update_event(event_id: str):
     }
 })
 def get_event_snapshot(snapshot_id: str):
+    raw = request.args.get("raw") == "true"
+    etag = snapshot_etag(snapshot_id, "png" if raw else "base64")
+    not_modified = snapshot_not_modified("images", snapshot_id + ".png", etag)
+    if not_modified is not None:
+        return not_modified
     image = get_object(cfg.s3, "images", snapshot_id + ".png")
     if image is None:
         return jsonify({"error": f"screenshot {snapshot_id} not found"}), 404
+    if raw:
+        return snapshot_response(Response(image, mimetype="image/png"), image, "png", accept_ranges=True, etag=etag)
     image_base64 = base64.b64encode(image).decode("utf-8")
-    return jsonify({"image": image_base64}), 200
+    return snapshot_response(jsonify({"image": image_base64}), image, "base64", etag=etag)
 
 
-@app.route("/events/<snapshot_id>/text", methods=["GET"])
+@app.route("/events/<snapshot_id>/screenshot/rendition", methods=["GET"])
 @token_required
 @swag_from({
-    "summary": "Получение текстового содержимого снимка веб-страницы события",
-    "tags": ["snapshots"],
+    "summary": "Получение уменьшенной копии скриншота события мониторинга",
+    "tags": ["events", "snapshots"],
     "security": [{"Bearer": []}],
     "parameters": [
         {
@@ -2781,7 +3365,23 @@ def get_event_snapshot(snapshot_id: str):
             "in": "path",
             "required": True,
             "type": "string",
-            "description": "Идентификатор снимка веб-страницы события мониторинга"
+            "description": "Идентификатор снимка экрана события мониторинга"
+        },
+        {
+            "name": "width",
+            "in": "query",
+            "required": False,
+            "type": "integer",
+            "enum": list(RENDITION_WIDTHS),
+            "description": "Ширина копии в пикселях, по умолчанию 320; высота, превышающая ограничение формата (16383 для webp), обрезается"
+        },
+        {
+            "name": "format",
+            "in": "query",
+            "required": False,
+            "type": "string",
+            "enum": list(RENDITION_FORMATS),
+            "description": "Формат изображения, по умолчанию webp"
         },
         {
             "name": "Authorization",
@@ -2789,18 +3389,32 @@ def get_event_snapshot(snapshot_id: str):
             "required": True,
             "type": "string",
             "description": "JWT токен в формате 'bearer: {token}'"
+        },
+        {
+            "name": "If-None-Match",
+            "in": "header",
+            "required": False,
+            "type": "string",
+            "description": "ETag ранее полученного ответа, при совпадении возвращается 304"
         }
     ],
+    "produces": [mimetype for _, mimetype in RENDITION_FORMATS.values()],
     "responses": {
         200: {
-            "description": "Текстовое содержимое снимка веб-страницы",
+            "description": "Уменьшенная копия скриншота",
+            "schema": {
+                "type": "file"
+            }
+        },
+        304: {
+            "description": "Содержимое не изменилось (совпал If-None-Match)"
+        },
+        400: {
+            "description": "Неверная ширина или формат",
             "schema": {
                 "type": "object",
                 "properties": {
-                    "text": {
-                        "type": "string",
-                        "description": "Извлеченный текст из HTML-снимка веб-страницы"
-                    }
+                    "error": {"type": "string"}
                 }
             }
         },
@@ -2823,7 +3437,7 @@ def get_event_snapshot(snapshot_id: str):
             }
         },
         404: {
-            "description": "Снимок веб-страницы не найден",
+            "description": "Скриншот не найден",
             "schema": {
                 "type": "object",
                 "properties": {
@@ -2833,18 +3447,49 @@ def get_event_snapshot(snapshot_id: str):
         }
     }
 })
-def get_event_text(snapshot_id: str):
-    html = get_object(cfg.s3, "htmls", snapshot_id + ".html")
-    if html is None:
-        return jsonify({"error": f"snapshot {snapshot_id} not found"}), 404
-    text = extract_text_from_html(html)
-    return jsonify({"text": text}), 200
+def get_event_snapshot_rendition(snapshot_id: str):
+    width = request.args.get("width", "320")
+    if not width.isdigit() or int(width) not in RENDITION_WIDTHS:
+        return jsonify({"error": "width is invalid"}), 400
+    width = int(width)
+    rendition_format = request.args.get("format", "webp")
+    if rendition_format not in RENDITION_FORMATS:
+        return jsonify({"error": "format is invalid"}), 400
+    _, mimetype = RENDITION_FORMATS[rendition_format]
+    etag = snapshot_etag(snapshot_id, f"w{width}-{rendition_format}")
+    not_modified = snapshot_not_modified("images", snapshot_id + ".png", etag)
+    if not_modified is not None:
+        return not_modified
+    rendition_name = get_rendition_name(snapshot_id, width, rendition_format)
+    rendition = get_object(cfg.s3, "images", rendition_name)
+    if rendition is None:
+        image = get_object(cfg.s3, "images", snapshot_id + ".png")
+        if image is None:
+            return jsonify({"error": f"screenshot {snapshot_id} not found"}), 404
+        rendition = render_screenshot(image, width, rendition_format)
+        if not put_object(cfg.s3, "images", rendition_name, rendition, mimetype):
+            logger.warning("failed to store rendition", extra={"rendition": rendition_name})
+    return snapshot_response(
+        Response(rendition, mimetype=mimetype), rendition, f"w{width}-{rendition_format}", accept_ranges=True, etag=etag
+    )
 
 
-@app.route("/events/<snapshot_id>/html", methods=["GET"])
+def load_snapshot_text(snapshot_id: str) -> Optional[str]:
+    text = get_snapshot_text(cfg.s3, snapshot_id)
+    if text is None:
+        # snapshots captured before the daemon stored texts
+        html = get_object(cfg.s3, "htmls", snapshot_id + ".html")
+        if html is None:
+            return None
+        text = extract_text_from_html(html)
+        save_snapshot_text(cfg.s3, snapshot_id, text)
+    return text
+
+
+@app.route("/events/<snapshot_id>/text", methods=["GET"])
 @token_required
 @swag_from({
-    "summary": "Получение HTML-содержимого снимка веб-страницы события",
+    "summary": "Получение текстового содержимого снимка веб-страницы события",
     "tags": ["snapshots"],
     "security": [{"Bearer": []}],
     "parameters": [
@@ -2861,6 +3506,105 @@ def get_event_text(snapshot_id: str):
             "required": True,
             "type": "string",
             "description": "JWT токен в формате 'bearer: {token}'"
+        },
+        {
+            "name": "If-None-Match",
+            "in": "header",
+            "required": False,
+            "type": "string",
+            "description": "ETag ранее полученного ответа, при совпадении возвращается 304"
+        }
+    ],
+    "responses": {
+        200: {
+            "description": "Текстовое содержимое снимка веб-страницы",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "text": {
+                        "type": "string",
+                        "description": "Извлеченный текст из HTML-снимка веб-страницы"
+                    }
+                }
+            }
+        },
+        304: {
+            "description": "Содержимое не изменилось (совпал If-None-Match)"
+        },
+        401: {
+            "description": "Ошибка авторизации",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        },
+        403: {
+            "description": "Доступ запрещен",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        },
+        404: {
+            "description": "Снимок веб-страницы не найден",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        }
+    }
+})
+def get_event_text(snapshot_id: str):
+    etag = snapshot_etag(snapshot_id, "text")
+    not_modified = snapshot_not_modified("htmls", snapshot_id + ".html", etag)
+    if not_modified is not None:
+        return not_modified
+    text = load_snapshot_text(snapshot_id)
+    if text is None:
+        return jsonify({"error": f"snapshot {snapshot_id} not found"}), 404
+    return snapshot_response(jsonify({"text": text}), text.encode("utf-8"), "text", etag=etag)
+
+
+@app.route("/events/<snapshot_id>/html", methods=["GET"])
+@token_required
+@swag_from({
+    "summary": "Получение HTML-содержимого снимка веб-страницы события",
+    "tags": ["snapshots"],
+    "security": [{"Bearer": []}],
+    "parameters": [
+        {
+            "name": "snapshot_id",
+            "in": "path",
+            "required": True,
+            "type": "string",
+            "description": "Идентификатор снимка веб-страницы события мониторинга"
+        },
+        {
+            "name": "Authorization",
+            "in": "header",
+            "required": True,
+            "type": "string",
+            "description": "JWT токен в формате 'bearer: {token}'"
+        },
+        {
+            "name": "raw",
+            "in": "query",
+            "required": False,
+            "type": "boolean",
+            "description": "Вернуть содержимое файла без JSON-обертки, поддерживается заголовок Range; страница отдается с Content-Security-Policy: sandbox"
+        },
+        {
+            "name": "If-None-Match",
+            "in": "header",
+            "required": False,
+            "type": "string",
+            "description": "ETag ранее полученного ответа, при совпадении возвращается 304"
         }
     ],
     "responses": {
@@ -2876,6 +3620,12 @@ def get_event_text(snapshot_id: str):
                 }
             }
         },
+        206: {
+            "description": "Часть файла при запросе с raw=true и заголовком Range"
+        },
+        304: {
+            "description": "Содержимое не изменилось (совпал If-None-Match)"
+        },
         401: {
             "description": "Ошибка авторизации",
             "schema": {
@@ -2906,10 +3656,22 @@ def get_event_text(snapshot_id: str):
     }
 })
 def get_event_html(snapshot_id: str):
+    raw = request.args.get("raw") == "true"
+    etag = snapshot_etag(snapshot_id, "html" if raw else "json")
+    not_modified = snapshot_not_modified("htmls", snapshot_id + ".html", etag)
+    if not_modified is not None:
+        return not_modified
     html = get_object(cfg.s3, "htmls", snapshot_id + ".html")
     if html is None:
         return jsonify({"error": f"snapshot {snapshot_id} not found"}), 404
-    return jsonify({"html": html.decode("utf-8")}), 200
+    if raw:
+        response = Response(html, mimetype="text/html")
+        # captured pages come from third party sites, they must not run
+        # scripts or read cookies on the api origin
+        response.headers["Content-Security-Policy"] = "sandbox"
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        return snapshot_response(response, html, "html", accept_ranges=True, etag=etag)
+    return snapshot_response(jsonify({"html": html.decode("utf-8")}), html, "json", etag=etag)
 
 
 @app.route("/resources/<resource_id>/last_snapshot_id", methods=["GET"])
@@ -2992,7 +3754,8 @@ def get_event_last_snapshot_id(resource_id: str):
     resource = get_resource_by_id(cfg.postgres, resource_id)
     if resource is None:
         return jsonify({"error": f"resource {resource_id} not found"}), 404
-    last_snapshot = get_last_snapshot_id(cfg.s3, resource_id)
+    # null when the snapshots could not be listed
+    last_snapshot = get_last_snapshot_id(cfg.postgres, cfg.s3, resource_id)
     return jsonify({"snapshot_id": last_snapshot}), 200
 
 
@@ -3071,6 +3834,15 @@ def get_event_last_snapshot_id(resource_id: str):
                     "error": {"type": "string"}
                 }
             }
+        },
+        500: {
+            "description": "Не удалось получить список снимков из хранилища",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
         }
     }
 })
@@ -3087,11 +3859,14 @@ def get_snapshot_times(resource_id: str):
     if request.args.get("limit") is not None and not request.args.get("limit").isdigit():
         return jsonify({"error": "offset and limit must be integers"}), 400
     snapshots = get_snapshot_times_by_resource_id(
+        cfg.postgres,
         cfg.s3,
         resource_id,
         int(request.args.get("offset")) if request.args.get("offset") is not None else None,
         int(request.args.get("limit")) if request.args.get("limit") is not None else None
     )
+    if snapshots is None:
+        return jsonify({"error": "failed to list snapshots"}), 500
     return jsonify(
         {
             "snapshots": [
@@ -3102,30 +3877,56 @@ def get_snapshot_times(resource_id: str):
     )
 
 
-@app.route("/screenshot", methods=["POST"])
+@app.route("/snapshots/search", methods=["GET"])
 @token_required
 @swag_from({
-    "summary": "Получение скриншота веб-страницы по URL",
-    "tags": ["screenshot"],
+    "summary": "Полнотекстовый поиск по истории снимков страниц",
+    "description": "Ищет по тексту снимков с учетом русской и английской морфологии. Результаты отсортированы от новых снимков к старым.",
+    "tags": ["snapshots"],
     "security": [{"Bearer": []}],
-    "consumes": ["application/json"],
     "produces": ["application/json"],
     "parameters": [
         {
-            "name": "body",
-            "in": "body",
+            "name": "q",
+            "in": "query",
+            "type": "string",
             "required": True,
-            "schema": {
-                "type": "object",
-                "required": ["url"],
-                "properties": {
-                    "url": {
-                        "type": "string",
-                        "description": "URL веб-страницы для скриншота",
-                        "example": "https://example.com"
-                    }
-                }
-            }
+            "description": "Поисковый запрос"
+        },
+        {
+            "name": "resource_id",
+            "in": "query",
+            "type": "string",
+            "required": False,
+            "description": "ID ресурса, снимки которого ищутся"
+        },
+        {
+            "name": "since",
+            "in": "query",
+            "type": "integer",
+            "required": False,
+            "description": "Unix timestamp, начиная с которого ищутся снимки"
+        },
+        {
+            "name": "until",
+            "in": "query",
+            "type": "integer",
+            "required": False,
+            "description": "Unix timestamp, до которого ищутся снимки"
+        },
+        {
+            "name": "limit",
+            "in": "query",
+            "type": "integer",
+            "required": False,
+            "description": "Количество снимков на странице"
+        },
+        {
+            "name": "cursor",
+            "in": "query",
+            "type": "string",
+            "required": False,
+            "description": "Курсор следующей страницы из поля next_cursor предыдущего ответа"
         },
         {
             "name": "Authorization",
@@ -3137,20 +3938,28 @@ def get_snapshot_times(resource_id: str):
     ],
     "responses": {
         200: {
-            "description": "Скриншот веб-страницы в формате base64",
+            "description": "Найденные снимки",
             "schema": {
                 "type": "object",
                 "properties": {
-                    "screenshot": {
-                        "type": "string",
-                        "format": "byte",
-                        "description": "Изображение скриншота в кодировке base64"
-                    }
+                    "snapshots": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "snapshot_id": {"type": "string"},
+                                "resource_id": {"type": "string"},
+                                "time": {"type": "string", "format": "date-time"},
+                                "snippet": {"type": "string", "description": "Фрагменты текста, найденные слова выделены тегом <b>"}
+                            }
+                        }
+                    },
+                    "next_cursor": {"type": "string", "description": "Курсор следующей страницы или null"}
                 }
             }
         },
         400: {
-            "description": "Ошибка в запросе или неверный URL",
+            "description": "Неверный формат параметров",
             "schema": {
                 "type": "object",
                 "properties": {
@@ -3178,58 +3987,101 @@ def get_snapshot_times(resource_id: str):
         }
     }
 })
-def get_screenshot():
-    body = request.get_json()
-    url = body.get("url")
-    if url is None:
-        return jsonify({"error": "url is required"}), 400
-    if not validate_url(url):
-        return jsonify({"error": "invalid url"}), 400
-    screenshot = get_url_image_base_64(url)
-    return jsonify({"screenshot": screenshot}), 200
+def search_snapshots():
+    text = request.args.get("q", "").strip()
+    if len(text) == 0:
+        return jsonify({"error": "q is required"}), 400
+    resource_id = request.args.get("resource_id")
+    if resource_id is not None and not validate_uuid(resource_id):
+        return jsonify({"error": "resource_id is invalid"}), 400
+    bounds = {}
+    for name in ["since", "until"]:
+        value = request.args.get(name)
+        bounds[name] = None
+        if value is not None:
+            bounds[name] = validate_date_time(int(value)) if value.isdigit() else None
+            if bounds[name] is None:
+                return jsonify({"error": f"{name} is invalid"}), 400
+    page, after, error = parse_events_page_args()
+    if error is not None:
+        return jsonify({"error": error}), 400
+    if page.offset is not None:
+        return jsonify({"error": "offset is not supported, use cursor"}), 400
+    matches = search_snapshot_texts(
+        cfg.postgres,
+        text,
+        lemmatize(text),
+        resource_id,
+        bounds["since"],
+        bounds["until"],
+        page.limit + 1,
+        after,
+    )
+    next_cursor = None
+    if len(matches) > page.limit:
+        matches = matches[:page.limit]
+        next_cursor = encode_cursor(matches[-1].created_at, matches[-1].snapshot_id)
+    return paginated_response(
+        {
+            "snapshots": [
+                {
+                    "snapshot_id": match.snapshot_id,
+                    "resource_id": match.resource_id,
+                    "time": match.created_at.isoformat(),
+                    "snippet": match.snippet,
+                }
+                for match in matches
+            ]
+        },
+        page,
+        next_cursor,
+    )
 
 
-@app.route("/events/filter", methods=["POST"])
+DIFF_DEFAULT_CONTEXT = {"line": 3, "word": 10}
+DIFF_MAX_CONTEXT = 100
+
+
+@app.route("/snapshots/<snapshot_id>/diff", methods=["GET"])
 @token_required
 @swag_from({
-    "summary": "Получение отфильтрованных событий мониторинга",
-    "tags": ["events"],
+    "summary": "Различия текста двух снимков веб-страницы",
+    "description": "Сравнивает извлеченный текст снимка с предыдущим снимком того же ресурса (или с указанным в base). "
+                   "Изменения возвращаются фрагментами (hunks) с несколькими неизмененными токенами вокруг, "
+                   "как в unified diff. Результат кэшируется для пары снимков; без base ответ нужно перепроверять по ETag, "
+                   "так как предыдущий снимок может быть удален при прореживании.",
+    "tags": ["snapshots"],
     "security": [{"Bearer": []}],
-    "consumes": ["application/json"],
-    "produces": ["application/json"],
     "parameters": [
         {
-            "name": "body",
-            "in": "body",
+            "name": "snapshot_id",
+            "in": "path",
             "required": True,
-            "schema": {
-                "type": "object",
-                "properties": {
-                    "resource_ids": {
-                        "type": "array",
-                        "items": {
-                            "type": "string",
-                            "format": "uuid"
-                        },
-                        "description": "Список идентификаторов ресурсов для фильтрации"
-                    },
-                    "start_time": {
-                        "type": "string",
-                        "format": "date-time",
-                        "description": "Время начала периода фильтрации"
-                    },
-                    "end_time": {
-                        "type": "string",
-                        "format": "date-time",
-                        "description": "Время окончания периода фильтрации"
-                    },
-                    "event_type": {
-                        "type": "string",
-                        "enum": ["keyword", "image"],
-                        "description": "Тип события мониторинга"
-                    }
-                }
-            }
+            "type": "string",
+            "description": "Идентификатор снимка веб-страницы"
+        },
+        {
+            "name": "base",
+            "in": "query",
+            "required": False,
+            "type": "string",
+            "description": "Идентификатор снимка, с которым сравнивать (по умолчанию предыдущий снимок ресурса)"
+        },
+        {
+            "name": "granularity",
+            "in": "query",
+            "required": False,
+            "type": "string",
+            "enum": ["line", "word"],
+            "description": "Сравнение по словам (по умолчанию) или по строкам; извлеченный текст снимка хранится одной строкой, "
+                           "поэтому при сравнении по строкам любое изменение заменяет текст целиком"
+        },
+        {
+            "name": "context",
+            "in": "query",
+            "required": False,
+            "type": "integer",
+            "description": "Количество неизмененных токенов вокруг изменений (по умолчанию 10 токенов слов или 3 строки)"
         },
         {
             "name": "Authorization",
@@ -3237,24 +4089,47 @@ def get_screenshot():
             "required": True,
             "type": "string",
             "description": "JWT токен в формате 'bearer: {token}'"
+        },
+        {
+            "name": "If-None-Match",
+            "in": "header",
+            "required": False,
+            "type": "string",
+            "description": "ETag ранее полученного ответа, при совпадении возвращается 304"
         }
     ],
     "responses": {
         200: {
-            "description": "Список отфильтрованных событий мониторинга",
+            "description": "Различия текста снимков",
             "schema": {
                 "type": "object",
                 "properties": {
-                    "events": {
+                    "base": {"type": "string", "description": "Снимок, с которым выполнено сравнение"},
+                    "snapshot_id": {"type": "string"},
+                    "granularity": {"type": "string"},
+                    "hunks": {
                         "type": "array",
                         "items": {
                             "type": "object",
-                            "description": "Событие мониторинга"
+                            "properties": {
+                                "old_start": {"type": "integer", "description": "Индекс первого токена фрагмента в тексте base"},
+                                "old_count": {"type": "integer"},
+                                "new_start": {"type": "integer", "description": "Индекс первого токена фрагмента в тексте снимка"},
+                                "new_count": {"type": "integer"},
+                                "changes": {
+                                    "type": "array",
+                                    "description": "Пары [операция, текст]: '=' без изменений, '-' удалено, '+' добавлено",
+                                    "items": {"type": "array", "items": {"type": "string"}}
+                                }
+                            }
                         }
                     }
                 }
             }
         },
+        304: {
+            "description": "Различия не изменились (совпал If-None-Match)"
+        },
         400: {
             "description": "Ошибка в параметрах запроса",
             "schema": {
@@ -3281,55 +4156,88 @@ def get_screenshot():
                     "error": {"type": "string"}
                 }
             }
+        },
+        404: {
+            "description": "Снимок или предыдущий снимок не найден",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        },
+        413: {
+            "description": "Тексты снимков слишком большие для сравнения",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
         }
     }
 })
-def get_filtred_events():
-    body = request.get_json()
-    resource_ids = body.get("resource_ids")
-    if resource_ids is not None:
-        if type(resource_ids) is not list:
-            return jsonify({"error": "resource_ids should be list"}), 400
-        for resource_id in resource_ids:
-            if not validate_uuid(resource_id):
-                return jsonify({"error": "invalid resource_id value"}), 400
-    start_time = body.get("start_time")
-    if start_time is not None:
-        start_time = validate_date_time(start_time)
-        if start_time is None:
-            return jsonify({"error": "start_time is invalid"}), 400
-    end_time = body.get("end_time")
-    if end_time is not None:
-        end_time = validate_date_time(end_time)
-        if end_time is None:
-            return jsonify({"error": "end_time is invalid"}), 400
-    if start_time is not None and end_time is not None and start_time > end_time:
-        return jsonify({"error": "end_time is more than start_time"}), 400
-    event_type = body.get("event_type")
-    if event_type is not None and event_type not in ["keyword", "image"]:
-        return jsonify({"error", "type is invalid"}), 400
-    if (request.args.get("offset") is not None) != (request.args.get("limit") is not None):
-        return jsonify({"error": "offset and limit should be used together"}), 400
-    events = filter_monitoring_events(
-        cfg.postgres,
-        resource_ids,
-        start_time,
-        end_time,
-        event_type,
-        request.args.get("offset"),
-        request.args.get("limit")
+def get_snapshot_diff(snapshot_id: str):
+    if not validate_snapshot_id(snapshot_id):
+        return jsonify({"error": "snapshot_id is invalid"}), 400
+    base = request.args.get("base")
+    if base is not None and not validate_snapshot_id(base):
+        return jsonify({"error": "base is invalid"}), 400
+    # extracted texts are stored as one line of words
+    granularity = request.args.get("granularity", "word")
+    if granularity not in DIFF_GRANULARITIES:
+        return jsonify({"error": "granularity is invalid"}), 400
+    context = request.args.get("context", str(DIFF_DEFAULT_CONTEXT[granularity]))
+    if not context.isdigit() or int(context) > DIFF_MAX_CONTEXT:
+        return jsonify({"error": "context is invalid"}), 400
+    context = int(context)
+    implicit_base = base is None
+    if implicit_base:
+        base = get_previous_snapshot_id(cfg.postgres, snapshot_id)
+        if base is None:
+            return jsonify({"error": f"snapshot {snapshot_id} has no previous snapshot"}), 404
+    errors = []
+
+    def load() -> Optional[Dict[str, Any]]:
+        old_text = load_snapshot_text(base)
+        new_text = load_snapshot_text(snapshot_id)
+        for name, text in [(base, old_text), (snapshot_id, new_text)]:
+            if text is None:
+                errors.append(({"error": f"snapshot {name} not found"}, 404))
+                return None
+        hunks = diff_texts(old_text, new_text, granularity, context)
+        if hunks is None:
+            errors.append(({"error": "snapshot texts are too large to diff"}, 413))
+            return None
+        return {
+            "base": base,
+            "snapshot_id": snapshot_id,
+            "granularity": granularity,
+            "hunks": [asdict(hunk) for hunk in hunks],
+        }
+
+    diff = read_through(
+        cfg.postgres, "diff", DIFF_CACHE_KEY.format(base, snapshot_id, granularity, context), load, DIFF_CACHE_TTL
+    )
+    if diff is None:
+        error, code = errors[0]
+        return jsonify(error), code
+    return snapshot_response(
+        jsonify(diff),
+        app.json.dumps(diff).encode("utf-8"),
+        "diff",
+        cache_control=REVALIDATE_CACHE_CONTROL if implicit_base else SNAPSHOT_CACHE_CONTROL,
     )
-    return jsonify({"events": events}), 200
 
 
-@app.route("/report", methods=["POST"])
+@app.route("/screenshot", methods=["POST"])
 @token_required
 @swag_from({
-    "summary": "Генерация CSV-отчета по событиям мониторинга",
-    "tags": ["events"],
+    "summary": "Получение скриншота веб-страницы по URL",
+    "tags": ["screenshot"],
     "security": [{"Bearer": []}],
     "consumes": ["application/json"],
-    "produces": ["text/csv"],
+    "produces": ["application/json"],
     "parameters": [
         {
             "name": "body",
@@ -3337,20 +4245,12 @@ def get_filtred_events():
             "required": True,
             "schema": {
                 "type": "object",
+                "required": ["url"],
                 "properties": {
-                    "event_ids": {
-                        "type": "array",
-                        "items": {
-                            "type": "string"
-                        },
-                        "description": "Список идентификаторов событий для отчета"
-                    },
-                    "snapshot_ids": {
-                        "type": "array",
-                        "items": {
-                            "type": "string"
-                        },
-                        "description": "Список идентификаторов снимков для отчета"
+                    "url": {
+                        "type": "string",
+                        "description": "URL веб-страницы для скриншота",
+                        "example": "https://example.com"
                     }
                 }
             }
@@ -3365,14 +4265,20 @@ def get_filtred_events():
     ],
     "responses": {
         200: {
-            "description": "CSV-отчет по событиям мониторинга",
+            "description": "Скриншот веб-страницы в формате base64",
             "schema": {
-                "type": "file",
-                "format": "text/csv"
+                "type": "object",
+                "properties": {
+                    "screenshot": {
+                        "type": "string",
+                        "format": "byte",
+                        "description": "Изображение скриншота в кодировке base64"
+                    }
+                }
             }
         },
         400: {
-            "description": "Ошибка в параметрах запроса",
+            "description": "Ошибка в запросе или неверный URL",
             "schema": {
                 "type": "object",
                 "properties": {
@@ -3397,102 +4303,44 @@ def get_filtred_events():
                     "error": {"type": "string"}
                 }
             }
-        },
-        404: {
-            "description": "Событие или снимок не найден",
-            "schema": {
-                "type": "object",
-                "properties": {
-                    "error": {"type": "string"}
-                }
-            }
         }
     }
 })
-def generate_repot():
+def get_screenshot():
     body = request.get_json()
-    event_ids = body.get("event_ids")
-    snapshot_ids = body.get("snapshot_ids")
-    if event_ids is not None:
-        if not isinstance(event_ids, list):
-            return jsonify({"error": "event_ids should be list"}), 400
-        for event_id in event_ids:
-            event = get_monitoring_event_by_id(cfg.postgres, event_id)
-            if event is None:
-                return jsonify({"error": f"event {event_id} not found"}), 404
-    if snapshot_ids is not None:
-        if not isinstance(snapshot_ids, list):
-            return jsonify({"error": "snapshot_ids should be list"}), 400
-        for snapshot_id in snapshot_ids:
-            if not isinstance(snapshot_id, str):
-                return jsonify({"error": "snapshot_ids should be list of strings"}), 400
-            if (
-                get_object_created_at(cfg.s3, "images", snapshot_id + ".png") is None
-                and get_object_created_at(cfg.s3, "htmls", snapshot_id + ".html")
-                is None
-            ):
-                return jsonify({"error": f"snapshot {snapshot_id} not found"}), 404
-    if (request.args.get("offset") is not None) != (request.args.get("limit") is not None):
-        return jsonify({"error": "offset and limit should be used together"}), 400
-    filtred_events = filter_monitoring_events_for_report(
-        cfg.postgres,
-        snapshot_ids,
-        event_ids,
-        request.args.get("offset"),
-        request.args.get("limit")
-    )
-    event_types_by_snapshot = dict()
-    if snapshot_ids is not None:
-        for snapshot_id in snapshot_ids:
-            event_types_by_snapshot[snapshot_id] = {
-                "image": False,
-                "text": False,
-                "resource_id": snapshot_id[:-2],
-            }
-    for event in filtred_events:
-        if event.snapshot_id not in event_types_by_snapshot:
-            event_types_by_snapshot[event.snapshot_id] = {
-                "image": False,
-                "text": False,
-                "resource_id": event.resource_id,
-            }
-        if "image" in event.name:
-            event_types_by_snapshot[event.snapshot_id]["image"] = True
-        else:
-            event_types_by_snapshot[event.snapshot_id]["text"] = True
+    url = body.get("url")
+    if url is None:
+        return jsonify({"error": "url is required"}), 400
+    if not validate_url(url):
+        return jsonify({"error": "invalid url"}), 400
+    screenshot = get_url_image_base_64(url)
+    return jsonify({"screenshot": screenshot}), 200
 
-    csv_output = io.StringIO()
-    csv_writer = csv.writer(csv_output)
-    csv_writer.writerow(["resource_id", "snapshot_id", "time", "image", "text"])
-    for snapshot_id in event_types_by_snapshot.keys():
-        snapshot_time = get_object_created_at(cfg.s3, "images", snapshot_id + ".png")
-        if snapshot_time is None:
-            snapshot_time = get_object_created_at(
-                cfg.s3, "htmls", snapshot_id + ".html"
-            )
-        csv_writer.writerow(
-            [
-                event_types_by_snapshot[snapshot_id]["resource_id"],
-                snapshot_id,
-                snapshot_time,
-                event_types_by_snapshot[snapshot_id]["image"],
-                event_types_by_snapshot[snapshot_id]["text"],
-            ]
-        )
-    csv_content = csv_output.getvalue()
-    response = Response(
-        csv_content,
-        mimetype="text/csv",
-        headers={"Content-Disposition": "attachment;filename=data.csv"},
-    )
-    return response
 
+SCREENSHOT_JOB_MAX_WAIT = 30
 
-@app.route("/events/list", methods=["POST"])
+
+def screenshot_job_to_json(job: ScreenshotJob) -> Dict[str, Any]:
+    result = {
+        "id": job.id,
+        "url": job.url,
+        "status": job.status,
+        "created_at": job.created_at.isoformat(),
+        "finished_at": job.finished_at.isoformat() if job.finished_at is not None else None,
+    }
+    if job.status == "done":
+        result["screenshot"] = job.screenshot
+    if job.status == "failed":
+        result["error"] = job.error
+    return result
+
+
+@app.route("/screenshot/jobs", methods=["POST"])
 @token_required
 @swag_from({
-    "summary": "Получение списка событий мониторинга",
-    "tags": ["events"],
+    "summary": "Постановка задачи на получение скриншота веб-страницы",
+    "description": "Скриншот снимается в фоне ограниченным пулом браузеров. Результат для одного URL переиспользуется в течение нескольких минут.",
+    "tags": ["screenshot"],
     "security": [{"Bearer": []}],
     "consumes": ["application/json"],
     "produces": ["application/json"],
@@ -3503,20 +4351,12 @@ def generate_repot():
             "required": True,
             "schema": {
                 "type": "object",
+                "required": ["url"],
                 "properties": {
-                    "event_ids": {
-                        "type": "array",
-                        "items": {
-                            "type": "string"
-                        },
-                        "description": "Список идентификаторов событий для фильтрации"
-                    },
-                    "snapshot_ids": {
-                        "type": "array",
-                        "items": {
-                            "type": "string"
-                        },
-                        "description": "Список идентификаторов снимков для фильтрации"
+                    "url": {
+                        "type": "string",
+                        "description": "URL веб-страницы для скриншота",
+                        "example": "https://example.com"
                     }
                 }
             }
@@ -3530,45 +4370,28 @@ def generate_repot():
         }
     ],
     "responses": {
-        200: {
-            "description": "Список событий мониторинга",
+        202: {
+            "description": "Задача принята, статус доступен по адресу из заголовка Location",
             "schema": {
                 "type": "object",
                 "properties": {
-                    "events": {
-                        "type": "array",
-                        "items": {
-                            "type": "object",
-                            "properties": {
-                                "resource_id": {
-                                    "type": "string",
-                                    "description": "Идентификатор ресурса"
-                                },
-                                "snapshot_id": {
-                                    "type": "string",
-                                    "description": "Идентификатор снимка"
-                                },
-                                "snapshot_time": {
-                                    "type": "string",
-                                    "format": "date-time",
-                                    "description": "Время создания снимка"
-                                },
-                                "image_changed": {
-                                    "type": "boolean",
-                                    "description": "Флаг изменения изображения"
-                                },
-                                "text_changed": {
-                                    "type": "boolean",
-                                    "description": "Флаг изменения текста"
-                                }
-                            }
+                    "job": {
+                        "type": "object",
+                        "properties": {
+                            "id": {"type": "string"},
+                            "url": {"type": "string"},
+                            "status": {"type": "string", "enum": ["queued", "running", "done", "failed"]},
+                            "created_at": {"type": "string", "format": "date-time"},
+                            "finished_at": {"type": "string", "format": "date-time"},
+                            "screenshot": {"type": "string", "format": "byte", "description": "Изображение скриншота в кодировке base64, только для статуса done"},
+                            "error": {"type": "string", "description": "Причина ошибки, только для статуса failed"}
                         }
                     }
                 }
             }
         },
         400: {
-            "description": "Ошибка в параметрах запроса",
+            "description": "Ошибка в запросе или неверный URL",
             "schema": {
                 "type": "object",
                 "properties": {
@@ -3594,8 +4417,8 @@ def generate_repot():
                 }
             }
         },
-        404: {
-            "description": "Событие или снимок не найден",
+        503: {
+            "description": "Очередь задач переполнена",
             "schema": {
                 "type": "object",
                 "properties": {
@@ -3605,80 +4428,45 @@ def generate_repot():
         }
     }
 })
-def get_events_list():
+def create_screenshot_job():
     body = request.get_json()
-    event_ids = body.get("event_ids")
-    snapshot_ids = body.get("snapshot_ids")
-    if event_ids is not None:
-        if not isinstance(event_ids, list):
-            return jsonify({"error": "event_ids should be list"}), 400
-        for event_id in event_ids:
-            event = get_monitoring_event_by_id(cfg.postgres, event_id)
-            if event is None:
-                return jsonify({"error": f"event {event_id} not found"}), 404
-    if snapshot_ids is not None:
-        if not isinstance(snapshot_ids, list):
-            return jsonify({"error": "snapshot_ids should be list"}), 400
-        for snapshot_id in snapshot_ids:
-            if not isinstance(snapshot_id, str):
-                return jsonify({"error": "snapshot_ids should be list of strings"}), 400
-            if (
-                get_object_created_at(cfg.s3, "images", snapshot_id + ".png") is None
-                and get_object_created_at(cfg.s3, "htmls", snapshot_id + ".html")
-                is None
-            ):
-                return jsonify({"error": f"snapshot {snapshot_id} not found"}), 404
-    if (body.get("offset") is not None) != (body.get("limit") is not None):
-        return jsonify({"error": "offset and limit should be used together"}), 400
-    filtred_events = filter_monitoring_events_for_report(
-        cfg.postgres, snapshot_ids, event_ids, body.get("offset"), body.get("limit")
-    )
-    event_types_by_snapshot = dict()
-    if snapshot_ids is not None:
-        for snapshot_id in snapshot_ids:
-            event_types_by_snapshot[snapshot_id] = {
-                "image": False,
-                "text": False,
-                "resource_id": snapshot_id[:-2],
-            }
-    for event in filtred_events:
-        if event.snapshot_id not in event_types_by_snapshot:
-            event_types_by_snapshot[event.snapshot_id] = {
-                "image": False,
-                "text": False,
-                "resource_id": event.resource_id,
-            }
-        if "image" in event.name:
-            event_types_by_snapshot[event.snapshot_id]["image"] = True
-        else:
-            event_types_by_snapshot[event.snapshot_id]["text"] = True
-
-    result = []
-    for snapshot_id in event_types_by_snapshot.keys():
-        snapshot_time = get_object_created_at(cfg.s3, "images", snapshot_id + ".png")
-        if snapshot_time is None:
-            snapshot_time = get_object_created_at(
-                cfg.s3, "htmls", snapshot_id + ".html"
-            )
-        result.append(
-            {
-                "resource_id": event_types_by_snapshot[snapshot_id]["resource_id"],
-                "snapshot_id": snapshot_id,
-                "snapshot_time": snapshot_time,
-                "image_changed": event_types_by_snapshot[snapshot_id]["image"],
-                "text_changed": event_types_by_snapshot[snapshot_id]["text"],
-            }
-        )
-    return jsonify({"events": result}), 200
+    url = body.get("url")
+    if url is None:
+        return jsonify({"error": "url is required"}), 400
+    if not validate_url(url):
+        return jsonify({"error": "invalid url"}), 400
+    job = submit_screenshot_job(url, get_url_image_base_64)
+    if job is None:
+        response = jsonify({"error": "screenshot queue is full"})
+        response.headers["Retry-After"] = "10"
+        return response, 503
+    response = jsonify({"job": screenshot_job_to_json(job)})
+    response.headers["Location"] = f"/screenshot/jobs/{job.id}"
+    return response, 202
 
 
-@app.route("/events/all", methods=["GET"])
+@app.route("/screenshot/jobs/<job_id>", methods=["GET"])
 @token_required
 @swag_from({
-    "summary": "Получение всех событий мониторинга",
-    "tags": ["events"],
+    "summary": "Получение статуса и результата задачи на скриншот",
+    "tags": ["screenshot"],
     "security": [{"Bearer": []}],
+    "produces": ["application/json"],
     "parameters": [
+        {
+            "name": "job_id",
+            "in": "path",
+            "type": "string",
+            "required": True,
+            "description": "ID задачи"
+        },
+        {
+            "name": "wait",
+            "in": "query",
+            "type": "integer",
+            "required": False,
+            "description": f"Сколько секунд ждать завершения задачи перед ответом (не более {SCREENSHOT_JOB_MAX_WAIT})"
+        },
         {
             "name": "Authorization",
             "in": "header",
@@ -3687,23 +4475,36 @@ def get_events_list():
             "description": "JWT токен в формате 'bearer: {token}'"
         }
     ],
-    "produces": ["application/json"],
     "responses": {
         200: {
-            "description": "Список всех событий мониторинга",
+            "description": "Задача",
             "schema": {
                 "type": "object",
                 "properties": {
-                    "events": {
-                        "type": "array",
-                        "items": {
-                            "type": "object",
-                            "description": "Событие мониторинга"
+                    "job": {
+                        "type": "object",
+                        "properties": {
+                            "id": {"type": "string"},
+                            "url": {"type": "string"},
+                            "status": {"type": "string", "enum": ["queued", "running", "done", "failed"]},
+                            "created_at": {"type": "string", "format": "date-time"},
+                            "finished_at": {"type": "string", "format": "date-time"},
+                            "screenshot": {"type": "string", "format": "byte", "description": "Изображение скриншота в кодировке base64, только для статуса done"},
+                            "error": {"type": "string", "description": "Причина ошибки, только для статуса failed"}
                         }
                     }
                 }
             }
         },
+        400: {
+            "description": "Неверный формат параметров",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        },
         401: {
             "description": "Ошибка авторизации",
             "schema": {
@@ -3721,22 +4522,1371 @@ def get_events_list():
                     "error": {"type": "string"}
                 }
             }
-        }
-    }
-})
-def get_all_events():
-    if (request.args.get("offset") is not None) != (request.args.get("limit") is not None):
-        return jsonify({"error": "offset and limit should be used together"}), 400
-    events = filter_monitoring_events(
+        },
+        404: {
+            "description": "Задача не найдена или устарела",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        }
+    }
+})
+def get_screenshot_job_status(job_id: str):
+    if not validate_uuid(job_id):
+        return jsonify({"error": "job_id is invalid"}), 400
+    wait = request.args.get("wait", "0")
+    if not wait.isdigit():
+        return jsonify({"error": "wait is invalid"}), 400
+    job = get_screenshot_job(job_id, min(int(wait), SCREENSHOT_JOB_MAX_WAIT))
+    if job is None:
+        return jsonify({"error": f"job {job_id} not found"}), 404
+    return jsonify({"job": screenshot_job_to_json(job)}), 200
+
+
+@app.route("/events/filter", methods=["POST"])
+@token_required
+@swag_from({
+    "summary": "Получение отфильтрованных событий мониторинга",
+    "tags": ["events"],
+    "security": [{"Bearer": []}],
+    "consumes": ["application/json"],
+    "produces": ["application/json"],
+    "parameters": [
+        {
+            "name": "body",
+            "in": "body",
+            "required": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "resource_ids": {
+                        "type": "array",
+                        "items": {
+                            "type": "string",
+                            "format": "uuid"
+                        },
+                        "description": "Список идентификаторов ресурсов для фильтрации"
+                    },
+                    "start_time": {
+                        "type": "string",
+                        "format": "date-time",
+                        "description": "Время начала периода фильтрации"
+                    },
+                    "end_time": {
+                        "type": "string",
+                        "format": "date-time",
+                        "description": "Время окончания периода фильтрации"
+                    },
+                    "event_type": {
+                        "type": "string",
+                        "enum": ["keyword", "image"],
+                        "description": "Тип события мониторинга"
+                    }
+                }
+            }
+        },
+        {
+            "name": "Authorization",
+            "in": "header",
+            "required": True,
+            "type": "string",
+            "description": "JWT токен в формате 'bearer: {token}'"
+        },
+        {
+            "name": "cursor",
+            "in": "query",
+            "required": False,
+            "type": "string",
+            "description": "Курсор следующей страницы из поля next_cursor предыдущего ответа"
+        },
+        {
+            "name": "limit",
+            "in": "query",
+            "required": False,
+            "type": "integer",
+            "description": "Размер страницы (ограничен настройкой сервера max_page_size)"
+        },
+        {
+            "name": "offset",
+            "in": "query",
+            "required": False,
+            "type": "integer",
+            "description": "Смещение (устарело, используйте cursor)"
+        }
+    ],
+    "responses": {
+        200: {
+            "description": "Список отфильтрованных событий мониторинга",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "events": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "description": "Событие мониторинга"
+                        }
+                    },
+                    "next_cursor": {"type": "string", "description": "Курсор следующей страницы, null если страниц больше нет"}
+                }
+            }
+        },
+        400: {
+            "description": "Ошибка в параметрах запроса",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        },
+        401: {
+            "description": "Ошибка авторизации",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        },
+        403: {
+            "description": "Доступ запрещен",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        }
+    }
+})
+def get_filtred_events():
+    body = request.get_json()
+    resource_ids = body.get("resource_ids")
+    if resource_ids is not None:
+        if type(resource_ids) is not list:
+            return jsonify({"error": "resource_ids should be list"}), 400
+        for resource_id in resource_ids:
+            if not validate_uuid(resource_id):
+                return jsonify({"error": "invalid resource_id value"}), 400
+    start_time = body.get("start_time")
+    if start_time is not None:
+        start_time = validate_date_time(start_time)
+        if start_time is None:
+            return jsonify({"error": "start_time is invalid"}), 400
+    end_time = body.get("end_time")
+    if end_time is not None:
+        end_time = validate_date_time(end_time)
+        if end_time is None:
+            return jsonify({"error": "end_time is invalid"}), 400
+    if start_time is not None and end_time is not None and start_time > end_time:
+        return jsonify({"error": "end_time is more than start_time"}), 400
+    event_type = body.get("event_type")
+    if event_type is not None and event_type not in ["keyword", "image"]:
+        return jsonify({"error", "type is invalid"}), 400
+    if request.args.get("offset") is not None and request.args.get("limit") is None:
+        return jsonify({"error": "offset and limit should be used together"}), 400
+    page, after, error = parse_events_page_args()
+    if error is not None:
+        return jsonify({"error": error}), 400
+    events = filter_monitoring_events(
+        cfg.postgres,
+        resource_ids,
+        start_time,
+        end_time,
+        event_type,
+        page.offset,
+        page.limit + 1,
+        after
+    )
+    return events_page_response(events, page)
+
+
+EVENT_STREAM_RETRY_MS = 5000
+
+
+@app.route("/events/stream", methods=["GET"])
+@token_required
+@swag_from({
+    "summary": "Поток новых событий мониторинга (Server-Sent Events)",
+    "description": "Заменяет периодический опрос /events/filter. Каждое событие передается как SSE-сообщение "
+                   "monitoring_event, его id является курсором событий. При переподключении браузер передает "
+                   "последний id в заголовке Last-Event-ID, и пропущенные события досылаются из базы. "
+                   "Если новых событий нет, раз в 15 секунд отправляется комментарий keepalive.",
+    "tags": ["events"],
+    "security": [{"Bearer": []}],
+    "produces": ["text/event-stream"],
+    "parameters": [
+        {
+            "name": "resource_id",
+            "in": "query",
+            "required": False,
+            "type": "array",
+            "items": {"type": "string", "format": "uuid"},
+            "collectionFormat": "multi",
+            "description": "Идентификаторы ресурсов, события которых нужно получать (по умолчанию все)"
+        },
+        {
+            "name": "event_type",
+            "in": "query",
+            "required": False,
+            "type": "string",
+            "enum": ["keyword", "image"],
+            "description": "Тип событий мониторинга"
+        },
+        {
+            "name": "Last-Event-ID",
+            "in": "header",
+            "required": False,
+            "type": "string",
+            "description": "id последнего полученного события, события после него будут отправлены первыми"
+        },
+        {
+            "name": "Authorization",
+            "in": "header",
+            "required": True,
+            "type": "string",
+            "description": "JWT токен в формате 'bearer: {token}'"
+        }
+    ],
+    "responses": {
+        200: {
+            "description": "Поток событий в формате text/event-stream"
+        },
+        400: {
+            "description": "Ошибка в параметрах запроса",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        },
+        401: {
+            "description": "Ошибка авторизации",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        },
+        403: {
+            "description": "Доступ запрещен",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        },
+        503: {
+            "description": "Достигнуто максимальное количество подписчиков",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        }
+    }
+})
+def get_event_stream():
+    resource_ids = request.args.getlist("resource_id") or None
+    if resource_ids is not None:
+        for resource_id in resource_ids:
+            if not validate_uuid(resource_id):
+                return jsonify({"error": "invalid resource_id value"}), 400
+    event_type = request.args.get("event_type")
+    if event_type is not None and event_type not in ["keyword", "image"]:
+        return jsonify({"error": "event_type is invalid"}), 400
+    after = None
+    last_event_id = request.headers.get("Last-Event-ID")
+    if last_event_id:
+        after = decode_cursor(last_event_id, 2)
+        if after is None:
+            return jsonify({"error": "Last-Event-ID is invalid"}), 400
+        try:
+            after = (datetime.datetime.fromisoformat(after[0]), after[1])
+        except ValueError:
+            return jsonify({"error": "Last-Event-ID is invalid"}), 400
+    subscription = subscribe(cfg.postgres, resource_ids, event_type)
+    if subscription is None:
+        response = jsonify({"error": "too many event stream subscribers"})
+        response.headers["Retry-After"] = str(EVENT_STREAM_RETRY_MS // 1000)
+        return response, 503
+
+    def generate():
+        try:
+            yield f"retry: {EVENT_STREAM_RETRY_MS}\n\n"
+            for event in stream_events(cfg.postgres, subscription, after):
+                if event is None:
+                    # lets proxies keep the connection and reveals disconnected clients
+                    yield ": keepalive\n\n"
+                    continue
+                yield (
+                    f"id: {encode_cursor(event.created_at, event.id)}\n"
+                    f"event: monitoring_event\n"
+                    f"data: {app.json.dumps(event)}\n\n"
+                )
+        finally:
+            unsubscribe(subscription)
+
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+ANALYTICS_BUCKETS = ["hour", "day", "week"]
+
+
+@app.route("/events/analytics", methods=["POST"])
+@token_required
+@swag_from({
+    "summary": "Количество событий мониторинга по ресурсам, типам и интервалам времени",
+    "description": "Считается по почасовым агрегатам, поэтому границы интервала учитываются с точностью до часа. Время интервалов в UTC.",
+    "tags": ["events"],
+    "security": [{"Bearer": []}],
+    "consumes": ["application/json"],
+    "produces": ["application/json"],
+    "parameters": [
+        {
+            "name": "body",
+            "in": "body",
+            "required": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "resource_ids": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "ID ресурсов, по умолчанию все ресурсы"
+                    },
+                    "start_time": {
+                        "type": "integer",
+                        "description": "Unix timestamp начала интервала"
+                    },
+                    "end_time": {
+                        "type": "integer",
+                        "description": "Unix timestamp конца интервала"
+                    },
+                    "event_type": {
+                        "type": "string",
+                        "enum": ["keyword", "image"],
+                        "description": "Тип событий, по умолчанию все типы"
+                    },
+                    "bucket": {
+                        "type": "string",
+                        "enum": ANALYTICS_BUCKETS,
+                        "description": "Размер интервала, по умолчанию day"
+                    }
+                }
+            }
+        },
+        {
+            "name": "Authorization",
+            "in": "header",
+            "required": True,
+            "type": "string",
+            "description": "JWT токен в формате 'bearer: {token}'"
+        }
+    ],
+    "responses": {
+        200: {
+            "description": "Количество событий, интервалы без событий не возвращаются",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "bucket": {"type": "string"},
+                    "counts": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "resource_id": {"type": "string"},
+                                "type": {"type": "string", "enum": ["keyword", "image"]},
+                                "time": {"type": "string", "format": "date-time", "description": "Начало интервала"},
+                                "count": {"type": "integer"}
+                            }
+                        }
+                    }
+                }
+            }
+        },
+        400: {
+            "description": "Неверный формат параметров",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        },
+        401: {
+            "description": "Ошибка авторизации",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        },
+        403: {
+            "description": "Доступ запрещен",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        }
+    }
+})
+def get_events_analytics():
+    body = request.get_json()
+    resource_ids = body.get("resource_ids")
+    if resource_ids is not None:
+        if type(resource_ids) is not list:
+            return jsonify({"error": "resource_ids should be list"}), 400
+        for resource_id in resource_ids:
+            if not validate_uuid(resource_id):
+                return jsonify({"error": "invalid resource_id value"}), 400
+    start_time = body.get("start_time")
+    if start_time is not None:
+        start_time = validate_date_time(start_time)
+        if start_time is None:
+            return jsonify({"error": "start_time is invalid"}), 400
+    end_time = body.get("end_time")
+    if end_time is not None:
+        end_time = validate_date_time(end_time)
+        if end_time is None:
+            return jsonify({"error": "end_time is invalid"}), 400
+    if start_time is not None and end_time is not None and start_time > end_time:
+        return jsonify({"error": "end_time is more than start_time"}), 400
+    event_type = body.get("event_type")
+    if event_type is not None and event_type not in ["keyword", "image"]:
+        return jsonify({"error": "event_type is invalid"}), 400
+    bucket = body.get("bucket", "day")
+    if bucket not in ANALYTICS_BUCKETS:
+        return jsonify({"error": "bucket is invalid"}), 400
+    counts = get_monitoring_event_counts(cfg.postgres, resource_ids, start_time, end_time, event_type, bucket)
+    return jsonify(
+        {
+            "bucket": bucket,
+            "counts": [
+                {
+                    "resource_id": count.resource_id,
+                    "type": count.type,
+                    "time": count.time.isoformat(),
+                    "count": count.count,
+                }
+                for count in counts
+            ],
+        }
+    ), 200
+
+
+def resolve_snapshot_times(snapshot_ids: List[str]) -> Dict[str, Any]:
+    # snapshots table is filled by the daemon, objects captured before it
+    # existed are resolved by S3 metadata requests
+    if len(snapshot_ids) == 0:
+        return {}
+    times = get_snapshot_times(cfg.postgres, snapshot_ids)
+    missing = [snapshot_id for snapshot_id in snapshot_ids if snapshot_id not in times]
+    times.update(resolve_snapshot_times_from_s3(missing))
+    return times
+
+
+def resolve_snapshot_times_from_s3(snapshot_ids: List[str]) -> Dict[str, Any]:
+    times = dict()
+    if len(snapshot_ids) > 0:
+        images = get_objects_created_at(cfg.s3, "images", [snapshot_id + ".png" for snapshot_id in snapshot_ids])
+        for snapshot_id in snapshot_ids:
+            if snapshot_id + ".png" in images:
+                times[snapshot_id] = images[snapshot_id + ".png"]
+    missing = [snapshot_id for snapshot_id in snapshot_ids if snapshot_id not in times]
+    if len(missing) > 0:
+        htmls = get_objects_created_at(cfg.s3, "htmls", [snapshot_id + ".html" for snapshot_id in missing])
+        for snapshot_id in missing:
+            if snapshot_id + ".html" in htmls:
+                times[snapshot_id] = htmls[snapshot_id + ".html"]
+    return times
+
+
+def validate_report_ids(event_ids: Any, snapshot_ids: Any) -> Tuple[Dict[str, Any], Optional[Tuple[Response, int]]]:
+    if event_ids is not None:
+        if not isinstance(event_ids, list):
+            return {}, (jsonify({"error": "event_ids should be list"}), 400)
+        if not all(isinstance(event_id, str) for event_id in event_ids):
+            return {}, (jsonify({"error": "event_ids should be list of strings"}), 400)
+    if snapshot_ids is not None:
+        if not isinstance(snapshot_ids, list):
+            return {}, (jsonify({"error": "snapshot_ids should be list"}), 400)
+        if not all(isinstance(snapshot_id, str) for snapshot_id in snapshot_ids):
+            return {}, (jsonify({"error": "snapshot_ids should be list of strings"}), 400)
+    if event_ids:
+        existing = get_existing_monitoring_event_ids(cfg.postgres, event_ids)
+        missing = [event_id for event_id in event_ids if event_id not in existing]
+        if len(missing) > 0:
+            return {}, (jsonify({
+                "error": f"events {', '.join(missing)} not found",
+                "missing_event_ids": missing,
+            }), 404)
+    snapshot_times = resolve_snapshot_times(snapshot_ids or [])
+    missing = [snapshot_id for snapshot_id in snapshot_ids or [] if snapshot_id not in snapshot_times]
+    if len(missing) > 0:
+        return {}, (jsonify({
+            "error": f"snapshots {', '.join(missing)} not found",
+            "missing_snapshot_ids": missing,
+        }), 404)
+    return snapshot_times, None
+
+
+REPORT_CHUNK_SIZE = 500
+REPORT_FORMATS = {
+    "csv": ("text/csv", "data.csv"),
+    "ndjson": ("application/x-ndjson", "data.ndjson"),
+}
+
+
+def iter_report_chunks(rows: Iterator[ReportRow]) -> Iterator[List[ReportRow]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == REPORT_CHUNK_SIZE:
+            yield fill_report_times(chunk)
+            chunk = []
+    if len(chunk) > 0:
+        yield fill_report_times(chunk)
+
+
+def fill_report_times(rows: List[ReportRow]) -> List[ReportRow]:
+    times = resolve_snapshot_times_from_s3([row.snapshot_id for row in rows if row.snapshot_time is None])
+    for row in rows:
+        if row.snapshot_time is None:
+            row.snapshot_time = times.get(row.snapshot_id)
+    return rows
+
+
+def render_report(rows: Iterator[ReportRow], report_format: str) -> Iterator[str]:
+    if report_format == "ndjson":
+        for chunk in iter_report_chunks(rows):
+            yield "".join(
+                json.dumps({
+                    "resource_id": row.resource_id,
+                    "snapshot_id": row.snapshot_id,
+                    "time": row.snapshot_time.isoformat() if row.snapshot_time else None,
+                    "image": row.image,
+                    "text": row.text,
+                }) + "\n"
+                for row in chunk
+            )
+        return
+    csv_output = io.StringIO()
+    csv_writer = csv.writer(csv_output)
+    csv_writer.writerow(["resource_id", "snapshot_id", "time", "image", "text"])
+    for chunk in iter_report_chunks(rows):
+        for row in chunk:
+            csv_writer.writerow([row.resource_id, row.snapshot_id, row.snapshot_time, row.image, row.text])
+        yield csv_output.getvalue()
+        csv_output.seek(0)
+        csv_output.truncate()
+    yield csv_output.getvalue()
+
+
+def gzip_stream(chunks: Iterator[str]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+@app.route("/report", methods=["POST"])
+@token_required
+@swag_from({
+    "summary": "Генерация отчета по событиям мониторинга",
+    "tags": ["events"],
+    "security": [{"Bearer": []}],
+    "consumes": ["application/json"],
+    "produces": ["text/csv", "application/x-ndjson"],
+    "parameters": [
+        {
+            "name": "body",
+            "in": "body",
+            "required": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "event_ids": {
+                        "type": "array",
+                        "items": {
+                            "type": "string"
+                        },
+                        "description": "Список идентификаторов событий для отчета"
+                    },
+                    "snapshot_ids": {
+                        "type": "array",
+                        "items": {
+                            "type": "string"
+                        },
+                        "description": "Список идентификаторов снимков для отчета"
+                    }
+                }
+            }
+        },
+        {
+            "name": "Authorization",
+            "in": "header",
+            "required": True,
+            "type": "string",
+            "description": "JWT токен в формате 'bearer: {token}'"
+        },
+        {
+            "name": "format",
+            "in": "query",
+            "required": False,
+            "type": "string",
+            "enum": ["csv", "ndjson"],
+            "description": "Формат отчета, по умолчанию csv"
+        },
+        {
+            "name": "Accept-Encoding",
+            "in": "header",
+            "required": False,
+            "type": "string",
+            "description": "При значении gzip отчет передается сжатым"
+        }
+    ],
+    "responses": {
+        200: {
+            "description": "CSV или NDJSON отчет по событиям мониторинга, передается потоком",
+            "schema": {
+                "type": "file",
+                "format": "text/csv"
+            }
+        },
+        400: {
+            "description": "Ошибка в параметрах запроса",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        },
+        401: {
+            "description": "Ошибка авторизации",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        },
+        403: {
+            "description": "Доступ запрещен",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        },
+        404: {
+            "description": "События или снимки не найдены",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"},
+                    "missing_event_ids": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Все ненайденные идентификаторы событий"
+                    },
+                    "missing_snapshot_ids": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Все ненайденные идентификаторы снимков"
+                    }
+                }
+            }
+        }
+    }
+})
+def generate_repot():
+    body = request.get_json()
+    event_ids = body.get("event_ids")
+    snapshot_ids = body.get("snapshot_ids")
+    _, error = validate_report_ids(event_ids, snapshot_ids)
+    if error is not None:
+        return error
+    if (request.args.get("offset") is not None) != (request.args.get("limit") is not None):
+        return jsonify({"error": "offset and limit should be used together"}), 400
+    offset = request.args.get("offset")
+    limit = request.args.get("limit")
+    if (offset is not None and not offset.isdigit()) or (limit is not None and not limit.isdigit()):
+        return jsonify({"error": "offset and limit must be integers"}), 400
+    report_format = request.args.get("format", "csv")
+    if report_format not in REPORT_FORMATS:
+        return jsonify({"error": "format is invalid"}), 400
+    rows = iter_report_rows(
+        cfg.postgres,
+        snapshot_ids,
+        event_ids,
+        int(offset) if offset is not None else None,
+        int(limit) if limit is not None else None,
+    )
+    mimetype, file_name = REPORT_FORMATS[report_format]
+    headers = {"Content-Disposition": f"attachment;filename={file_name}"}
+    body = render_report(rows, report_format)
+    if "gzip" in request.headers.get("Accept-Encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+        body = gzip_stream(body)
+    return Response(body, mimetype=mimetype, headers=headers)
+
+
+@app.route("/events/list", methods=["POST"])
+@token_required
+@swag_from({
+    "summary": "Получение списка событий мониторинга",
+    "tags": ["events"],
+    "security": [{"Bearer": []}],
+    "consumes": ["application/json"],
+    "produces": ["application/json"],
+    "parameters": [
+        {
+            "name": "body",
+            "in": "body",
+            "required": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "event_ids": {
+                        "type": "array",
+                        "items": {
+                            "type": "string"
+                        },
+                        "description": "Список идентификаторов событий для фильтрации"
+                    },
+                    "snapshot_ids": {
+                        "type": "array",
+                        "items": {
+                            "type": "string"
+                        },
+                        "description": "Список идентификаторов снимков для фильтрации"
+                    }
+                }
+            }
+        },
+        {
+            "name": "Authorization",
+            "in": "header",
+            "required": True,
+            "type": "string",
+            "description": "JWT токен в формате 'bearer: {token}'"
+        }
+    ],
+    "responses": {
+        200: {
+            "description": "Список событий мониторинга",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "events": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "resource_id": {
+                                    "type": "string",
+                                    "description": "Идентификатор ресурса"
+                                },
+                                "snapshot_id": {
+                                    "type": "string",
+                                    "description": "Идентификатор снимка"
+                                },
+                                "snapshot_time": {
+                                    "type": "string",
+                                    "format": "date-time",
+                                    "description": "Время создания снимка"
+                                },
+                                "image_changed": {
+                                    "type": "boolean",
+                                    "description": "Флаг изменения изображения"
+                                },
+                                "text_changed": {
+                                    "type": "boolean",
+                                    "description": "Флаг изменения текста"
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        },
+        400: {
+            "description": "Ошибка в параметрах запроса",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        },
+        401: {
+            "description": "Ошибка авторизации",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        },
+        403: {
+            "description": "Доступ запрещен",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        },
+        404: {
+            "description": "События или снимки не найдены",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"},
+                    "missing_event_ids": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Все ненайденные идентификаторы событий"
+                    },
+                    "missing_snapshot_ids": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Все ненайденные идентификаторы снимков"
+                    }
+                }
+            }
+        }
+    }
+})
+def get_events_list():
+    body = request.get_json()
+    event_ids = body.get("event_ids")
+    snapshot_ids = body.get("snapshot_ids")
+    snapshot_times, error = validate_report_ids(event_ids, snapshot_ids)
+    if error is not None:
+        return error
+    if (body.get("offset") is not None) != (body.get("limit") is not None):
+        return jsonify({"error": "offset and limit should be used together"}), 400
+    filtred_events = filter_monitoring_events_for_report(
+        cfg.postgres, snapshot_ids, event_ids, body.get("offset"), body.get("limit")
+    )
+    event_types_by_snapshot = dict()
+    if snapshot_ids is not None:
+        for snapshot_id in snapshot_ids:
+            event_types_by_snapshot[snapshot_id] = {
+                "image": False,
+                "text": False,
+                "resource_id": snapshot_id[:-2],
+            }
+    for event in filtred_events:
+        if event.snapshot_id not in event_types_by_snapshot:
+            event_types_by_snapshot[event.snapshot_id] = {
+                "image": False,
+                "text": False,
+                "resource_id": event.resource_id,
+            }
+        if "image" in event.name:
+            event_types_by_snapshot[event.snapshot_id]["image"] = True
+        else:
+            event_types_by_snapshot[event.snapshot_id]["text"] = True
+
+    result = []
+    missing = [snapshot_id for snapshot_id in event_types_by_snapshot if snapshot_id not in snapshot_times]
+    snapshot_times.update(resolve_snapshot_times(missing))
+    for snapshot_id in event_types_by_snapshot.keys():
+        snapshot_time = snapshot_times.get(snapshot_id)
+        result.append(
+            {
+                "resource_id": event_types_by_snapshot[snapshot_id]["resource_id"],
+                "snapshot_id": snapshot_id,
+                "snapshot_time": snapshot_time,
+                "image_changed": event_types_by_snapshot[snapshot_id]["image"],
+                "text_changed": event_types_by_snapshot[snapshot_id]["text"],
+            }
+        )
+    return jsonify({"events": result}), 200
+
+
+@app.route("/events/all", methods=["GET"])
+@token_required
+@swag_from({
+    "summary": "Получение всех событий мониторинга",
+    "tags": ["events"],
+    "security": [{"Bearer": []}],
+    "parameters": [
+        {
+            "name": "Authorization",
+            "in": "header",
+            "required": True,
+            "type": "string",
+            "description": "JWT токен в формате 'bearer: {token}'"
+        },
+        {
+            "name": "cursor",
+            "in": "query",
+            "required": False,
+            "type": "string",
+            "description": "Курсор следующей страницы из поля next_cursor предыдущего ответа"
+        },
+        {
+            "name": "limit",
+            "in": "query",
+            "required": False,
+            "type": "integer",
+            "description": "Размер страницы (ограничен настройкой сервера max_page_size)"
+        },
+        {
+            "name": "offset",
+            "in": "query",
+            "required": False,
+            "type": "integer",
+            "description": "Смещение (устарело, используйте cursor)"
+        }
+    ],
+    "produces": ["application/json"],
+    "responses": {
+        200: {
+            "description": "Список всех событий мониторинга",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "events": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "description": "Событие мониторинга"
+                        }
+                    },
+                    "next_cursor": {"type": "string", "description": "Курсор следующей страницы, null если страниц больше нет"}
+                }
+            }
+        },
+        400: {
+            "description": "Ошибка в параметрах пагинации",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        },
+        401: {
+            "description": "Ошибка авторизации",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        },
+        403: {
+            "description": "Доступ запрещен",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        }
+    }
+})
+def get_all_events():
+    if request.args.get("offset") is not None and request.args.get("limit") is None:
+        return jsonify({"error": "offset and limit should be used together"}), 400
+    page, after, error = parse_events_page_args()
+    if error is not None:
+        return jsonify({"error": error}), 400
+    events = filter_monitoring_events(
         cfg.postgres,
         None,
         None,
         None,
         None,
-        request.args.get("offset"),
-        request.args.get("limit")
+        page.offset,
+        page.limit + 1,
+        after
     )
-    return jsonify({"events": events}), 200
+    return events_page_response(events, page)
+
+
+def host_breaker_to_json(breaker: HostBreaker) -> Dict[str, Any]:
+    return {
+        "host": breaker.host,
+        "state": breaker.state,
+        "failures": breaker.failures,
+        "opened_until": int(breaker.opened_until.timestamp()) if breaker.opened_until else None,
+        "last_error": breaker.last_error,
+        "updated_at": int(breaker.updated_at.timestamp()) if breaker.updated_at else None,
+    }
+
+
+@app.route("/breakers", methods=["GET"])
+@token_required
+@swag_from({
+    "summary": "Получение состояния предохранителей проверок по хостам",
+    "tags": ["resources"],
+    "security": [{"Bearer": []}],
+    "parameters": [
+        {
+            "name": "state",
+            "in": "query",
+            "type": "string",
+            "enum": ["closed", "open", "half_open"],
+            "required": False,
+            "description": "Фильтр по состоянию предохранителя"
+        },
+        {
+            "name": "Authorization",
+            "in": "header",
+            "required": True,
+            "type": "string",
+            "description": "JWT токен в формате 'bearer: {token}'"
+        }
+    ],
+    "produces": ["application/json"],
+    "responses": {
+        200: {
+            "description": "Список предохранителей",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "breakers": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "host": {"type": "string", "description": "Хост ресурса"},
+                                "state": {"type": "string", "enum": ["closed", "open", "half_open"], "description": "Состояние предохранителя"},
+                                "failures": {"type": "integer", "description": "Количество неудачных проверок подряд"},
+                                "opened_until": {"type": "integer", "description": "Unix timestamp, до которого проверки хоста пропускаются"},
+                                "last_error": {"type": "string", "description": "Ошибка последней неудачной проверки"},
+                                "updated_at": {"type": "integer", "description": "Unix timestamp последнего изменения состояния"}
+                            }
+                        }
+                    }
+                }
+            }
+        },
+        400: {
+            "description": "Неверное состояние предохранителя",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        },
+        401: {
+            "description": "Ошибка авторизации",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        },
+        403: {
+            "description": "Доступ запрещен",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        }
+    }
+})
+def get_breakers():
+    state = request.args.get("state")
+    if state is not None and state not in ["closed", "open", "half_open"]:
+        return jsonify({"error": "state is invalid"}), 400
+    breakers = get_all_host_breakers(cfg.postgres, state)
+    return jsonify({"breakers": [host_breaker_to_json(breaker) for breaker in breakers]}), 200
+
+
+@app.route("/resources/<resource_id>/breaker", methods=["GET"])
+@token_required
+@swag_from({
+    "summary": "Получение состояния предохранителя проверок для хоста ресурса",
+    "tags": ["resources"],
+    "security": [{"Bearer": []}],
+    "parameters": [
+        {
+            "name": "resource_id",
+            "in": "path",
+            "type": "string",
+            "format": "uuid",
+            "required": True,
+            "description": "Идентификатор ресурса"
+        },
+        {
+            "name": "Authorization",
+            "in": "header",
+            "required": True,
+            "type": "string",
+            "description": "JWT токен в формате 'bearer: {token}'"
+        }
+    ],
+    "produces": ["application/json"],
+    "responses": {
+        200: {
+            "description": "Состояние предохранителя",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "breaker": {
+                            "type": "object",
+                            "properties": {
+                                "host": {"type": "string", "description": "Хост ресурса"},
+                                "state": {"type": "string", "enum": ["closed", "open", "half_open"], "description": "Состояние предохранителя"},
+                                "failures": {"type": "integer", "description": "Количество неудачных проверок подряд"},
+                                "opened_until": {"type": "integer", "description": "Unix timestamp, до которого проверки хоста пропускаются"},
+                                "last_error": {"type": "string", "description": "Ошибка последней неудачной проверки"},
+                                "updated_at": {"type": "integer", "description": "Unix timestamp последнего изменения состояния"}
+                            }
+                        }
+                }
+            }
+        },
+        400: {
+            "description": "Неверный формат идентификатора ресурса",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        },
+        401: {
+            "description": "Ошибка авторизации",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        },
+        403: {
+            "description": "Доступ запрещен",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        },
+        404: {
+            "description": "Ресурс не найден",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        }
+    }
+})
+def get_resource_breaker(resource_id: str):
+    if not validate_uuid(resource_id):
+        return jsonify({"error": "resource_id is invalid"}), 400
+    resource = get_resource_by_id(cfg.postgres, resource_id)
+    if resource is None:
+        return jsonify({"error": f"resource {resource_id} not found"}), 404
+    host = urllib.parse.urlparse(resource.url).hostname or resource.url
+    breaker = get_host_breaker(cfg.postgres, host)
+    if breaker is None:
+        return jsonify(
+            {
+                "breaker": {
+                    "host": host,
+                    "state": "closed",
+                    "failures": 0,
+                    "opened_until": None,
+                    "last_error": None,
+                    "updated_at": None,
+                }
+            }
+        ), 200
+    return jsonify({"breaker": host_breaker_to_json(breaker)}), 200
+
+
+@app.route("/metrics", methods=["GET"])
+@token_required
+@swag_from({
+    "summary": "Получение метрик сервиса мониторинга",
+    "tags": ["system"],
+    "security": [{"Bearer": []}],
+    "parameters": [
+        {
+            "name": "since",
+            "in": "query",
+            "type": "integer",
+            "required": False,
+            "description": "Unix timestamp, начиная с которого учитываются снятия страниц"
+        },
+        {
+            "name": "Authorization",
+            "in": "header",
+            "required": True,
+            "type": "string",
+            "description": "JWT токен в формате 'bearer: {token}'"
+        }
+    ],
+    "produces": ["application/json"],
+    "responses": {
+        200: {
+            "description": "Метрики сервиса",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "captures": {
+                        "type": "object",
+                        "properties": {
+                            "performed": {"type": "integer", "description": "Количество снятий страниц браузером"},
+                            "reused": {"type": "integer", "description": "Количество проверок, переиспользовавших снятие другого ресурса с тем же URL"}
+                        }
+                    },
+                    "postgres_pool": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "database": {"type": "string"},
+                                "min_size": {"type": "integer"},
+                                "max_size": {"type": "integer"},
+                                "in_use": {"type": "integer", "description": "Количество выданных соединений"},
+                                "checkouts": {"type": "integer", "description": "Количество выдач соединений"},
+                                "timeouts": {"type": "integer", "description": "Количество ожиданий соединения, завершившихся по таймауту"},
+                                "total_wait_ms": {"type": "number", "description": "Суммарное время ожидания свободного соединения"},
+                                "max_wait_ms": {"type": "number", "description": "Максимальное время ожидания свободного соединения"}
+                            }
+                        }
+                    },
+                    "screenshot_queue": {
+                        "type": "object",
+                        "description": "Состояние очереди задач на скриншот",
+                        "properties": {
+                            "workers": {"type": "integer", "description": "Количество браузеров, работающих одновременно"},
+                            "queue_size": {"type": "integer", "description": "Максимальное количество незавершенных задач"},
+                            "queued": {"type": "integer", "description": "Количество задач, ожидающих браузер"},
+                            "running": {"type": "integer", "description": "Количество выполняемых задач"},
+                            "completed": {"type": "integer"},
+                            "failed": {"type": "integer"},
+                            "rejected": {"type": "integer", "description": "Количество задач, отклоненных из-за переполнения очереди"},
+                            "cache_hits": {"type": "integer", "description": "Количество задач, выполненных из кэша по URL"}
+                        }
+                    },
+                    "event_stream": {
+                        "type": "object",
+                        "description": "Состояние потока событий /events/stream",
+                        "properties": {
+                            "subscribers": {"type": "integer", "description": "Количество открытых подключений"},
+                            "listening": {"type": "boolean", "description": "Подписано ли приложение на уведомления postgres"},
+                            "delivered": {"type": "integer"},
+                            "dropped": {"type": "integer", "description": "Количество уведомлений, не поместившихся в очередь медленного клиента и дочитанных из базы"},
+                            "rejected": {"type": "integer", "description": "Количество подключений, отклоненных из-за лимита подписчиков"}
+                        }
+                    },
+                    "cache": {
+                        "type": "object",
+                        "description": "Попадания и промахи redis-кэша ресурсов и каналов",
+                        "additionalProperties": {
+                            "type": "object",
+                            "properties": {
+                                "hits": {"type": "integer"},
+                                "misses": {"type": "integer"},
+                                "errors": {"type": "integer", "description": "Количество ошибок redis, при которых данные читались из базы"}
+                            }
+                        }
+                    },
+                    "latency": {
+                        "type": "object",
+                        "description": "Задержки операций (например, redis.check_jwts): количество, суммарное и максимальное время в мс",
+                        "additionalProperties": {
+                            "type": "object",
+                            "properties": {
+                                "count": {"type": "integer"},
+                                "total_ms": {"type": "number"},
+                                "max_ms": {"type": "number"}
+                            }
+                        }
+                    }
+                }
+            }
+        },
+        400: {
+            "description": "Неверный формат параметров",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        },
+        401: {
+            "description": "Ошибка авторизации",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        },
+        403: {
+            "description": "Доступ запрещен",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        }
+    }
+})
+def get_metrics():
+    since = request.args.get("since")
+    if since is not None:
+        if not since.isdigit():
+            return jsonify({"error": "since is invalid"}), 400
+        since = validate_date_time(int(since))
+        if since is None:
+            return jsonify({"error": "since is invalid"}), 400
+    capture_stats = get_capture_stats(cfg.postgres, since)
+    return jsonify(
+        {
+            "captures": {
+                "performed": capture_stats.captures,
+                "reused": capture_stats.reused,
+            },
+            "postgres_pool": [asdict(stats) for stats in get_pool_stats()],
+            "latency": {name: asdict(stats) for name, stats in get_latency_stats().items()},
+            "screenshot_queue": asdict(get_screenshot_queue_stats()),
+            "event_stream": asdict(get_event_stream_stats()),
+            "cache": {name: asdict(stats) for name, stats in get_cache_stats().items()},
+        }
+    ), 200
 
 
 # swagger endpoint
@@ -3789,4 +5939,6 @@ def swagger_ui():
 
 
 if __name__ == "__main__":
+    if not schedule_maintenance(cfg.server):
+        logger.warning("failed to schedule maintenance cron job")
     app.run(host=cfg.server.host, port=cfg.server.app_port, debug=cfg.server.debug)
@@ -0,0 +1,42 @@
+import argparse
+from api.config.config import parse_config
+from api.model.monitoring_event import create_monitoring_event_partitions, drop_monitoring_event_partitions
+from api.util.snapshot_retention import compact_snapshots
+
+# partitions are created this many months ahead, so inserts do not fall into
+# the default partition even if maintenance did not run for a while
+EVENTS_PARTITIONS_AHEAD = 3
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Maintains monitoring_events partitions and thins stored snapshots')
+    parser.add_argument('--months-ahead', type=int, default=EVENTS_PARTITIONS_AHEAD)
+    parser.add_argument('--keep-months', type=int, default=None,
+                        help='overrides server.events_retention_months of the config')
+    return parser.parse_args()
+
+
+def main():
+    cfg = parse_config()
+    args = parse_args()
+    created = create_monitoring_event_partitions(cfg.postgres, args.months_ahead)
+    print(f'created partitions: {", ".join(created) or "none"}')
+    keep_months = args.keep_months if args.keep_months is not None else cfg.server.events_retention_months
+    if keep_months is None:
+        print('retention is not configured, no partitions dropped')
+    else:
+        dropped = drop_monitoring_event_partitions(cfg.postgres, keep_months)
+        print(f'dropped partitions: {", ".join(dropped) or "none"}')
+    # runs after events retention, snapshots of dropped events are thinned right away
+    if cfg.snapshot_retention is None:
+        print('snapshot retention is not configured, no snapshots deleted')
+        return
+    report = compact_snapshots(cfg.postgres, cfg.s3, cfg.snapshot_retention)
+    print(
+        f'deleted {report.snapshots} snapshots and {report.objects} objects, '
+        f'reclaimed {report.reclaimed_bytes} bytes, {report.failed_objects} objects failed to delete'
+    )
+
+
+if __name__ == '__main__':
+    main()
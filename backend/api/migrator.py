@@ -4,7 +4,14 @@ import psycopg2
 import boto3
 from botocore.exceptions import NoCredentialsError
 from config.config import parse_config
+from api.model.s3_interactor import get_object, get_snapshot_text, save_snapshot_text
+from api.model.snapshot import get_unindexed_snapshot_ids, index_snapshot_text
 from api.model.user import create_user, get_user_by_email
+from api.util.html_parser import extract_text_from_html
+from api.util.lemmatizer import lemmatize
+
+MIGRATIONS_DIR = '../../db/migrations'
+
 
 def migrate(cfg: PostgreConfig) -> None:
     conn = psycopg2.connect(
@@ -14,11 +21,34 @@ def migrate(cfg: PostgreConfig) -> None:
         host=cfg.host,
         port=cfg.port,
     )
-    with open('../../db/migrations/20250101100000_init.sql', 'r') as f:
-        query = f.read()
     cur = conn.cursor()
-    cur.execute(query)
+    # serializes migrators started by several containers at once
+    cur.execute("SELECT pg_advisory_lock(hashtext('schema_migrations'))")
+    cur.execute(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version VARCHAR(255) PRIMARY KEY NOT NULL, "
+        "applied_at TIMESTAMP NOT NULL DEFAULT NOW())"
+    )
     conn.commit()
+    cur.execute("SELECT version FROM schema_migrations")
+    applied = {row[0] for row in cur.fetchall()}
+    for migration in sorted(os.listdir(MIGRATIONS_DIR)):
+        if not migration.endswith('.sql'):
+            continue
+        version = migration[:-len('.sql')]
+        if version in applied:
+            continue
+        with open(os.path.join(MIGRATIONS_DIR, migration), 'r') as f:
+            query = f.read()
+        print(f'applying migration {version}')
+        try:
+            cur.execute(query)
+            cur.execute("INSERT INTO schema_migrations (version) VALUES (%s)", (version,))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    cur.execute("SELECT pg_advisory_unlock(hashtext('schema_migrations'))")
     cur.close()
     conn.close()
     if not get_user_by_email(cfg, 'admin@admin.com'):
@@ -33,16 +63,75 @@ def init_s3_buckets(cfg: S3Config) -> None:
         aws_secret_access_key=cfg.aws_secret_access_key,
     )
     bucket_names = [bucket['Name'] for bucket in s3.list_buckets()['Buckets']]
-    for bucket_name in ['images', 'htmls']:
+    for bucket_name in ['images', 'htmls', 'texts']:
         if bucket_name not in bucket_names:
             s3.create_bucket(Bucket=bucket_name)
 
 
+def backfill_snapshots(postgre_cfg: PostgreConfig, s3_cfg: S3Config) -> None:
+    s3 = boto3.client(
+        's3',
+        endpoint_url=s3_cfg.connection_string,
+        aws_access_key_id=s3_cfg.aws_access_key_id,
+        aws_secret_access_key=s3_cfg.aws_secret_access_key,
+    )
+    snapshots = {}
+    for bucket_name, extension in [('images', '.png'), ('htmls', '.html')]:
+        for page in s3.get_paginator('list_objects_v2').paginate(Bucket=bucket_name):
+            for obj in page.get('Contents', []):
+                if not obj['Key'].endswith(extension) or '/' in obj['Key']:
+                    continue
+                snapshot_id = obj['Key'][:-len(extension)]
+                snapshot = snapshots.setdefault(snapshot_id, {'images': False, 'htmls': False, 'created_at': obj['LastModified']})
+                snapshot[bucket_name] = True
+                snapshot['created_at'] = min(snapshot['created_at'], obj['LastModified'])
+    conn = psycopg2.connect(
+        database=postgre_cfg.database,
+        user=postgre_cfg.user,
+        password=postgre_cfg.password,
+        host=postgre_cfg.host,
+        port=postgre_cfg.port,
+    )
+    cur = conn.cursor()
+    cur.execute("SELECT id FROM resources")
+    resource_ids = {row[0] for row in cur.fetchall()}
+    query = "INSERT INTO snapshots (id, resource_id, has_screenshot, has_html, created_at) VALUES (%s, %s, %s, %s, %s) ON CONFLICT (id) DO NOTHING"
+    for snapshot_id, snapshot in snapshots.items():
+        resource_id = snapshot_id.rsplit('_', 1)[0]
+        if resource_id not in resource_ids:
+            continue
+        cur.execute(query, (snapshot_id, resource_id, snapshot['images'], snapshot['htmls'], snapshot['created_at']))
+    conn.commit()
+    cur.close()
+    conn.close()
+
+
+def backfill_snapshot_texts(postgre_cfg: PostgreConfig, s3_cfg: S3Config, batch_size: int = 100) -> None:
+    indexed = 0
+    while True:
+        snapshot_ids = get_unindexed_snapshot_ids(postgre_cfg, batch_size)
+        if len(snapshot_ids) == 0:
+            break
+        for snapshot_id in snapshot_ids:
+            text = get_snapshot_text(s3_cfg, snapshot_id)
+            if text is None:
+                html = get_object(s3_cfg, 'htmls', snapshot_id + '.html')
+                # snapshots whose html is gone are indexed empty so they are not retried
+                text = extract_text_from_html(html) if html is not None else ''
+                if html is not None:
+                    save_snapshot_text(s3_cfg, snapshot_id, text)
+            index_snapshot_text(postgre_cfg, snapshot_id, text, lemmatize(text))
+            indexed += 1
+        print(f'indexed texts of {indexed} snapshots')
+
+
 def main():
     cfg = parse_config()
     print(cfg)
     migrate(cfg.postgres)
     init_s3_buckets(cfg.s3)
+    backfill_snapshots(cfg.postgres, cfg.s3)
+    backfill_snapshot_texts(cfg.postgres, cfg.s3)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,96 @@
+from api.config.config import PostgreConfig, RedisConfig
+from api.model.connection_pool import in_transaction, run_after_commit
+from api.model.redis_interactor import delete_keys, get_json, set_json
+from dataclasses import dataclass
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+
+# the key layout is shared with the daemon (daemon/cache.py), bump the version
+# whenever the cached payload changes so old entries are never decoded
+RESOURCE_CACHE_KEY = "resource:v1:{}"
+CHANNEL_CACHE_KEY = "channel:v1:{}"
+CACHE_TTL = 300
+# diffs of snapshot texts never change, the ttl only bounds redis memory
+DIFF_CACHE_KEY = "diff:v1:{}:{}:{}:{}"
+DIFF_CACHE_TTL = 86400
+
+logger = logging.getLogger("api")
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    errors: int = 0
+
+
+_redis_cfg: Optional[RedisConfig] = None
+_stats: Dict[str, CacheStats] = {}
+_stats_lock = threading.Lock()
+
+
+def configure_cache(cfg: Optional[RedisConfig]) -> None:
+    global _redis_cfg
+    _redis_cfg = cfg
+
+
+def _count(name: str, field: str) -> None:
+    with _stats_lock:
+        stats = _stats.setdefault(name, CacheStats())
+        setattr(stats, field, getattr(stats, field) + 1)
+
+
+def read_through(cfg: PostgreConfig,
+                 name: str,
+                 key: str,
+                 load: Callable[[], Optional[dict]],
+                 ttl: int = CACHE_TTL) -> Optional[dict]:
+    # reads inside a transaction must see its own uncommitted writes, so they
+    # bypass the cache; redis failures degrade to plain database reads
+    if _redis_cfg is None or in_transaction(cfg):
+        return load()
+    try:
+        cached = get_json(_redis_cfg, key)
+    except Exception as e:
+        logger.warning("cache read of %s failed: %s", key, e)
+        _count(name, "errors")
+        return load()
+    if cached is not None:
+        _count(name, "hits")
+        return cached
+    _count(name, "misses")
+    value = load()
+    if value is not None:
+        try:
+            set_json(_redis_cfg, key, value, ttl)
+        except Exception as e:
+            logger.warning("cache write of %s failed: %s", key, e)
+            _count(name, "errors")
+    return value
+
+
+def invalidate(cfg: PostgreConfig, keys: List[str]) -> None:
+    if _redis_cfg is None or len(keys) == 0:
+        return
+
+    def delete() -> None:
+        try:
+            delete_keys(_redis_cfg, keys)
+        except Exception as e:
+            logger.warning("cache invalidation of %s failed: %s", ", ".join(keys), e)
+            _count("invalidation", "errors")
+
+    # deleted right away and once more after commit, so a concurrent reader
+    # can not put the pre-commit row back for the whole ttl
+    delete()
+    if in_transaction(cfg):
+        run_after_commit(cfg, delete)
+
+
+def get_cache_stats() -> Dict[str, CacheStats]:
+    with _stats_lock:
+        return {
+            name: CacheStats(hits=stats.hits, misses=stats.misses, errors=stats.errors)
+            for name, stats in _stats.items()
+        }
@@ -1,22 +1,13 @@
 from api.config.config import PostgreConfig
-from dataclasses import dataclass
+from api.model.cache import CHANNEL_CACHE_KEY, invalidate, read_through
+from api.model.connection_pool import get_connection
+from dataclasses import asdict, dataclass
 import json
-import psycopg2
-from pypika import Table, Query
-from typing import Optional, Any, Dict, List
+from pypika import Table, Query, Tuple
+from typing import Optional, Any, Dict, List, Set
 import uuid
 
 
-def get_connection(cfg: PostgreConfig):
-    return psycopg2.connect(
-        database=cfg.database,
-        user=cfg.user,
-        password=cfg.password,
-        host=cfg.host,
-        port=cfg.port,
-    )
-
-
 @dataclass
 class Channel:
     id: str
@@ -29,14 +20,10 @@ class Channel:
 def create_channel(
     cfg: PostgreConfig, data: dict[str, Any], type: str, name: str
 ) -> Channel:
-    conn = get_connection(cfg)
-    cur = conn.cursor()
     query = "INSERT INTO channels (id, params, enabled, name, type) VALUES (%s, %s, %s, %s, %s)"
     new_uid = str(uuid.uuid4())
-    cur.execute(query, (new_uid, json.dumps(data), True, name, type))
-    conn.commit()
-    cur.close()
-    conn.close()
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query, (new_uid, json.dumps(data), True, name, type))
     return Channel(
         id=new_uid,
         type=type,
@@ -47,32 +34,42 @@ def create_channel(
 
 
 def get_channel_by_id(cfg: PostgreConfig, channel_id: str) -> Optional[Channel]:
-    conn = get_connection(cfg)
-    cur = conn.cursor()
-    query = "SELECT params, enabled, name, type FROM channels WHERE id = %s"
-    cur.execute(query, (channel_id,))
-    result = cur.fetchone()
-    cur.close()
-    conn.close()
-    if result is None:
+    def load() -> Optional[Dict[str, Any]]:
+        query = "SELECT params, enabled, name, type FROM channels WHERE id = %s"
+        with get_connection(cfg) as conn, conn.cursor() as cur:
+            cur.execute(query, (channel_id,))
+            result = cur.fetchone()
+        if result is None:
+            return None
+        return asdict(Channel(
+            id=channel_id,
+            params=result[0],
+            enabled=result[1],
+            name=result[2],
+            type=result[3],
+        ))
+
+    cached = read_through(cfg, "channel", CHANNEL_CACHE_KEY.format(channel_id), load)
+    if cached is None:
         return None
-    return Channel(
-        id=channel_id,
-        params=result[0],
-        enabled=result[1],
-        name=result[2],
-        type=result[3],
-    )
+    return Channel(**cached)
+
+
+def get_existing_channel_ids(cfg: PostgreConfig, channel_ids: List[str]) -> Set[str]:
+    if len(channel_ids) == 0:
+        return set()
+    query = "SELECT id FROM channels WHERE id = ANY(%s)"
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query, (list(channel_ids),))
+        result = cur.fetchall()
+    return {row[0] for row in result}
 
 
 def get_channel_by_name(cfg: PostgreConfig, name: str) -> Optional[Channel]:
-    conn = get_connection(cfg)
-    cur = conn.cursor()
     query = "SELECT id, params, enabled, name, type FROM channels WHERE name = %s"
-    cur.execute(query, (name,))
-    result = cur.fetchone()
-    cur.close()
-    conn.close()
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query, (name,))
+        result = cur.fetchone()
     if result is None:
         return None
     return Channel(
@@ -90,8 +87,6 @@ def update_channel(
     data: Optional[dict[str, Any]],
     enabled: Optional[bool],
 ):
-    conn = get_connection(cfg)
-    cur = conn.cursor()
     channels_table = Table("channels")
     query = Query.update("channels")
     if data is not None:
@@ -101,24 +96,35 @@ def update_channel(
     query = query.where(channels_table.id == channel_id)
     if query.get_sql() is None or len(query.get_sql()) == 0:
         return
-    cur.execute(query.get_sql())
-    conn.commit()
-    cur.close()
-    conn.close()
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query.get_sql())
+    invalidate(cfg, [CHANNEL_CACHE_KEY.format(channel_id)])
 
 
-def get_all_channels(cfg: PostgreConfig, offset: Optional[int], limit: Optional[int]) -> List[Channel]:
-    conn = get_connection(cfg)
-    cur = conn.cursor()
-    query = "SELECT id, params, name, type, enabled FROM channels ORDER BY name"
+def get_all_channels(
+    cfg: PostgreConfig,
+    offset: Optional[int],
+    limit: Optional[int],
+    after: Optional[tuple[str, str]] = None,
+) -> List[Channel]:
+    channels_table = Table("channels")
+    query = Query.from_(channels_table).select(
+        channels_table.id,
+        channels_table.params,
+        channels_table.name,
+        channels_table.type,
+        channels_table.enabled,
+    )
+    if after is not None:
+        query = query.where(Tuple(channels_table.name, channels_table.id) > Tuple(*after))
+    query = query.orderby(channels_table.name).orderby(channels_table.id)
     if offset is not None:
-        query += " OFFSET %s" % offset
+        query = query.offset(offset)
     if limit is not None:
-        query += " LIMIT %s" % limit
-    cur.execute(query)
-    result = cur.fetchall()
-    cur.close()
-    conn.close()
+        query = query.limit(limit)
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query.get_sql())
+        result = cur.fetchall()
     if result is None:
         return []
     return [
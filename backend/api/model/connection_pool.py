@@ -0,0 +1,198 @@
+from api.config.config import PostgreConfig
+from contextlib import contextmanager
+from dataclasses import dataclass
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Tuple
+
+
+@dataclass
+class PoolStats:
+    database: str
+    min_size: int
+    max_size: int
+    in_use: int
+    checkouts: int
+    timeouts: int
+    total_wait_ms: float
+    max_wait_ms: float
+
+
+class ConnectionPool:
+    def __init__(self, cfg: PostgreConfig):
+        self.cfg = cfg
+        self.pool = ThreadedConnectionPool(
+            cfg.pool_min_size,
+            cfg.pool_max_size,
+            database=cfg.database,
+            user=cfg.user,
+            password=cfg.password,
+            host=cfg.host,
+            port=cfg.port,
+        )
+        # ThreadedConnectionPool fails immediately when exhausted, the
+        # semaphore makes callers wait for a free connection instead
+        self.slots = threading.BoundedSemaphore(cfg.pool_max_size)
+        self.lock = threading.Lock()
+        self.in_use = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def getconn(self):
+        started_at = time.monotonic()
+        if not self.slots.acquire(timeout=self.cfg.pool_timeout):
+            with self.lock:
+                self.timeouts += 1
+            raise PoolError(f"no free connection to {self.cfg.database} in {self.cfg.pool_timeout} seconds")
+        wait = time.monotonic() - started_at
+        try:
+            conn = self.pool.getconn()
+        except Exception:
+            self.slots.release()
+            raise
+        with self.lock:
+            self.in_use += 1
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+        return conn
+
+    def putconn(self, conn, close: bool = False) -> None:
+        try:
+            self.pool.putconn(conn, close=close)
+        finally:
+            with self.lock:
+                self.in_use -= 1
+            self.slots.release()
+
+    def stats(self) -> PoolStats:
+        with self.lock:
+            return PoolStats(
+                database=self.cfg.database,
+                min_size=self.cfg.pool_min_size,
+                max_size=self.cfg.pool_max_size,
+                in_use=self.in_use,
+                checkouts=self.checkouts,
+                timeouts=self.timeouts,
+                total_wait_ms=self.total_wait * 1000,
+                max_wait_ms=self.max_wait * 1000,
+            )
+
+
+def _pool_key(cfg: PostgreConfig) -> Tuple[str, str, str, str]:
+    return (cfg.host, str(cfg.port), cfg.database, cfg.user)
+
+
+_pools: Dict[Tuple[str, str, str, str], ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(cfg: PostgreConfig) -> ConnectionPool:
+    key = _pool_key(cfg)
+    pool = _pools.get(key)
+    if pool is not None:
+        return pool
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(cfg)
+        return _pools[key]
+
+
+class UnitOfWork:
+    """Model operations run inside transaction() share one connection and commit together."""
+
+    def __init__(self, cfg: PostgreConfig):
+        self.cfg = cfg
+        self.conn = None
+        self.rollback_only = False
+        self.after_commit: List[Callable[[], None]] = []
+
+    def connection(self):
+        # checked out on first use, so requests rejected by validation never touch the pool
+        if self.conn is None:
+            self.conn = get_pool(self.cfg).getconn()
+        return self.conn
+
+    def rollback(self) -> None:
+        self.rollback_only = True
+
+
+_local = threading.local()
+
+
+def _get_units_of_work() -> Dict[Tuple[str, str, str, str], UnitOfWork]:
+    if not hasattr(_local, "units_of_work"):
+        _local.units_of_work = {}
+    return _local.units_of_work
+
+
+@contextmanager
+def transaction(cfg: PostgreConfig) -> Iterator[UnitOfWork]:
+    units_of_work = _get_units_of_work()
+    key = _pool_key(cfg)
+    unit_of_work = units_of_work.get(key)
+    if unit_of_work is not None:
+        # nested transactions join the outer one
+        yield unit_of_work
+        return
+    unit_of_work = UnitOfWork(cfg)
+    units_of_work[key] = unit_of_work
+    try:
+        yield unit_of_work
+        if unit_of_work.rollback_only:
+            if unit_of_work.conn is not None:
+                unit_of_work.conn.rollback()
+        else:
+            if unit_of_work.conn is not None:
+                unit_of_work.conn.commit()
+            for callback in unit_of_work.after_commit:
+                callback()
+    except Exception:
+        if unit_of_work.conn is not None and not unit_of_work.conn.closed:
+            unit_of_work.conn.rollback()
+        raise
+    finally:
+        del units_of_work[key]
+        if unit_of_work.conn is not None:
+            get_pool(cfg).putconn(unit_of_work.conn, close=bool(unit_of_work.conn.closed))
+
+
+def in_transaction(cfg: PostgreConfig) -> bool:
+    return _pool_key(cfg) in _get_units_of_work()
+
+
+def run_after_commit(cfg: PostgreConfig, callback: Callable[[], None]) -> None:
+    unit_of_work = _get_units_of_work().get(_pool_key(cfg))
+    if unit_of_work is None:
+        callback()
+        return
+    unit_of_work.after_commit.append(callback)
+
+
+@contextmanager
+def get_connection(cfg: PostgreConfig) -> Iterator:
+    unit_of_work = _get_units_of_work().get(_pool_key(cfg))
+    if unit_of_work is not None:
+        # commit and rollback are left to the enclosing transaction
+        yield unit_of_work.connection()
+        return
+    pool = get_pool(cfg)
+    conn = pool.getconn()
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        if not conn.closed:
+            conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn, close=bool(conn.closed))
+
+
+def get_pool_stats() -> List[PoolStats]:
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.stats() for pool in pools]
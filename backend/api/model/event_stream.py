@@ -0,0 +1,218 @@
+from api.config.config import PostgreConfig
+from api.model.monitoring_event import MonitoringEvent, filter_monitoring_events
+from dataclasses import dataclass, field
+from datetime import datetime
+import json
+import logging
+import psycopg2
+import queue
+import select
+import threading
+import time
+from typing import Iterator, List, Optional, Set, Tuple
+
+EVENTS_CHANNEL = "monitoring_events"
+EVENT_STREAM_MAX_SUBSCRIBERS = 100
+EVENT_STREAM_QUEUE_SIZE = 256
+EVENT_STREAM_BACKFILL_LIMIT = 500
+EVENT_STREAM_HEARTBEAT = 15
+LISTEN_RECONNECT_DELAY = 5
+
+logger = logging.getLogger("api")
+
+
+@dataclass
+class EventSubscription:
+    resource_ids: Optional[Set[str]]
+    event_type: Optional[str]
+    events: queue.Queue = field(default_factory=lambda: queue.Queue(EVENT_STREAM_QUEUE_SIZE), repr=False)
+    # set when notifications were missed (slow client or lost LISTEN
+    # connection), the stream then catches up from the table
+    lagging: bool = False
+
+    def matches(self, event: MonitoringEvent) -> bool:
+        if self.resource_ids is not None and event.resource_id not in self.resource_ids:
+            return False
+        # same rule as filter_monitoring_events
+        return self.event_type is None or self.event_type in event.name
+
+
+@dataclass
+class EventStreamStats:
+    subscribers: int
+    listening: bool
+    delivered: int
+    dropped: int
+    rejected: int
+
+
+_subscriptions: List[EventSubscription] = []
+_counters = {"delivered": 0, "dropped": 0, "rejected": 0}
+_listener: Optional[threading.Thread] = None
+_listening = False
+_lock = threading.Lock()
+
+
+def _parse_notification(payload: str) -> MonitoringEvent:
+    data = json.loads(payload)
+    return MonitoringEvent(
+        id=data["id"],
+        resource_id=data["resource_id"],
+        snapshot_id=data["snapshot_id"],
+        name=data["name"],
+        created_at=datetime.fromisoformat(data["created_at"]),
+        status=data["status"],
+    )
+
+
+def publish_event(event: MonitoringEvent) -> None:
+    with _lock:
+        for subscription in _subscriptions:
+            if not subscription.matches(event):
+                continue
+            try:
+                subscription.events.put_nowait(event)
+                _counters["delivered"] += 1
+            except queue.Full:
+                subscription.lagging = True
+                _counters["dropped"] += 1
+
+
+def _mark_lagging() -> None:
+    with _lock:
+        for subscription in _subscriptions:
+            subscription.lagging = True
+
+
+def _listen(cfg: PostgreConfig) -> None:
+    global _listening
+    # one connection per process holds the LISTEN, it stays outside of the
+    # pool because it is never returned
+    while True:
+        conn = None
+        try:
+            conn = psycopg2.connect(
+                database=cfg.database,
+                user=cfg.user,
+                password=cfg.password,
+                host=cfg.host,
+                port=cfg.port,
+            )
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {EVENTS_CHANNEL}")
+            with _lock:
+                _listening = True
+            # anything inserted before LISTEN was not announced
+            _mark_lagging()
+            while True:
+                if select.select([conn], [], [], EVENT_STREAM_HEARTBEAT) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    try:
+                        event = _parse_notification(notify.payload)
+                    except (ValueError, KeyError) as e:
+                        logger.warning("invalid event notification %s: %s", notify.payload, e)
+                        continue
+                    publish_event(event)
+        except Exception as e:
+            logger.warning("listening for monitoring events failed: %s", e)
+        finally:
+            with _lock:
+                _listening = False
+            if conn is not None:
+                conn.close()
+        time.sleep(LISTEN_RECONNECT_DELAY)
+
+
+def subscribe(cfg: PostgreConfig, resource_ids: Optional[List[str]], event_type: Optional[str]) -> Optional[EventSubscription]:
+    """Returns None when the subscriber limit is reached."""
+    global _listener
+    with _lock:
+        if len(_subscriptions) >= EVENT_STREAM_MAX_SUBSCRIBERS:
+            _counters["rejected"] += 1
+            return None
+        subscription = EventSubscription(
+            resource_ids=set(resource_ids) if resource_ids is not None else None,
+            event_type=event_type,
+        )
+        _subscriptions.append(subscription)
+        if _listener is None:
+            _listener = threading.Thread(target=_listen, args=(cfg,), name="event-listener", daemon=True)
+            _listener.start()
+    return subscription
+
+
+def unsubscribe(subscription: EventSubscription) -> None:
+    with _lock:
+        if subscription in _subscriptions:
+            _subscriptions.remove(subscription)
+
+
+def _read_events(cfg: PostgreConfig,
+                 subscription: EventSubscription,
+                 after: Tuple[datetime, str]) -> List[MonitoringEvent]:
+    return filter_monitoring_events(
+        cfg,
+        list(subscription.resource_ids) if subscription.resource_ids is not None else None,
+        None,
+        None,
+        subscription.event_type,
+        None,
+        EVENT_STREAM_BACKFILL_LIMIT,
+        after,
+    )
+
+
+def stream_events(cfg: PostgreConfig,
+                  subscription: EventSubscription,
+                  after: Optional[Tuple[datetime, str]]) -> Iterator[Optional[MonitoringEvent]]:
+    """Yields events matching the subscription, and None when there was nothing to send for a heartbeat period.
+
+    Events after the `after` cursor are read from the table first, then
+    notifications take over; the table is read again whenever notifications
+    were missed.
+    """
+    if after is None:
+        after = (datetime.now(), "")
+    else:
+        subscription.lagging = True
+    backfilled: Set[str] = set()
+    while True:
+        if subscription.lagging:
+            subscription.lagging = False
+            # queued events are read again from the table below
+            while not subscription.events.empty():
+                subscription.events.get_nowait()
+            while True:
+                events = _read_events(cfg, subscription, after)
+                # notifications of the last page may still be queued
+                backfilled = {event.id for event in events}
+                for event in events:
+                    after = max(after, (event.created_at, event.id))
+                    yield event
+                if len(events) < EVENT_STREAM_BACKFILL_LIMIT:
+                    break
+            continue
+        try:
+            event = subscription.events.get(timeout=EVENT_STREAM_HEARTBEAT)
+        except queue.Empty:
+            yield None
+            continue
+        if event.id in backfilled:
+            continue
+        after = max(after, (event.created_at, event.id))
+        yield event
+
+
+def get_event_stream_stats() -> EventStreamStats:
+    with _lock:
+        return EventStreamStats(
+            subscribers=len(_subscriptions),
+            listening=_listening,
+            delivered=_counters["delivered"],
+            dropped=_counters["dropped"],
+            rejected=_counters["rejected"],
+        )
@@ -0,0 +1,58 @@
+from api.config.config import PostgreConfig
+from api.model.connection_pool import get_connection
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+
+@dataclass
+class HostBreaker:
+    host: str
+    state: str
+    failures: int
+    opened_count: int
+    opened_until: Optional[datetime]
+    last_error: Optional[str]
+    updated_at: datetime
+
+
+def get_host_breaker(cfg: PostgreConfig, host: str) -> Optional[HostBreaker]:
+    query = "SELECT state, failures, opened_count, opened_until, last_error, updated_at FROM host_breakers WHERE host = %s"
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query, (host,))
+        result = cur.fetchone()
+    if result is None:
+        return None
+    return HostBreaker(
+        host=host,
+        state=result[0],
+        failures=result[1],
+        opened_count=result[2],
+        opened_until=result[3],
+        last_error=result[4],
+        updated_at=result[5],
+    )
+
+
+def get_all_host_breakers(cfg: PostgreConfig, state: Optional[str]) -> List[HostBreaker]:
+    query = "SELECT host, state, failures, opened_count, opened_until, last_error, updated_at FROM host_breakers"
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        if state is not None:
+            query += " WHERE state = %s ORDER BY host"
+            cur.execute(query, (state,))
+        else:
+            query += " ORDER BY host"
+            cur.execute(query)
+        result = cur.fetchall()
+    return [
+        HostBreaker(
+            host=row[0],
+            state=row[1],
+            failures=row[2],
+            opened_count=row[3],
+            opened_until=row[4],
+            last_error=row[5],
+            updated_at=row[6],
+        )
+        for row in result
+    ]
@@ -1,20 +1,10 @@
 from api.config.config import PostgreConfig
+from api.model.connection_pool import get_connection
 from dataclasses import dataclass
-import psycopg2
-from typing import Optional, Any, Dict, List
+from typing import Optional, Any, Dict, Iterator, List, Set
 import uuid
 from datetime import datetime
-from pypika import Table, Query
-
-
-def get_connection(cfg: PostgreConfig):
-    return psycopg2.connect(
-        database=cfg.database,
-        user=cfg.user, 
-        password=cfg.password,
-        host=cfg.host,
-        port=cfg.port,
-    )
+from pypika import Table, Query, Tuple
 
 
 @dataclass
@@ -27,17 +17,30 @@ class MonitoringEvent:
     status: str
 
 
+@dataclass
+class EventCount:
+    resource_id: str
+    type: str
+    time: datetime
+    count: int
+
+
+@dataclass
+class ReportRow:
+    snapshot_id: str
+    resource_id: str
+    snapshot_time: Optional[datetime]
+    image: bool
+    text: bool
+
+
 def create_monitoring_event(cfg: PostgreConfig, resource_id: str, snapshot_id: str, name: str) -> MonitoringEvent:
-    conn = get_connection(cfg)
-    cur = conn.cursor()
     query = "INSERT INTO monitoring_events (id, resource_id, snapshot_id, name, created_at, status) VALUES (%s, %s, %s, %s, %s, %s) RETURNING id"
     event_id = str(uuid.uuid4())
     created_at = datetime.now()
     status = "created"
-    cur.execute(query, (event_id, resource_id, snapshot_id, name, created_at, status))
-    conn.commit()
-    cur.close()
-    conn.close()
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query, (event_id, resource_id, snapshot_id, name, created_at, status))
     return MonitoringEvent(
         id=event_id,
         resource_id=resource_id,
@@ -49,13 +52,10 @@ def create_monitoring_event(cfg: PostgreConfig, resource_id: str, snapshot_id: s
 
 
 def get_monitoring_event_by_id(cfg: PostgreConfig, event_id: str) -> Optional[MonitoringEvent]:
-    conn = get_connection(cfg)
-    cur = conn.cursor()
     query = "SELECT resource_id, snapshot_id, name, created_at, status FROM monitoring_events WHERE id = %s"
-    cur.execute(query, (event_id,))
-    result = cur.fetchone()
-    cur.close()
-    conn.close()
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query, (event_id,))
+        result = cur.fetchone()
     if result is None:
         return None
     return MonitoringEvent(
@@ -68,14 +68,21 @@ def get_monitoring_event_by_id(cfg: PostgreConfig, event_id: str) -> Optional[Mo
     )
 
 
+def get_existing_monitoring_event_ids(cfg: PostgreConfig, event_ids: List[str]) -> Set[str]:
+    if len(event_ids) == 0:
+        return set()
+    query = "SELECT id FROM monitoring_events WHERE id = ANY(%s)"
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query, (list(event_ids),))
+        result = cur.fetchall()
+    return {row[0] for row in result}
+
+
 def get_monitoring_events_by_resource_id(cfg: PostgreConfig, resource_id: str) -> List[MonitoringEvent]:
-    conn = get_connection(cfg)
-    cur = conn.cursor()
     query = "SELECT id, snapshot_id, name, created_at, status FROM monitoring_events WHERE resource_id = %s"
-    cur.execute(query, (resource_id,))
-    result = cur.fetchall()
-    cur.close()
-    conn.close()
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query, (resource_id,))
+        result = cur.fetchall()
     return [MonitoringEvent(
         id=row[0],
         resource_id=resource_id,
@@ -87,13 +94,9 @@ def get_monitoring_events_by_resource_id(cfg: PostgreConfig, resource_id: str) -
 
 
 def update_monitoring_event_status(cfg: PostgreConfig, event_id: str, status: str) -> None:
-    conn = get_connection(cfg)
-    cur = conn.cursor()
     query = "UPDATE monitoring_events SET status = %s WHERE id = %s"
-    cur.execute(query, (status, event_id))
-    conn.commit()
-    cur.close()
-    conn.close()
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query, (status, event_id))
 
 
 def filter_monitoring_events(cfg: PostgreConfig,
@@ -102,9 +105,8 @@ def filter_monitoring_events(cfg: PostgreConfig,
                              end_time: Optional[datetime],
                              event_type: Optional[str],
                              offset: Optional[int],
-                             limit: Optional[int]) -> List[MonitoringEvent]:
-    conn = get_connection(cfg)
-    cur = conn.cursor()
+                             limit: Optional[int],
+                             after: Optional[tuple[datetime, str]] = None) -> List[MonitoringEvent]:
     events_table = Table('monitoring_events')
     query = Query.from_(events_table).select(events_table.id,
                                              events_table.snapshot_id,
@@ -120,15 +122,18 @@ def filter_monitoring_events(cfg: PostgreConfig,
         query = query.where(events_table.created_at <= end_time)
     if event_type is not None:
         query = query.where(events_table.name.like(f'%{event_type}%'))
-    query = query.orderby(events_table.created_at)
+    if after is not None:
+        # partitions are not pruned by the row comparison alone
+        query = query.where(events_table.created_at >= after[0])
+        query = query.where(Tuple(events_table.created_at, events_table.id) > Tuple(*after))
+    query = query.orderby(events_table.created_at).orderby(events_table.id)
     if offset is not None:
         query = query.offset(offset)
     if limit is not None:
         query = query.limit(limit)
-    cur.execute(query.get_sql())
-    result = cur.fetchall()
-    cur.close()
-    conn.close()
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query.get_sql())
+        result = cur.fetchall()
     return [MonitoringEvent(
         id=row[0],
         snapshot_id=row[1],
@@ -139,6 +144,55 @@ def filter_monitoring_events(cfg: PostgreConfig,
     ) for row in result]
 
 
+def create_monitoring_event_partitions(cfg: PostgreConfig, months_ahead: int) -> List[str]:
+    query = "SELECT create_monitoring_events_partitions(%s)"
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query, (months_ahead,))
+        result = cur.fetchall()
+    return [row[0] for row in result]
+
+
+def drop_monitoring_event_partitions(cfg: PostgreConfig, keep_months: int) -> List[str]:
+    query = "SELECT drop_monitoring_events_partitions(%s)"
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query, (keep_months,))
+        result = cur.fetchall()
+    return [row[0] for row in result]
+
+
+def get_monitoring_event_counts(cfg: PostgreConfig,
+                                resource_ids: Optional[List[str]],
+                                start_time: Optional[datetime],
+                                end_time: Optional[datetime],
+                                event_type: Optional[str],
+                                bucket: str) -> List[EventCount]:
+    # reads the hourly rollups maintained by triggers on monitoring_events,
+    # so time bounds are applied with an hour precision
+    conditions = ["count > 0"]
+    params = {"bucket": bucket}
+    if resource_ids is not None:
+        conditions.append("resource_id = ANY(%(resource_ids)s)")
+        params["resource_ids"] = list(resource_ids)
+    if start_time is not None:
+        conditions.append("bucket >= date_trunc('hour', %(start_time)s::timestamp)")
+        params["start_time"] = start_time
+    if end_time is not None:
+        conditions.append("bucket <= %(end_time)s")
+        params["end_time"] = end_time
+    if event_type is not None:
+        conditions.append("event_type = %(event_type)s")
+        params["event_type"] = event_type
+    query = (
+        "SELECT resource_id, event_type, date_trunc(%(bucket)s, bucket) AS time, SUM(count) "
+        "FROM monitoring_event_rollups WHERE " + " AND ".join(conditions) + " "
+        "GROUP BY 1, 2, 3 ORDER BY 3, 1, 2"
+    )
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query, params)
+        result = cur.fetchall()
+    return [EventCount(resource_id=row[0], type=row[1], time=row[2], count=int(row[3])) for row in result]
+
+
 def filter_monitoring_events_for_report(cfg: PostgreConfig,
                                         snapshot_ids: Optional[List[str]],
                                         event_ids: Optional[List[str]],
@@ -146,8 +200,6 @@ def filter_monitoring_events_for_report(cfg: PostgreConfig,
                                         limit: Optional[int]) -> List[MonitoringEvent]:
     if (snapshot_ids is None or len(snapshot_ids) == 0) and (event_ids is None or len(event_ids) == 0):
         return []
-    conn = get_connection(cfg)
-    cur = conn.cursor()
     events_table = Table('monitoring_events')
     query = Query.from_(events_table).select(events_table.id,
                                              events_table.snapshot_id,
@@ -166,10 +218,9 @@ def filter_monitoring_events_for_report(cfg: PostgreConfig,
         query = query.offset(offset)
     if limit is not None:
         query = query.limit(limit)
-    cur.execute(query.get_sql())
-    result = cur.fetchall()
-    cur.close()
-    conn.close()
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query.get_sql())
+        result = cur.fetchall()
     return [MonitoringEvent(
         id=row[0],
         snapshot_id=row[1],
@@ -178,3 +229,57 @@ def filter_monitoring_events_for_report(cfg: PostgreConfig,
         created_at=row[4],
         status=row[5]
     ) for row in result]
+
+
+def iter_report_rows(cfg: PostgreConfig,
+                     snapshot_ids: Optional[List[str]],
+                     event_ids: Optional[List[str]],
+                     offset: Optional[int],
+                     limit: Optional[int],
+                     batch_size: int = 1000) -> Iterator[ReportRow]:
+    """Aggregates selected events per snapshot, rows are read with a server-side cursor."""
+    snapshot_ids = snapshot_ids or []
+    event_ids = event_ids or []
+    if len(snapshot_ids) == 0 and len(event_ids) == 0:
+        return
+    # requested snapshots without events are reported too, with both flags unset
+    query = """
+        WITH filtered AS (
+            SELECT snapshot_id, resource_id, name, created_at FROM monitoring_events
+            WHERE snapshot_id = ANY(%(snapshot_ids)s) OR id = ANY(%(event_ids)s)
+            ORDER BY created_at, id
+            OFFSET %(offset)s LIMIT %(limit)s
+        ), report AS (
+            SELECT snapshot_id,
+                   MIN(resource_id) AS resource_id,
+                   MIN(created_at) AS first_event_at,
+                   bool_or(name LIKE '%%image%%') AS image,
+                   bool_or(name NOT LIKE '%%image%%') AS text
+            FROM filtered GROUP BY snapshot_id
+            UNION ALL
+            SELECT requested.id, NULL, NULL, FALSE, FALSE
+            FROM unnest(%(snapshot_ids)s::VARCHAR[]) AS requested(id)
+            WHERE requested.id NOT IN (SELECT snapshot_id FROM filtered)
+        )
+        SELECT report.snapshot_id, COALESCE(report.resource_id, snapshots.resource_id),
+               snapshots.created_at, report.image, report.text
+        FROM report LEFT JOIN snapshots ON snapshots.id = report.snapshot_id
+        ORDER BY report.first_event_at NULLS FIRST, report.snapshot_id
+    """
+    params = {
+        "snapshot_ids": list(snapshot_ids),
+        "event_ids": list(event_ids),
+        "offset": offset,
+        "limit": limit,
+    }
+    with get_connection(cfg) as conn, conn.cursor(name=f"report_{uuid.uuid4().hex}") as cur:
+        cur.itersize = batch_size
+        cur.execute(query, params)
+        for row in cur:
+            yield ReportRow(
+                snapshot_id=row[0],
+                resource_id=row[1] if row[1] is not None else row[0].rsplit('_', 1)[0],
+                snapshot_time=row[2],
+                image=row[3],
+                text=row[4],
+            )
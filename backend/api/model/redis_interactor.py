@@ -1,23 +1,36 @@
 import redis
 import json
-from typing import Optional
+import threading
+from typing import Dict, List, Optional, Tuple
 from api.config.config import parse_config, RedisConfig
+from api.util.metrics import measure_latency
+
+_clients: Dict[Tuple[str, str, int], redis.Redis] = {}
+_clients_lock = threading.Lock()
 
 
 def __connect_to_redis(cfg: RedisConfig) -> redis.Redis:
-    return redis.Redis(host=cfg.host, port=cfg.port, db=cfg.db)
+    key = (cfg.host, str(cfg.port), cfg.db)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    with _clients_lock:
+        if key not in _clients:
+            pool = redis.ConnectionPool(host=cfg.host, port=cfg.port, db=cfg.db)
+            _clients[key] = redis.Redis(connection_pool=pool)
+        return _clients[key]
 
 
 def save_jwt(cfg: RedisConfig, key: str, value: bool, expire_seconds=86400) -> None:
     redis_client = __connect_to_redis(cfg)
-    redis_client.set(key, str(value))
-    if expire_seconds:
-        redis_client.expire(key, expire_seconds)
+    with measure_latency("redis.save_jwt"):
+        redis_client.set(key, str(value), ex=expire_seconds or None)
 
 
 def __get_from_redis(cfg: RedisConfig, key: str) -> Optional[bool]:
     redis_client = __connect_to_redis(cfg)
-    value = redis_client.get(key)
+    with measure_latency("redis.check_jwt"):
+        value = redis_client.get(key)
     if value is None:
         return None
     value = bool(value)
@@ -26,7 +39,8 @@ def __get_from_redis(cfg: RedisConfig, key: str) -> Optional[bool]:
 
 def delete_jwt(cfg: RedisConfig, key: str) -> None:
     redis_client = __connect_to_redis(cfg)
-    deleted = redis_client.delete(key)
+    with measure_latency("redis.delete_jwt"):
+        deleted = redis_client.delete(key)
     return deleted
 
 
@@ -35,3 +49,35 @@ def check_jwt(cfg: RedisConfig, key: str) -> bool:
     if jwt_value is None:
         return False
     return jwt_value
+
+
+def check_jwts(cfg: RedisConfig, keys: List[str]) -> Dict[str, bool]:
+    if len(keys) == 0:
+        return {}
+    redis_client = __connect_to_redis(cfg)
+    with measure_latency("redis.check_jwts"):
+        values = redis_client.mget(keys)
+    return {key: value is not None for key, value in zip(keys, values)}
+
+
+def get_json(cfg: RedisConfig, key: str) -> Optional[dict]:
+    redis_client = __connect_to_redis(cfg)
+    with measure_latency("redis.get_json"):
+        value = redis_client.get(key)
+    if value is None:
+        return None
+    return json.loads(value)
+
+
+def set_json(cfg: RedisConfig, key: str, value: dict, expire_seconds: int) -> None:
+    redis_client = __connect_to_redis(cfg)
+    with measure_latency("redis.set_json"):
+        redis_client.set(key, json.dumps(value), ex=expire_seconds)
+
+
+def delete_keys(cfg: RedisConfig, keys: List[str]) -> None:
+    if len(keys) == 0:
+        return
+    redis_client = __connect_to_redis(cfg)
+    with measure_latency("redis.delete_keys"):
+        redis_client.delete(*keys)
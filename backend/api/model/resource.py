@@ -1,24 +1,15 @@
 from api.config.config import PostgreConfig
-from dataclasses import dataclass
+from api.model.cache import RESOURCE_CACHE_KEY, invalidate, read_through
+from api.model.connection_pool import get_connection
+from dataclasses import asdict, dataclass
 import datetime
 import json
-import psycopg2
-import psycopg2.extras
-from pypika import Table, Query
+from psycopg2.extras import execute_values
+from pypika import Table, Query, Tuple
 from typing import Optional, Any, List, Dict
 import uuid
 
 
-def get_connection(cfg: PostgreConfig):
-    return psycopg2.connect(
-        database=cfg.database,
-        user=cfg.user,
-        password=cfg.password,
-        host=cfg.host,
-        port=cfg.port,
-    )
-
-
 @dataclass
 class Resource:
     id: str
@@ -33,6 +24,19 @@ class Resource:
     polygon: List[Dict[str, Any]]
 
 
+@dataclass
+class NewResource:
+    url: str
+    name: str
+    description: str
+    keywords: List[str]
+    interval: str
+    starts_from: Optional[datetime.datetime]
+    make_screenshot: bool
+    polygon: List[Dict[str, Any]]
+    channels: List[str]
+
+
 def create_resource(
     cfg: PostgreConfig,
     url: str,
@@ -44,28 +48,24 @@ def create_resource(
     make_screenshot: bool,
     polygon: List[Dict[str, Any]],
 ):
-    conn = get_connection(cfg)
-    cur = conn.cursor()
     query = "INSERT INTO resources (id, url, name, description, key_words, interval, starts_from, make_screenshot, enabled, monitoring_polygon) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
     new_uid = str(uuid.uuid4())
-    cur.execute(
-        query,
-        (
-            new_uid,
-            url,
-            name,
-            description,
-            keywords,
-            interval,
-            starts_from,
-            make_screenshot,
-            True,
-            json.dumps(polygon),
-        ),
-    )
-    conn.commit()
-    cur.close()
-    conn.close()
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(
+            query,
+            (
+                new_uid,
+                url,
+                name,
+                description,
+                keywords,
+                interval,
+                starts_from,
+                make_screenshot,
+                True,
+                json.dumps(polygon),
+            ),
+        )
     return Resource(
         id=new_uid,
         url=url,
@@ -80,32 +80,142 @@ def create_resource(
     )
 
 
+def create_resources(cfg: PostgreConfig, new_resources: List[NewResource]) -> List[Resource]:
+    resources = [
+        Resource(
+            id=str(uuid.uuid4()),
+            url=new_resource.url,
+            name=new_resource.name,
+            description=new_resource.description,
+            keywords=new_resource.keywords,
+            interval=new_resource.interval,
+            starts_from=new_resource.starts_from,
+            make_screenshot=new_resource.make_screenshot,
+            enabled=True,
+            polygon=new_resource.polygon,
+        )
+        for new_resource in new_resources
+    ]
+    if len(resources) == 0:
+        return resources
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        execute_values(
+            cur,
+            "INSERT INTO resources (id, url, name, description, key_words, interval, starts_from, make_screenshot, enabled, monitoring_polygon) VALUES %s",
+            [
+                (
+                    resource.id,
+                    resource.url,
+                    resource.name,
+                    resource.description,
+                    resource.keywords,
+                    resource.interval,
+                    resource.starts_from,
+                    resource.make_screenshot,
+                    resource.enabled,
+                    json.dumps(resource.polygon),
+                )
+                for resource in resources
+            ],
+            page_size=500,
+        )
+        execute_values(
+            cur,
+            "INSERT INTO channel_resource (channel_id, resource_id, enabled) VALUES %s",
+            [
+                (channel_id, resource.id, True)
+                for resource, new_resource in zip(resources, new_resources)
+                for channel_id in dict.fromkeys(new_resource.channels)
+            ],
+            page_size=500,
+        )
+    return resources
+
+
+def resource_to_cache(resource: Resource) -> Dict[str, Any]:
+    cached = asdict(resource)
+    cached["starts_from"] = resource.starts_from.isoformat() if resource.starts_from else None
+    return cached
+
+
+def resource_from_cache(cached: Dict[str, Any]) -> Resource:
+    resource = Resource(**cached)
+    if resource.starts_from is not None:
+        resource.starts_from = datetime.datetime.fromisoformat(resource.starts_from)
+    return resource
+
+
 def get_resource_by_id(cfg: PostgreConfig, resource_id: str) -> Optional[Resource]:
-    conn = get_connection(cfg)
-    cur = conn.cursor()
-    query = "SELECT url, name, description, key_words, interval, make_screenshot, enabled, monitoring_polygon, starts_from FROM resources WHERE id = %s"
-    cur.execute(query, (resource_id,))
-    result = cur.fetchone()
-    if result is None:
+    def load() -> Optional[Dict[str, Any]]:
+        query = "SELECT url, name, description, key_words, interval, make_screenshot, enabled, monitoring_polygon, starts_from FROM resources WHERE id = %s"
+        with get_connection(cfg) as conn, conn.cursor() as cur:
+            cur.execute(query, (resource_id,))
+            result = cur.fetchone()
+        if result is None:
+            return None
+        return resource_to_cache(Resource(
+            id=resource_id,
+            url=result[0],
+            name=result[1],
+            description=result[2],
+            keywords=result[3],
+            interval=result[4],
+            make_screenshot=result[5],
+            enabled=result[6],
+            polygon=result[7],
+            starts_from=result[8],
+        ))
+
+    cached = read_through(cfg, "resource", RESOURCE_CACHE_KEY.format(resource_id), load)
+    if cached is None:
         return None
-    cur.close()
-    conn.close()
-    return Resource(
-        id=resource_id,
-        url=result[0],
-        name=result[1],
-        description=result[2],
-        keywords=result[3],
-        interval=result[4],
-        make_screenshot=result[5],
-        enabled=result[6],
-        polygon=result[7],
-        starts_from=result[8],
-    )
+    return resource_from_cache(cached)
 
 
-def update_resource(
-    cfg: PostgreConfig,
+def get_resources_by_ids(cfg: PostgreConfig, resource_ids: List[str]) -> Dict[str, Resource]:
+    if len(resource_ids) == 0:
+        return {}
+    query = "SELECT id, url, name, description, key_words, interval, make_screenshot, enabled, monitoring_polygon, starts_from FROM resources WHERE id = ANY(%s)"
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query, (list(resource_ids),))
+        result = cur.fetchall()
+    return {
+        row[0]: Resource(
+            id=row[0],
+            url=row[1],
+            name=row[2],
+            description=row[3],
+            keywords=row[4],
+            interval=row[5],
+            make_screenshot=row[6],
+            enabled=row[7],
+            polygon=row[8],
+            starts_from=row[9],
+        )
+        for row in result
+    }
+
+
+def set_resources_enabled(cfg: PostgreConfig, resource_ids: List[str], enabled: bool) -> None:
+    if len(resource_ids) == 0:
+        return
+    query = "UPDATE resources SET enabled = %s WHERE id = ANY(%s)"
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query, (enabled, list(resource_ids)))
+    invalidate(cfg, [RESOURCE_CACHE_KEY.format(resource_id) for resource_id in resource_ids])
+
+
+@dataclass
+class ResourceUpdate:
+    resource_id: str
+    description: Optional[str] = None
+    keywords: Optional[List[str]] = None
+    interval: Optional[str] = None
+    enabled: Optional[bool] = None
+    starts_from: Optional[datetime.datetime] = None
+
+
+def build_update_resource_query(
     resource_id: Optional[str],
     description: Optional[str],
     keywords: Optional[str],
@@ -113,9 +223,7 @@ def update_resource(
     enabled: Optional[bool],
     polygon: Optional[List[Dict[str, Any]]],
     starts_from: Optional[datetime.datetime] = None,
-) -> None:
-    conn = get_connection(cfg)
-    cur = conn.cursor()
+) -> str:
     resources_table = Table("resources")
     query = Query.update(resources_table)
     if description is not None:
@@ -131,27 +239,78 @@ def update_resource(
     if starts_from is not None:
         query = query.set(resources_table.starts_from, starts_from)
     query = query.where(resources_table.id == resource_id)
-    if query.get_sql() is None or len(query.get_sql()) == 0:
+    return query.get_sql()
+
+
+def update_resource(
+    cfg: PostgreConfig,
+    resource_id: Optional[str],
+    description: Optional[str],
+    keywords: Optional[str],
+    interval: Optional[str],
+    enabled: Optional[bool],
+    polygon: Optional[List[Dict[str, Any]]],
+    starts_from: Optional[datetime.datetime] = None,
+) -> None:
+    query = build_update_resource_query(resource_id, description, keywords, interval, enabled, polygon, starts_from)
+    if query is None or len(query) == 0:
         return
-    cur.execute(query.get_sql())
-    conn.commit()
-    cur.close()
-    conn.close()
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query)
+    invalidate(cfg, [RESOURCE_CACHE_KEY.format(resource_id)])
+
 
+def update_resources(cfg: PostgreConfig, updates: List[ResourceUpdate]) -> None:
+    queries = [
+        build_update_resource_query(
+            update.resource_id,
+            update.description,
+            update.keywords,
+            update.interval,
+            update.enabled,
+            None,
+            update.starts_from,
+        )
+        for update in updates
+    ]
+    queries = [query for query in queries if query]
+    if len(queries) == 0:
+        return
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        for query in queries:
+            cur.execute(query)
+    invalidate(cfg, [RESOURCE_CACHE_KEY.format(update.resource_id) for update in updates])
 
-def get_all_resources(cfg: PostgreConfig, offset: Optional[int], limit: Optional[int]) -> List[Resource]:
-    conn = get_connection(cfg)
-    cur = conn.cursor()
-    query = "SELECT id, url, name, description, key_words, interval, make_screenshot, enabled, monitoring_polygon, starts_from FROM resources ORDER BY name"
+
+def get_all_resources(
+    cfg: PostgreConfig,
+    offset: Optional[int],
+    limit: Optional[int],
+    after: Optional[tuple[str, str]] = None,
+) -> List[Resource]:
+    resources_table = Table("resources")
+    query = Query.from_(resources_table).select(
+        resources_table.id,
+        resources_table.url,
+        resources_table.name,
+        resources_table.description,
+        resources_table.key_words,
+        resources_table.interval,
+        resources_table.make_screenshot,
+        resources_table.enabled,
+        resources_table.monitoring_polygon,
+        resources_table.starts_from,
+    )
+    if after is not None:
+        query = query.where(Tuple(resources_table.name, resources_table.id) > Tuple(*after))
+    query = query.orderby(resources_table.name).orderby(resources_table.id)
     if offset is not None:
-        query += " OFFSET %s" % offset
+        query = query.offset(offset)
     if limit is not None:
-        query += " LIMIT %s" % limit
-    cur.execute(query)
-    result = cur.fetchall()
-    cur.close()
-    conn.close()
-    print(result)
+        query = query.limit(limit)
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query.get_sql())
+        result = cur.fetchall()
     return [
         Resource(
             id=row[0],
@@ -1,7 +1,9 @@
 import boto3
 from botocore.exceptions import NoCredentialsError
 from api.config.config import S3Config
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+import gzip
+from typing import Any, Dict, List, Optional
 from io import BytesIO
 from PIL import Image
 
@@ -38,6 +40,23 @@ def add_object(cfg: S3Config, bucket_name: str, file_name: str, object_name: str
         return False
 
 
+def put_object(cfg: S3Config, bucket_name: str, object_name: str, data: bytes, content_type: str) -> bool:
+    s3 = boto3.client(
+        's3',
+        endpoint_url=cfg.connection_string,
+        aws_access_key_id=cfg.aws_access_key_id,
+        aws_secret_access_key=cfg.aws_secret_access_key,
+    )
+    try:
+        s3.put_object(Bucket=bucket_name, Key=object_name, Body=data, ContentType=content_type)
+        return True
+    except NoCredentialsError:
+        print("invalid credentials")
+        return False
+    except Exception:
+        return False
+
+
 def get_object(cfg: S3Config, bucket_name: str, object_name: str) -> Any:
     s3 = boto3.client(
         's3',
@@ -56,6 +75,23 @@ def get_object(cfg: S3Config, bucket_name: str, object_name: str) -> Any:
         return None
 
 
+def has_object(cfg: S3Config, bucket_name: str, object_name: str) -> bool:
+    s3 = boto3.client(
+        's3',
+        endpoint_url=cfg.connection_string,
+        aws_access_key_id=cfg.aws_access_key_id,
+        aws_secret_access_key=cfg.aws_secret_access_key,
+    )
+    try:
+        s3.head_object(Bucket=bucket_name, Key=object_name)
+        return True
+    except NoCredentialsError:
+        print("invalid credentials")
+        return False
+    except Exception:
+        return False
+
+
 def get_object_created_at(cfg: S3Config, bucket_name: str, object_name: str) -> Any:
     s3 = boto3.client(
         's3',
@@ -64,7 +100,7 @@ def get_object_created_at(cfg: S3Config, bucket_name: str, object_name: str) ->
         aws_secret_access_key=cfg.aws_secret_access_key,
     )
     try:
-        response = s3.get_object(Bucket=bucket_name, Key=object_name)
+        response = s3.head_object(Bucket=bucket_name, Key=object_name)
         return response['LastModified']
     except NoCredentialsError:
         print("invalid credentials")
@@ -73,6 +109,27 @@ def get_object_created_at(cfg: S3Config, bucket_name: str, object_name: str) ->
         return None
 
 
+def get_objects_created_at(cfg: S3Config, bucket_name: str, object_names: List[str], workers: int = 16) -> Dict[str, Any]:
+    s3 = boto3.client(
+        's3',
+        endpoint_url=cfg.connection_string,
+        aws_access_key_id=cfg.aws_access_key_id,
+        aws_secret_access_key=cfg.aws_secret_access_key,
+    )
+
+    def head(object_name: str) -> Any:
+        try:
+            return s3.head_object(Bucket=bucket_name, Key=object_name)['LastModified']
+        except Exception:
+            return None
+
+    if len(object_names) == 0:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(workers, len(object_names))) as executor:
+        created_at = executor.map(head, object_names)
+    return {name: time for name, time in zip(object_names, created_at) if time is not None}
+
+
 def get_image(cfg: S3Config, bucket_name: str, image_name: str) -> Image.Image:
     s3 = boto3.client(
         's3',
@@ -85,7 +142,7 @@ def get_image(cfg: S3Config, bucket_name: str, image_name: str) -> Image.Image:
     return Image.open(BytesIO(image_data))
 
 
-def get_all_files(cfg: S3Config, bucket_name: str) -> Any:
+def get_all_files(cfg: S3Config, bucket_name: str, prefix: str = '') -> Any:
     s3 = boto3.client(
         's3',
         endpoint_url=cfg.connection_string,
@@ -93,12 +150,55 @@ def get_all_files(cfg: S3Config, bucket_name: str) -> Any:
         aws_secret_access_key=cfg.aws_secret_access_key,
     )
     try:
-        response = s3.list_objects(Bucket=bucket_name)
-        if 'Contents' not in response:
-            return []
-        return response['Contents']
+        files = []
+        for page in s3.get_paginator('list_objects_v2').paginate(Bucket=bucket_name, Prefix=prefix):
+            files.extend(page.get('Contents', []))
+        return files
     except NoCredentialsError:
         print("invalid credentials")
         return None
     except Exception:
         return None
+
+
+# DeleteObjects accepts at most this many keys per request
+DELETE_OBJECTS_BATCH_SIZE = 1000
+
+
+def delete_objects(cfg: S3Config, bucket_name: str, object_names: List[str]) -> List[str]:
+    """Returns the names of deleted objects, the ones that failed are left in place."""
+    s3 = boto3.client(
+        's3',
+        endpoint_url=cfg.connection_string,
+        aws_access_key_id=cfg.aws_access_key_id,
+        aws_secret_access_key=cfg.aws_secret_access_key,
+    )
+    deleted = []
+    for start in range(0, len(object_names), DELETE_OBJECTS_BATCH_SIZE):
+        batch = object_names[start:start + DELETE_OBJECTS_BATCH_SIZE]
+        try:
+            response = s3.delete_objects(
+                Bucket=bucket_name,
+                Delete={'Objects': [{'Key': name} for name in batch], 'Quiet': True},
+            )
+        except Exception as e:
+            print(f"error while deleting objects from {bucket_name}: {e}")
+            continue
+        # quiet mode reports failed keys only
+        failed = set()
+        for error in response.get('Errors', []):
+            print(f"error while deleting {bucket_name}/{error['Key']}: {error.get('Message')}")
+            failed.add(error['Key'])
+        deleted.extend(name for name in batch if name not in failed)
+    return deleted
+
+
+def get_snapshot_text(cfg: S3Config, snapshot_id: str) -> Optional[str]:
+    text = get_object(cfg, 'texts', snapshot_id + '.txt.gz')
+    if text is None:
+        return None
+    return gzip.decompress(text).decode('utf-8')
+
+
+def save_snapshot_text(cfg: S3Config, snapshot_id: str, text: str) -> bool:
+    return put_object(cfg, 'texts', snapshot_id + '.txt.gz', gzip.compress(text.encode('utf-8')), 'application/gzip')
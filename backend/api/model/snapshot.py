@@ -0,0 +1,198 @@
+from api.config.config import PostgreConfig, SnapshotRetentionTier
+from api.model.connection_pool import get_connection
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass
+class ExpendableSnapshot:
+    id: str
+    resource_id: str
+
+
+@dataclass
+class SnapshotMatch:
+    snapshot_id: str
+    resource_id: str
+    created_at: datetime
+    snippet: str
+
+
+def get_snapshot_times(cfg: PostgreConfig, snapshot_ids: List[str]) -> Dict[str, datetime]:
+    if len(snapshot_ids) == 0:
+        return {}
+    query = "SELECT id, created_at FROM snapshots WHERE id = ANY(%s)"
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query, (list(snapshot_ids),))
+        result = cur.fetchall()
+    return {row[0]: row[1] for row in result}
+
+
+def get_resource_snapshot_times(cfg: PostgreConfig,
+                                resource_id: str,
+                                offset: Optional[int],
+                                limit: Optional[int]) -> List[Tuple[datetime, int]]:
+    query = "SELECT id, created_at FROM snapshots WHERE resource_id = %s ORDER BY created_at, id OFFSET %s LIMIT %s"
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query, (resource_id, offset, limit))
+        result = cur.fetchall()
+    return [(row[1], int(row[0].rsplit('_', 1)[1])) for row in result]
+
+
+def has_resource_snapshots(cfg: PostgreConfig, resource_id: str) -> bool:
+    query = "SELECT EXISTS (SELECT 1 FROM snapshots WHERE resource_id = %s)"
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query, (resource_id,))
+        return cur.fetchone()[0]
+
+
+def get_last_snapshot_number(cfg: PostgreConfig, resource_id: str) -> Optional[int]:
+    """Returns None when the resource has no rows, e.g. it was captured before the table existed."""
+    query = "SELECT MAX(split_part(id, '_', 2)::int) FROM snapshots WHERE resource_id = %s"
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query, (resource_id,))
+        return cur.fetchone()[0]
+
+
+def get_previous_snapshot_id(cfg: PostgreConfig, snapshot_id: str) -> Optional[str]:
+    # numbers are not contiguous once retention has thinned the snapshots
+    query = (
+        "SELECT prev.id FROM snapshots cur JOIN snapshots prev ON prev.resource_id = cur.resource_id "
+        "AND (prev.created_at, prev.id) < (cur.created_at, cur.id) "
+        "WHERE cur.id = %s ORDER BY prev.created_at DESC, prev.id DESC LIMIT 1"
+    )
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query, (snapshot_id,))
+        result = cur.fetchone()
+    return result[0] if result is not None else None
+
+
+def index_snapshot_text(cfg: PostgreConfig, snapshot_id: str, content: str, lemmas: str) -> bool:
+    query = (
+        "INSERT INTO snapshot_texts (snapshot_id, resource_id, created_at, content, search_vector) "
+        "SELECT id, resource_id, created_at, %s, snapshot_search_vector(%s, %s) FROM snapshots WHERE id = %s "
+        "ON CONFLICT (snapshot_id) DO UPDATE SET content = EXCLUDED.content, search_vector = EXCLUDED.search_vector"
+    )
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query, (content, content, lemmas, snapshot_id))
+        return cur.rowcount > 0
+
+
+def get_unindexed_snapshot_ids(cfg: PostgreConfig, limit: int) -> List[str]:
+    query = (
+        "SELECT s.id FROM snapshots s LEFT JOIN snapshot_texts t ON t.snapshot_id = s.id "
+        "WHERE s.has_html AND t.snapshot_id IS NULL ORDER BY s.created_at, s.id LIMIT %s"
+    )
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query, (limit,))
+        return [row[0] for row in cur.fetchall()]
+
+
+def get_expendable_snapshots(cfg: PostgreConfig,
+                             tiers: List[SnapshotRetentionTier],
+                             limit: int) -> List[ExpendableSnapshot]:
+    """Snapshots that can be deleted to thin storage down to the density of the retention tiers.
+
+    Each snapshot falls into the tier with the largest after_days it is older
+    than, and one snapshot per resource and tier interval is kept. Snapshots
+    referenced by events are never returned and count as the kept one of their
+    interval; the latest snapshot of every resource is kept too, the daemon
+    compares new checks with it and numbers snapshots after it.
+    """
+    if len(tiers) == 0:
+        return []
+    query = """
+        WITH tiers AS (
+            SELECT * FROM unnest(%(after_days)s::INT[], %(interval_hours)s::INT[]) AS tier(after_days, interval_hours)
+        ), candidates AS (
+            SELECT s.id, s.resource_id, s.created_at,
+                   EXISTS (SELECT 1 FROM monitoring_events e WHERE e.snapshot_id = s.id) AS referenced,
+                   s.created_at = MAX(s.created_at) OVER (PARTITION BY s.resource_id) AS latest,
+                   (
+                       SELECT tiers.interval_hours FROM tiers
+                       WHERE s.created_at < NOW() - make_interval(days => tiers.after_days)
+                       ORDER BY tiers.after_days DESC LIMIT 1
+                   ) AS interval_hours
+            FROM snapshots s
+        ), bucketed AS (
+            SELECT *, row_number() OVER (
+                PARTITION BY resource_id, interval_hours, floor(extract(epoch FROM created_at) / (interval_hours * 3600))
+                ORDER BY referenced DESC, latest DESC, created_at, id
+            ) AS position
+            FROM candidates
+            WHERE interval_hours IS NOT NULL
+        )
+        SELECT id, resource_id FROM bucketed
+        WHERE position > 1 AND NOT referenced AND NOT latest
+        ORDER BY resource_id, created_at, id
+        LIMIT %(limit)s
+    """
+    params = {
+        "after_days": [tier.after_days for tier in tiers],
+        "interval_hours": [tier.interval_hours for tier in tiers],
+        "limit": limit,
+    }
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query, params)
+        result = cur.fetchall()
+    return [ExpendableSnapshot(id=row[0], resource_id=row[1]) for row in result]
+
+
+def delete_snapshots(cfg: PostgreConfig, snapshot_ids: List[str]) -> int:
+    if len(snapshot_ids) == 0:
+        return 0
+    # indexed texts are removed by ON DELETE CASCADE
+    query = "DELETE FROM snapshots WHERE id = ANY(%s)"
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query, (list(snapshot_ids),))
+        return cur.rowcount
+
+
+def search_snapshot_texts(
+    cfg: PostgreConfig,
+    text: str,
+    lemmas: str,
+    resource_id: Optional[str],
+    since: Optional[datetime],
+    until: Optional[datetime],
+    limit: int,
+    after: Optional[tuple[datetime, str]] = None,
+) -> List[SnapshotMatch]:
+    conditions = ["search_vector @@ snapshot_search_query(%(text)s, %(lemmas)s)"]
+    if resource_id is not None:
+        conditions.append("resource_id = %(resource_id)s")
+    if since is not None:
+        conditions.append("created_at >= %(since)s")
+    if until is not None:
+        conditions.append("created_at < %(until)s")
+    if after is not None:
+        conditions.append("(created_at, snapshot_id) < (%(after_created_at)s, %(after_snapshot_id)s)")
+    # snippets are only built for the rows of the requested page
+    query = (
+        "WITH matches AS ("
+        "SELECT snapshot_id, resource_id, created_at, content FROM snapshot_texts "
+        "WHERE " + " AND ".join(conditions) + " "
+        "ORDER BY created_at DESC, snapshot_id DESC LIMIT %(limit)s) "
+        "SELECT snapshot_id, resource_id, created_at, ts_headline('russian', content, "
+        "snapshot_search_query(%(text)s, %(lemmas)s), "
+        "'StartSel=<b>, StopSel=</b>, MaxFragments=3, FragmentDelimiter=\" ... \"') "
+        "FROM matches ORDER BY created_at DESC, snapshot_id DESC"
+    )
+    params = {
+        "text": text,
+        "lemmas": lemmas,
+        "resource_id": resource_id,
+        "since": since,
+        "until": until,
+        "after_created_at": after[0] if after is not None else None,
+        "after_snapshot_id": after[1] if after is not None else None,
+        "limit": limit,
+    }
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query, params)
+        result = cur.fetchall()
+    return [
+        SnapshotMatch(snapshot_id=row[0], resource_id=row[1], created_at=row[2], snippet=row[3])
+        for row in result
+    ]
@@ -0,0 +1,23 @@
+from api.config.config import PostgreConfig
+from api.model.connection_pool import get_connection
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+
+@dataclass
+class CaptureStats:
+    captures: int
+    reused: int
+
+
+def get_capture_stats(cfg: PostgreConfig, since: Optional[datetime]) -> CaptureStats:
+    query = "SELECT COUNT(*), COALESCE(SUM(reused), 0) FROM url_captures"
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        if since is not None:
+            query += " WHERE captured_at >= %s"
+            cur.execute(query, (since,))
+        else:
+            cur.execute(query)
+        result = cur.fetchone()
+    return CaptureStats(captures=result[0], reused=result[1])
@@ -1,11 +1,15 @@
 from api.config.config import PostgreConfig
+from api.model.connection_pool import get_connection
 from dataclasses import dataclass
 from datetime import datetime
 import hashlib
-import psycopg2
-from typing import Optional
+import threading
+import time
+from typing import Dict, Optional, Tuple
 import uuid
 
+USER_CACHE_TTL = 30
+
 @dataclass
 class User:
     id: str
@@ -15,28 +19,43 @@ class User:
     deleted_at: Optional[datetime] = None
     is_admin: bool = False
 
-def get_connection(cfg: PostgreConfig):
-    return psycopg2.connect(
-        database=cfg.database,
-        user=cfg.user, 
-        password=cfg.password,
-        host=cfg.host,
-        port=cfg.port,
-    )
+# users are looked up on every authenticated request, so they are kept in
+# process for a few seconds; any change of users must call invalidate_user_cache
+_users_by_email: Dict[str, Tuple[float, User]] = {}
+_users_by_id: Dict[str, Tuple[float, User]] = {}
+_users_lock = threading.Lock()
+
+def _get_cached_user(cache: Dict[str, Tuple[float, User]], key: str) -> Optional[User]:
+    with _users_lock:
+        cached = cache.get(key)
+        if cached is None:
+            return None
+        if cached[0] < time.monotonic():
+            del cache[key]
+            return None
+        return cached[1]
+
+def _cache_user(user: User) -> None:
+    expires_at = time.monotonic() + USER_CACHE_TTL
+    with _users_lock:
+        _users_by_email[user.email] = (expires_at, user)
+        _users_by_id[user.id] = (expires_at, user)
+
+def invalidate_user_cache() -> None:
+    with _users_lock:
+        _users_by_email.clear()
+        _users_by_id.clear()
 
 def get_md5(password: str) -> str:
     return hashlib.md5(password.encode()).hexdigest()
 
 def create_user(cfg: PostgreConfig, name: str, password: str, email: str, is_admin: bool = False) -> User:
-    conn = get_connection(cfg)
-    cur = conn.cursor()
     query = "INSERT INTO users (id, name, password, email, deleted_at, is_admin) VALUES (%s, %s, %s, %s, NULL, %s);"
     new_uid = str(uuid.uuid4())
     password_hash = get_md5(password)
-    cur.execute(query, (new_uid, name, password_hash, email, is_admin))
-    conn.commit()
-    cur.close()
-    conn.close()
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query, (new_uid, name, password_hash, email, is_admin))
+    invalidate_user_cache()
     return User(
         id=new_uid,
         username=name,
@@ -47,14 +66,16 @@ def create_user(cfg: PostgreConfig, name: str, password: str, email: str, is_adm
     )
 
 def get_user_by_id(cfg: PostgreConfig, id: str) -> Optional[User]:
-    conn = get_connection(cfg)
-    cur = conn.cursor()
+    user = _get_cached_user(_users_by_id, id)
+    if user is not None:
+        return user
     query = "SELECT name, password, email, deleted_at, is_admin FROM users WHERE id = %s"
-    cur.execute(query, (id,))
-    row = cur.fetchone()
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query, (id,))
+        row = cur.fetchone()
     if row is None:
         return None
-    return User(
+    user = User(
         id=id,
         username=row[0],
         password=row[1],
@@ -62,15 +83,14 @@ def get_user_by_id(cfg: PostgreConfig, id: str) -> Optional[User]:
         deleted_at=row[3],
         is_admin=row[4],
     )
+    _cache_user(user)
+    return user
 
 def get_user_by_username(cfg: PostgreConfig, name: str) -> Optional[User]:
-    conn = get_connection(cfg)
-    cur = conn.cursor()
     query = "SELECT id, password, email, deleted_at, is_admin FROM users WHERE name = %s"
-    cur.execute(query, (name,))
-    row = cur.fetchone()
-    cur.close()
-    conn.close()
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query, (name,))
+        row = cur.fetchone()
     if row is None:
         return None
     return User(
@@ -83,14 +103,16 @@ def get_user_by_username(cfg: PostgreConfig, name: str) -> Optional[User]:
     )
 
 def get_user_by_email(cfg: PostgreConfig, email: str) -> Optional[User]:
-    conn = get_connection(cfg)
-    cur = conn.cursor()
+    user = _get_cached_user(_users_by_email, email)
+    if user is not None:
+        return user
     query = "SELECT id, name, password, deleted_at, is_admin FROM users WHERE email = %s"
-    cur.execute(query, (email,))
-    row = cur.fetchone()
+    with get_connection(cfg) as conn, conn.cursor() as cur:
+        cur.execute(query, (email,))
+        row = cur.fetchone()
     if row is None:
         return None
-    return User(
+    user = User(
         id=row[0],
         username=row[1],
         password=row[2],
@@ -98,3 +120,5 @@ def get_user_by_email(cfg: PostgreConfig, email: str) -> Optional[User]:
         deleted_at=row[3],
         is_admin=row[4],
     )
+    _cache_user(user)
+    return user
@@ -1,4 +1,5 @@
 from crontab import CronTab
+from typing import List, Tuple
 
 
 def create_cron_job(command: str, schedule: str, id: str) -> bool:
@@ -40,3 +41,24 @@ def update_cron_job(command: str, schedule: str, id: str) -> bool:
         return True
     except:
         return False
+
+
+def sync_cron_jobs(jobs: List[Tuple[str, str, str]], removed_ids: List[str]) -> bool:
+    # jobs are (command, schedule, id); the crontab is read and written once
+    try:
+        cron = CronTab(user=True)
+        existing = {job.comment: job for job in cron}
+        for id in removed_ids:
+            if id in existing:
+                cron.remove(existing.pop(id))
+        for command, schedule, id in jobs:
+            job = existing.get(id)
+            if job is None:
+                job = cron.new(command=command, comment=id)
+            else:
+                job.set_command(command)
+            job.setall(schedule)
+        cron.write()
+        return True
+    except:
+        return False
@@ -0,0 +1,239 @@
+from dataclasses import dataclass
+import math
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DIFF_GRANULARITIES = ("line", "word")
+# like git, the search for the middle snake gives up after this many edits
+# (or the square root of the range size when larger) and splits at the
+# furthest point reached; the script is then not minimal, but the time
+# spent on unrelated texts stays bounded
+DIFF_MIN_COST = 256
+# diagonals the whole diff may explore; once spent, the ranges left are
+# reported as replaced as a whole
+DIFF_MAX_WORK = 1_000_000
+# texts with more tokens are not compared
+DIFF_MAX_TOKENS = 50_000
+
+# words and the whitespace between them are separate tokens, so joining
+# tokens gives back the original text
+_WORD_TOKEN = re.compile(r"\s+|\w+|[^\w\s]")
+
+
+@dataclass
+class DiffOp:
+    op: str  # "=", "-" or "+"
+    old_start: int
+    old_end: int
+    new_start: int
+    new_end: int
+
+
+@dataclass
+class DiffHunk:
+    old_start: int
+    old_count: int
+    new_start: int
+    new_count: int
+    # consecutive tokens with the same op are joined: [op, text]
+    changes: List[Tuple[str, str]]
+
+
+def tokenize(text: str, granularity: str) -> List[str]:
+    if granularity == "line":
+        return text.splitlines(keepends=True)
+    return _WORD_TOKEN.findall(text)
+
+
+def _intern(old: Sequence[str], new: Sequence[str]) -> Tuple[List[int], List[int]]:
+    # comparing small ints is much cheaper than comparing strings in the inner loops
+    ids: Dict[str, int] = {}
+    return [ids.setdefault(token, len(ids)) for token in old], [ids.setdefault(token, len(ids)) for token in new]
+
+
+def _emit(ops: List[DiffOp], op: str, old_start: int, old_end: int, new_start: int, new_end: int) -> None:
+    if old_start == old_end and new_start == new_end:
+        return
+    if ops and ops[-1].op == op:
+        ops[-1].old_end = old_end
+        ops[-1].new_end = new_end
+        return
+    ops.append(DiffOp(op, old_start, old_end, new_start, new_end))
+
+
+def _furthest_split(forward: List[int], reverse: List[int], offset: int, d: int, n: int, m: int) -> Tuple[int, int]:
+    best = (0, 0)
+    best_progress = 0
+    for k in range(-d, d + 1, 2):
+        x = forward[offset + k]
+        y = x - k
+        if 0 <= x <= n and 0 <= y <= m and x + y > best_progress:
+            best, best_progress = (x, y), x + y
+        x = reverse[offset + k]
+        y = x - k
+        if 0 <= x <= n and 0 <= y <= m and x + y > best_progress:
+            best, best_progress = (n - x, m - y), x + y
+    return best
+
+
+def _middle_snake(a: List[int], a_lo: int, a_hi: int,
+                  b: List[int], b_lo: int, b_hi: int,
+                  budget: List[int]) -> Optional[Tuple[int, int]]:
+    """Finds where the forward and reverse Myers searches meet, in O(n + m) space.
+
+    Returns the split point relative to (a_lo, b_lo), or None when the ranges
+    have nothing in common.
+    """
+    n = a_hi - a_lo
+    m = b_hi - b_lo
+    max_cost = max(DIFF_MIN_COST, math.isqrt(n + m))
+    max_d = min((n + m + 1) // 2, max_cost + 1)
+    offset = max_d + 1
+    size = 2 * max_d + 3
+    forward = [-1] * size
+    reverse = [-1] * size
+    forward[offset + 1] = 0
+    reverse[offset + 1] = 0
+    delta = n - m
+    # with an odd delta the forward search detects the overlap, otherwise the reverse one
+    front = delta % 2 != 0
+    k1_start = k1_end = k2_start = k2_end = 0
+    for d in range(max_d):
+        for k1 in range(-d + k1_start, d + 1 - k1_end, 2):
+            k1_index = offset + k1
+            if k1 == -d or (k1 != d and forward[k1_index - 1] < forward[k1_index + 1]):
+                x1 = forward[k1_index + 1]
+            else:
+                x1 = forward[k1_index - 1] + 1
+            y1 = x1 - k1
+            while x1 < n and y1 < m and a[a_lo + x1] == b[b_lo + y1]:
+                x1 += 1
+                y1 += 1
+            forward[k1_index] = x1
+            if x1 > n:
+                k1_end += 2
+            elif y1 > m:
+                k1_start += 2
+            elif front:
+                k2_index = offset + delta - k1
+                if 0 <= k2_index < size and reverse[k2_index] != -1 and x1 >= n - reverse[k2_index]:
+                    return x1, y1
+        for k2 in range(-d + k2_start, d + 1 - k2_end, 2):
+            k2_index = offset + k2
+            if k2 == -d or (k2 != d and reverse[k2_index - 1] < reverse[k2_index + 1]):
+                x2 = reverse[k2_index + 1]
+            else:
+                x2 = reverse[k2_index - 1] + 1
+            y2 = x2 - k2
+            while x2 < n and y2 < m and a[a_hi - x2 - 1] == b[b_hi - y2 - 1]:
+                x2 += 1
+                y2 += 1
+            reverse[k2_index] = x2
+            if x2 > n:
+                k2_end += 2
+            elif y2 > m:
+                k2_start += 2
+            elif not front:
+                k1_index = offset + delta - k2
+                if 0 <= k1_index < size and forward[k1_index] != -1:
+                    x1 = forward[k1_index]
+                    y1 = x1 - (delta - k2)
+                    if x1 >= n - x2:
+                        return x1, y1
+        budget[0] -= 2 * d + 2
+        if d >= max_cost or budget[0] <= 0:
+            return _furthest_split(forward, reverse, offset, d, n, m)
+    return None
+
+
+def _diff(a: List[int], a_lo: int, a_hi: int,
+          b: List[int], b_lo: int, b_hi: int,
+          ops: List[DiffOp],
+          budget: List[int]) -> None:
+    prefix_a, prefix_b = a_lo, b_lo
+    while a_lo < a_hi and b_lo < b_hi and a[a_lo] == b[b_lo]:
+        a_lo += 1
+        b_lo += 1
+    _emit(ops, "=", prefix_a, a_lo, prefix_b, b_lo)
+    suffix_a, suffix_b = a_hi, b_hi
+    while a_hi > a_lo and b_hi > b_lo and a[a_hi - 1] == b[b_hi - 1]:
+        a_hi -= 1
+        b_hi -= 1
+    if a_lo == a_hi or b_lo == b_hi or budget[0] <= 0:
+        split = None
+    else:
+        split = _middle_snake(a, a_lo, a_hi, b, b_lo, b_hi, budget)
+        if split in ((0, 0), (a_hi - a_lo, b_hi - b_lo)):
+            split = None
+    if split is None:
+        _emit(ops, "-", a_lo, a_hi, b_lo, b_lo)
+        _emit(ops, "+", a_hi, a_hi, b_lo, b_hi)
+    else:
+        x, y = split
+        _diff(a, a_lo, a_lo + x, b, b_lo, b_lo + y, ops, budget)
+        _diff(a, a_lo + x, a_hi, b, b_lo + y, b_hi, ops, budget)
+    _emit(ops, "=", a_hi, suffix_a, b_hi, suffix_b)
+
+
+def diff_tokens(old: Sequence[str], new: Sequence[str]) -> List[DiffOp]:
+    """Edit script between two token lists (Myers, linear space divide and conquer).
+
+    The script is minimal unless a part of the texts needs more than the cost
+    limit of edits or the work budget runs out, see DIFF_MIN_COST and
+    DIFF_MAX_WORK.
+    """
+    a, b = _intern(old, new)
+    ops: List[DiffOp] = []
+    # shared by all ranges, a list so the recursion can spend it
+    budget = [DIFF_MAX_WORK]
+    _diff(a, 0, len(a), b, 0, len(b), ops, budget)
+    return ops
+
+
+def build_hunks(old: Sequence[str], new: Sequence[str], ops: List[DiffOp], context: int) -> List[DiffHunk]:
+    """Groups changes with up to `context` unchanged tokens around them, like a unified diff."""
+    hunks: List[DiffHunk] = []
+    hunk: Optional[DiffHunk] = None
+    for index, op in enumerate(ops):
+        if op.op != "=":
+            if hunk is None:
+                hunk = DiffHunk(old_start=op.old_start, old_count=0, new_start=op.new_start, new_count=0, changes=[])
+                if index > 0:
+                    leading = min(context, op.old_start - ops[index - 1].old_start)
+                    hunk.old_start -= leading
+                    hunk.new_start -= leading
+                    if leading > 0:
+                        hunk.changes.append(("=", "".join(old[op.old_start - leading:op.old_start])))
+            if op.op == "-":
+                hunk.changes.append(("-", "".join(old[op.old_start:op.old_end])))
+            else:
+                hunk.changes.append(("+", "".join(new[op.new_start:op.new_end])))
+            continue
+        if hunk is None:
+            continue
+        length = op.old_end - op.old_start
+        if index < len(ops) - 1 and length <= 2 * context:
+            # short unchanged runs between changes stay inside the hunk
+            hunk.changes.append(("=", "".join(old[op.old_start:op.old_end])))
+            continue
+        trailing = min(context, length)
+        if trailing > 0:
+            hunk.changes.append(("=", "".join(old[op.old_start:op.old_start + trailing])))
+        hunk.old_count = op.old_start + trailing - hunk.old_start
+        hunk.new_count = op.new_start + trailing - hunk.new_start
+        hunks.append(hunk)
+        hunk = None
+    if hunk is not None:
+        hunk.old_count = len(old) - hunk.old_start
+        hunk.new_count = len(new) - hunk.new_start
+        hunks.append(hunk)
+    return hunks
+
+
+def diff_texts(old_text: str, new_text: str, granularity: str, context: int) -> Optional[List[DiffHunk]]:
+    """Returns None when a text has more than DIFF_MAX_TOKENS tokens."""
+    old = tokenize(old_text, granularity)
+    new = tokenize(new_text, granularity)
+    if len(old) > DIFF_MAX_TOKENS or len(new) > DIFF_MAX_TOKENS:
+        return None
+    return build_hunks(old, new, diff_tokens(old, new), context)
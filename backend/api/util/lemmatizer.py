@@ -0,0 +1,28 @@
+from functools import lru_cache
+import re
+import threading
+from typing import Optional
+
+import pymorphy2
+
+_morph: Optional[pymorphy2.MorphAnalyzer] = None
+_morph_lock = threading.Lock()
+
+
+def _get_morph() -> pymorphy2.MorphAnalyzer:
+    global _morph
+    if _morph is None:
+        with _morph_lock:
+            if _morph is None:
+                # вначале надо устанавливать пакет для русских слов: pip install -U pymorphy2-dicts-ru
+                _morph = pymorphy2.MorphAnalyzer(lang='ru')
+    return _morph
+
+
+@lru_cache(maxsize=100000)
+def lemmatize_word(word: str) -> str:
+    return _get_morph().parse(word)[0].normal_form
+
+
+def lemmatize(text: str) -> str:
+    return ' '.join(lemmatize_word(word.lower()) for word in re.findall(r'\b\w+\b', text))
@@ -0,0 +1,41 @@
+from contextlib import contextmanager
+from dataclasses import dataclass
+import threading
+import time
+from typing import Dict, Iterator
+
+
+@dataclass
+class LatencyStats:
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+
+_latencies: Dict[str, LatencyStats] = {}
+_latencies_lock = threading.Lock()
+
+
+def observe_latency(name: str, seconds: float) -> None:
+    with _latencies_lock:
+        stats = _latencies.setdefault(name, LatencyStats())
+        stats.count += 1
+        stats.total_ms += seconds * 1000
+        stats.max_ms = max(stats.max_ms, seconds * 1000)
+
+
+@contextmanager
+def measure_latency(name: str) -> Iterator[None]:
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_latency(name, time.perf_counter() - started_at)
+
+
+def get_latency_stats() -> Dict[str, LatencyStats]:
+    with _latencies_lock:
+        return {
+            name: LatencyStats(count=stats.count, total_ms=stats.total_ms, max_ms=stats.max_ms)
+            for name, stats in _latencies.items()
+        }
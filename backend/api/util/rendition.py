@@ -0,0 +1,44 @@
+from io import BytesIO
+from PIL import Image
+from typing import Dict, Tuple
+
+RENDITION_WIDTHS = (160, 320, 640, 1280)
+
+# format name -> (Pillow encoder, mimetype)
+RENDITION_FORMATS: Dict[str, Tuple[str, str]] = {
+    "webp": ("WEBP", "image/webp"),
+    "jpeg": ("JPEG", "image/jpeg"),
+    "png": ("PNG", "image/png"),
+}
+if "AVIF" in Image.SAVE:
+    RENDITION_FORMATS["avif"] = ("AVIF", "image/avif")
+
+# largest side the encoders accept, taller full page screenshots are cropped
+ENCODER_MAX_SIZES: Dict[str, int] = {
+    "WEBP": 16383,
+    "JPEG": 65535,
+    "AVIF": 65536,
+}
+
+
+def get_rendition_name(snapshot_id: str, width: int, format: str) -> str:
+    return f"renditions/{snapshot_id}/w{width}.{format}"
+
+
+def render_screenshot(image_data: bytes, width: int, format: str) -> bytes:
+    encoder, _ = RENDITION_FORMATS[format]
+    image = Image.open(BytesIO(image_data))
+    if image.width > width:
+        height = max(1, round(image.height * width / image.width))
+        image = image.resize((width, height), Image.Resampling.LANCZOS)
+    max_size = ENCODER_MAX_SIZES.get(encoder)
+    if max_size is not None and image.height > max_size:
+        image = image.crop((0, 0, image.width, max_size))
+    if encoder == "JPEG" and image.mode != "RGB":
+        image = image.convert("RGB")
+    output = BytesIO()
+    if encoder == "PNG":
+        image.save(output, encoder, optimize=True)
+    else:
+        image.save(output, encoder, quality=80)
+    return output.getvalue()
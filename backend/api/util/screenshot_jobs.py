@@ -0,0 +1,152 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+import uuid
+
+SCREENSHOT_WORKERS = 2
+SCREENSHOT_QUEUE_SIZE = 16
+SCREENSHOT_CACHE_TTL = 300
+SCREENSHOT_JOB_TTL = 600
+
+logger = logging.getLogger("api")
+
+
+@dataclass
+class ScreenshotJob:
+    id: str
+    url: str
+    status: str
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    screenshot: Optional[str] = None
+    error: Optional[str] = None
+    done: threading.Event = field(default_factory=threading.Event, repr=False, compare=False)
+
+
+@dataclass
+class ScreenshotQueueStats:
+    workers: int
+    queue_size: int
+    queued: int
+    running: int
+    completed: int
+    failed: int
+    rejected: int
+    cache_hits: int
+
+
+# every browser launch holds a chrome process for several seconds, so previews
+# run on a small pool and the queue in front of it is bounded
+_executor = ThreadPoolExecutor(max_workers=SCREENSHOT_WORKERS, thread_name_prefix="screenshot")
+_jobs: Dict[str, ScreenshotJob] = {}
+_active_jobs_by_url: Dict[str, ScreenshotJob] = {}
+_screenshots_by_url: Dict[str, Tuple[float, str]] = {}
+_counters: Dict[str, int] = {"completed": 0, "failed": 0, "rejected": 0, "cache_hits": 0}
+_jobs_lock = threading.Lock()
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _drop_expired() -> None:
+    now = time.monotonic()
+    for url in [url for url, cached in _screenshots_by_url.items() if cached[0] < now]:
+        del _screenshots_by_url[url]
+    expired_before = _now().timestamp() - SCREENSHOT_JOB_TTL
+    for job_id in [
+        job_id for job_id, job in _jobs.items()
+        if job.finished_at is not None and job.finished_at.timestamp() < expired_before
+    ]:
+        del _jobs[job_id]
+
+
+def _run_job(job: ScreenshotJob, capture: Callable[[str], str]) -> None:
+    with _jobs_lock:
+        job.status = "running"
+    try:
+        screenshot = capture(job.url)
+    except Exception as e:
+        logger.warning("screenshot of %s failed: %s", job.url, e)
+        with _jobs_lock:
+            job.status = "failed"
+            job.error = str(e)
+            job.finished_at = _now()
+            _counters["failed"] += 1
+            _active_jobs_by_url.pop(job.url, None)
+        job.done.set()
+        return
+    with _jobs_lock:
+        job.status = "done"
+        job.screenshot = screenshot
+        job.finished_at = _now()
+        _counters["completed"] += 1
+        _active_jobs_by_url.pop(job.url, None)
+        _screenshots_by_url[job.url] = (time.monotonic() + SCREENSHOT_CACHE_TTL, screenshot)
+    job.done.set()
+
+
+def submit_screenshot_job(url: str, capture: Callable[[str], str]) -> Optional[ScreenshotJob]:
+    """Returns None when the queue is full."""
+    with _jobs_lock:
+        _drop_expired()
+        cached = _screenshots_by_url.get(url)
+        if cached is not None:
+            _counters["cache_hits"] += 1
+            now = _now()
+            job = ScreenshotJob(
+                id=str(uuid.uuid4()),
+                url=url,
+                status="done",
+                created_at=now,
+                finished_at=now,
+                screenshot=cached[1],
+            )
+            job.done.set()
+            _jobs[job.id] = job
+            return job
+        # the same page requested twice while it is being captured shares one browser run
+        active_job = _active_jobs_by_url.get(url)
+        if active_job is not None:
+            return active_job
+        if len(_active_jobs_by_url) >= SCREENSHOT_QUEUE_SIZE:
+            _counters["rejected"] += 1
+            return None
+        job = ScreenshotJob(id=str(uuid.uuid4()), url=url, status="queued", created_at=_now())
+        _jobs[job.id] = job
+        _active_jobs_by_url[url] = job
+    _executor.submit(_run_job, job, capture)
+    return job
+
+
+def get_screenshot_job(job_id: str, wait: float = 0) -> Optional[ScreenshotJob]:
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    if job is not None and wait > 0:
+        job.done.wait(wait)
+    return job
+
+
+def get_screenshot_queue_stats() -> ScreenshotQueueStats:
+    with _jobs_lock:
+        queued = sum(1 for job in _active_jobs_by_url.values() if job.status == "queued")
+        return ScreenshotQueueStats(
+            workers=SCREENSHOT_WORKERS,
+            queue_size=SCREENSHOT_QUEUE_SIZE,
+            queued=queued,
+            running=len(_active_jobs_by_url) - queued,
+            completed=_counters["completed"],
+            failed=_counters["failed"],
+            rejected=_counters["rejected"],
+            cache_hits=_counters["cache_hits"],
+        )
+
+
+def clear_screenshot_jobs() -> None:
+    with _jobs_lock:
+        _jobs.clear()
+        _screenshots_by_url.clear()
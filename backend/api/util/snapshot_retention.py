@@ -0,0 +1,79 @@
+from api.config.config import PostgreConfig, S3Config, SnapshotRetentionConfig
+from api.model.s3_interactor import delete_objects, get_all_files
+from api.model.snapshot import delete_snapshots, get_expendable_snapshots
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+SNAPSHOT_RETENTION_BATCH_SIZE = 1000
+
+
+@dataclass
+class RetentionReport:
+    snapshots: int = 0
+    objects: int = 0
+    reclaimed_bytes: int = 0
+    failed_objects: int = 0
+
+
+def _snapshot_id_of(object_name: str) -> str:
+    # screenshots, htmls and texts are <snapshot_id>.<ext>, renditions are renditions/<snapshot_id>/<name>
+    if object_name.startswith('renditions/'):
+        return object_name.split('/')[1]
+    return object_name.split('.')[0]
+
+
+def _list_resource_objects(cfg: S3Config, resource_id: str) -> Optional[List[Tuple[str, str, int]]]:
+    """Returns (bucket, object name, size) of every snapshot object of the resource, None when listing failed."""
+    objects = []
+    for bucket_name, prefix in [
+        ('images', resource_id + '_'),
+        ('images', 'renditions/' + resource_id + '_'),
+        ('htmls', resource_id + '_'),
+        ('texts', resource_id + '_'),
+    ]:
+        files = get_all_files(cfg, bucket_name, prefix)
+        if files is None:
+            return None
+        objects.extend((bucket_name, obj['Key'], obj['Size']) for obj in files)
+    return objects
+
+
+def compact_snapshots(postgre_cfg: PostgreConfig,
+                      s3_cfg: S3Config,
+                      retention: SnapshotRetentionConfig) -> RetentionReport:
+    """Deletes snapshots beyond the density of the retention tiers, objects first and then their rows."""
+    report = RetentionReport()
+    while True:
+        snapshots = get_expendable_snapshots(postgre_cfg, retention.tiers, SNAPSHOT_RETENTION_BATCH_SIZE)
+        if len(snapshots) == 0:
+            break
+        snapshot_ids_by_resource: Dict[str, List[str]] = {}
+        for snapshot in snapshots:
+            snapshot_ids_by_resource.setdefault(snapshot.resource_id, []).append(snapshot.id)
+        # objects are listed by resource prefix, one listing covers all of its snapshots
+        sizes_by_bucket: Dict[str, Dict[str, int]] = {}
+        removable_ids = set()
+        for resource_id, snapshot_ids in snapshot_ids_by_resource.items():
+            objects = _list_resource_objects(s3_cfg, resource_id)
+            if objects is None:
+                print(f'failed to list objects of resource {resource_id}, its snapshots are kept')
+                continue
+            snapshot_ids = set(snapshot_ids)
+            for bucket_name, object_name, size in objects:
+                if _snapshot_id_of(object_name) in snapshot_ids:
+                    sizes_by_bucket.setdefault(bucket_name, {})[object_name] = size
+            removable_ids |= snapshot_ids
+        for bucket_name, sizes in sizes_by_bucket.items():
+            deleted = set(delete_objects(s3_cfg, bucket_name, list(sizes)))
+            report.objects += len(deleted)
+            report.reclaimed_bytes += sum(sizes[object_name] for object_name in deleted)
+            failed = [object_name for object_name in sizes if object_name not in deleted]
+            report.failed_objects += len(failed)
+            # rows of partially deleted snapshots are kept so they are retried next time
+            removable_ids -= {_snapshot_id_of(object_name) for object_name in failed}
+        deleted_snapshots = delete_snapshots(postgre_cfg, sorted(removable_ids))
+        report.snapshots += deleted_snapshots
+        if deleted_snapshots == 0:
+            # everything left failed, the next batch would be the same
+            break
+    return report
@@ -1,7 +1,8 @@
 from api.model.resource import Resource
-from api.config.config import ServerConfig, S3Config
-from api.util.cron import create_cron_job, update_cron_job, kill_cron_job
+from api.config.config import PostgreConfig, ServerConfig, S3Config
+from api.util.cron import create_cron_job, update_cron_job, kill_cron_job, sync_cron_jobs
 from api.model.s3_interactor import get_all_files
+from api.model.snapshot import get_last_snapshot_number, get_resource_snapshot_times, has_resource_snapshots
 from datetime import datetime
 from typing import List, Tuple, Optional
 from selenium import webdriver
@@ -17,6 +18,23 @@ def build_query(resource: Resource, server_config: ServerConfig) -> str:
     return query
 
 
+MAINTENANCE_CRON_ID = "maintenance"
+MAINTENANCE_SCHEDULE = "0 3 * * *"
+# the directory containing the api package
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def schedule_maintenance(server_config: ServerConfig) -> bool:
+    # cron does not inherit the environment of the container, the package has
+    # to be importable without the PYTHONPATH of the image
+    query = (
+        f'. {server_config.venv_path} && cd {APP_ROOT} '
+        f'&& export CONFIG_FILE={os.getenv("CONFIG_FILE", "config.yaml")} PYTHONPATH={APP_ROOT} '
+        f'&& python3 -m api.maintenance > /app/maintenance.log 2>&1'
+    )
+    return sync_cron_jobs([(query, MAINTENANCE_SCHEDULE, MAINTENANCE_CRON_ID)], [])
+
+
 def create_daemon_cron_job_for_resource(resource: Resource, server_config: ServerConfig) -> bool:
     query = build_query(resource, server_config)
     return create_cron_job(query, resource.interval, resource.id)
@@ -29,28 +47,54 @@ def update_daemon_cron_job_for_resource(resource: Resource, server_config: Serve
     return update_cron_job(query, resource.interval, resource.id)
 
 
-def get_last_snapshot_id(cfg: S3Config, resource_id: str) -> int:
-    images = get_all_files(cfg, 'images')
-    htmls = get_all_files(cfg, 'htmls')
+def sync_daemon_cron_jobs_for_resources(resources: List[Resource], server_config: ServerConfig) -> bool:
+    jobs = [
+        (build_query(resource, server_config), resource.interval, resource.id)
+        for resource in resources
+        if resource.enabled
+    ]
+    removed_ids = [resource.id for resource in resources if not resource.enabled]
+    return sync_cron_jobs(jobs, removed_ids)
+
+
+def get_last_snapshot_id(postgre_cfg: PostgreConfig, s3_cfg: S3Config, resource_id: str) -> Optional[int]:
+    """Returns None when the objects of the resource could not be listed."""
+    max_id = get_last_snapshot_number(postgre_cfg, resource_id)
+    if max_id is not None:
+        return max_id
+    # resources captured before the snapshots table existed and not backfilled yet
+    prefix = resource_id + '_'
     max_id = 0
-    for image in images:
-        if image['Key'].startswith(resource_id):
-            max_id = max(max_id, int(image['Key'].replace('.', '_').split('_')[1]))
-    for html in htmls:
-        if html['Key'].startswith(resource_id):
-            max_id = max(max_id, int(html['Key'].replace('.', '_').split('_')[1]))
+    for bucket_name in ['images', 'htmls']:
+        files = get_all_files(s3_cfg, bucket_name, prefix)
+        if files is None:
+            return None
+        for obj in files:
+            number = obj['Key'][len(prefix):].split('.')[0]
+            if number.isdigit():
+                max_id = max(max_id, int(number))
     return max_id
 
 
-def get_snapshot_times_by_resource_id(cfg: S3Config,
+def get_snapshot_times_by_resource_id(postgre_cfg: PostgreConfig,
+                                      s3_cfg: S3Config,
                                       resource_id: str,
                                       offset: Optional[int],
-                                      limit: Optional[int]) -> List[Tuple[datetime, int]]:
-    images = get_all_files(cfg, 'images')
+                                      limit: Optional[int]) -> Optional[List[Tuple[datetime, int]]]:
+    """Returns None when the objects of the resource could not be listed."""
+    dates = get_resource_snapshot_times(postgre_cfg, resource_id, offset, limit)
+    if len(dates) > 0 or has_resource_snapshots(postgre_cfg, resource_id):
+        return dates
+    # resources captured before the snapshots table existed and not backfilled yet
+    prefix = resource_id + '_'
+    images = get_all_files(s3_cfg, 'images', prefix)
+    if images is None:
+        return None
     dates = []
-    for i in range(len(images)):
-        if images[i]['Key'].startswith(resource_id):
-            dates.append((images[i]['LastModified'], int(images[i]['Key'].split('_')[1].split('.')[0])))
+    for image in images:
+        number = image['Key'][len(prefix):].split('.')[0]
+        if number.isdigit():
+            dates.append((image['LastModified'], int(number)))
     dates = sorted(dates, key=lambda x: x[0])
     if offset is not None and offset > 0:
         dates = dates[offset:]
@@ -65,11 +109,14 @@ def get_url_image_base_64(url: str) -> str:
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
     driver = webdriver.Chrome(options=chrome_options)
-    driver.get(url)
-    time.sleep(5)
-    page_height = driver.execute_script("return document.body.scrollHeight")
-    page_width = driver.execute_script("return document.body.scrollWidth")
-    driver.set_window_size(page_width, page_height)
-    screenshot = driver.get_screenshot_as_png()
+    try:
+        driver.get(url)
+        time.sleep(5)
+        page_height = driver.execute_script("return document.body.scrollHeight")
+        page_width = driver.execute_script("return document.body.scrollWidth")
+        driver.set_window_size(page_width, page_height)
+        screenshot = driver.get_screenshot_as_png()
+    finally:
+        driver.quit()
     base64_screenshot = base64.b64encode(screenshot).decode('utf-8')
     return base64_screenshot
@@ -33,6 +33,13 @@ def validate_uuid(uuid: str) -> bool:
     return pattern.match(uuid)
 
 
+def validate_snapshot_id(snapshot_id: str) -> bool:
+    pattern = re.compile(
+        "^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}_[0-9]+$"
+    )
+    return pattern.match(snapshot_id)
+
+
 def validate_url(url: str) -> bool:
     # TODO: найти нормальную регулярку на url
     return True
@@ -0,0 +1,27 @@
+from config.config import RedisConfig
+import json
+import redis
+from typing import Callable, Optional
+
+# same key layout and payload as api/model/cache.py, so resources cached by
+# the daemon are served to the api and invalidated by its updates
+RESOURCE_CACHE_KEY = "resource:v1:{}"
+CACHE_TTL = 300
+
+
+def read_through(cfg: RedisConfig, key: str, load: Callable[[], Optional[dict]]) -> Optional[dict]:
+    client = redis.Redis(host=cfg.host, port=cfg.port, db=cfg.db)
+    try:
+        cached = client.get(key)
+    except redis.RedisError as e:
+        print(f'Cache read of {key} failed: {e}')
+        return load()
+    if cached is not None:
+        return json.loads(cached)
+    value = load()
+    if value is not None:
+        try:
+            client.set(key, json.dumps(value), ex=CACHE_TTL)
+        except redis.RedisError as e:
+            print(f'Cache write of {key} failed: {e}')
+    return value
@@ -0,0 +1,80 @@
+from config.config import MonitoringConfig, PostgreConfig
+from datetime import datetime, timedelta
+import psycopg2
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+
+def get_connection(cfg: PostgreConfig):
+    return psycopg2.connect(
+        database=cfg.database,
+        user=cfg.user,
+        password=cfg.password,
+        host=cfg.host,
+        port=cfg.port,
+    )
+
+
+def lock_breaker(cur, host: str):
+    query = "INSERT INTO host_breakers (host, state, failures, opened_count, opened_until, last_error, updated_at) VALUES (%s, %s, 0, 0, NULL, NULL, %s) ON CONFLICT (host) DO NOTHING"
+    cur.execute(query, (host, STATE_CLOSED, datetime.utcnow()))
+    cur.execute("SELECT state, failures, opened_count, opened_until FROM host_breakers WHERE host = %s FOR UPDATE", (host,))
+    return cur.fetchone()
+
+
+# an open breaker lets a single probe through once its backoff has expired;
+# the probe holds the breaker half open until its deadline, so a crashed probe
+# does not block the host forever
+def acquire_breaker(postgre_cfg: PostgreConfig, monitoring_cfg: MonitoringConfig, host: str) -> bool:
+    conn = get_connection(postgre_cfg)
+    cur = conn.cursor()
+    try:
+        state, _, _, opened_until = lock_breaker(cur, host)
+        now = datetime.utcnow()
+        if state == STATE_CLOSED:
+            return True
+        if opened_until is not None and opened_until > now:
+            return False
+        query = "UPDATE host_breakers SET state = %s, opened_until = %s, updated_at = %s WHERE host = %s"
+        cur.execute(query, (STATE_HALF_OPEN, now + timedelta(seconds=monitoring_cfg.breaker_backoff), now, host))
+        conn.commit()
+        return True
+    finally:
+        cur.close()
+        conn.close()
+
+
+def record_success(cfg: PostgreConfig, host: str) -> None:
+    conn = get_connection(cfg)
+    cur = conn.cursor()
+    query = "UPDATE host_breakers SET state = %s, failures = 0, opened_count = 0, opened_until = NULL, last_error = NULL, updated_at = %s WHERE host = %s"
+    cur.execute(query, (STATE_CLOSED, datetime.utcnow(), host))
+    conn.commit()
+    cur.close()
+    conn.close()
+
+
+def record_failure(postgre_cfg: PostgreConfig, monitoring_cfg: MonitoringConfig, host: str, error: str) -> str:
+    conn = get_connection(postgre_cfg)
+    cur = conn.cursor()
+    try:
+        state, failures, opened_count, opened_until = lock_breaker(cur, host)
+        now = datetime.utcnow()
+        failures += 1
+        if state == STATE_HALF_OPEN or failures >= monitoring_cfg.breaker_failure_threshold:
+            opened_count += 1
+            backoff = min(
+                monitoring_cfg.breaker_backoff * 2 ** (opened_count - 1),
+                monitoring_cfg.breaker_max_backoff,
+            )
+            state = STATE_OPEN
+            opened_until = now + timedelta(seconds=backoff)
+        query = "UPDATE host_breakers SET state = %s, failures = %s, opened_count = %s, opened_until = %s, last_error = %s, updated_at = %s WHERE host = %s"
+        cur.execute(query, (state, failures, opened_count, opened_until, error[:1024], now, host))
+        conn.commit()
+        return state
+    finally:
+        cur.close()
+        conn.close()
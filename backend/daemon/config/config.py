@@ -10,6 +10,9 @@ class PostgreConfig:
     password: str
     host: str
     port: str
+    pool_min_size: int
+    pool_max_size: int
+    pool_timeout: int
 
 
 @dataclass
@@ -26,11 +29,28 @@ class NotificationConfig:
     telegram_token: str
 
 
+@dataclass
+class MonitoringConfig:
+    capture_dedup_window: int
+    breaker_failure_threshold: int
+    breaker_backoff: int
+    breaker_max_backoff: int
+
+
+@dataclass
+class RedisConfig:
+    host: str
+    port: str
+    db: int
+
+
 @dataclass
 class Config:
     postgres: PostgreConfig
     s3: S3Config
     notification: NotificationConfig
+    monitoring: MonitoringConfig
+    redis: RedisConfig
 
 
 def parse_config() -> Config:
@@ -41,4 +61,6 @@ def parse_config() -> Config:
         postgres=PostgreConfig(**data["postgres"]),
         s3=S3Config(**data["s3"]),
         notification=NotificationConfig(**data["notification"]),
+        monitoring=MonitoringConfig(**data["monitoring"]),
+        redis=RedisConfig(**data["redis"]),
     )
@@ -9,31 +9,43 @@ from typing import (
     Tuple,
     Any
 )
+import urllib.parse
 import urllib.request
 from bs4 import BeautifulSoup
 from config.config import (
     parse_config,
+    Config,
     NotificationConfig,
     PostgreConfig,
     S3Config
 )
 from dataclasses import dataclass
+from functools import lru_cache
 from html.parser import HTMLParser
 import re
 import pymorphy2
 from PIL import Image
 from s3_interactor import (
     add_object,
+    copy_object,
     create_bucket,
     get_all_files,
     get_object,
-    get_image
+    get_image,
+    put_object
 )
 from mail_iteractor import send_email
+from cache import RESOURCE_CACHE_KEY, read_through
+from circuit_breaker import (
+    acquire_breaker,
+    record_failure,
+    record_success
+)
 from io import BytesIO
+import gzip
 import psycopg2
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 import telebot
 
 
@@ -54,26 +66,46 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
-def get_resource_params(cfg: PostgreConfig, resource_id: str) -> Optional[ResourceMonitoringParams]:
-    conn = psycopg2.connect(
-        host=cfg.host,
-        database=cfg.database,
-        user=cfg.user,
-        password=cfg.password
-    )
-    cur = conn.cursor()
-    cur.execute("SELECT url, monitoring_polygon, key_words, starts_from, enabled, make_screenshot FROM resources WHERE id = %s", (resource_id,))
-    result = cur.fetchone()
-    if result is None:
+def get_resource_params(cfg: Config, resource_id: str) -> Optional[ResourceMonitoringParams]:
+    def load() -> Optional[Dict[str, Any]]:
+        conn = psycopg2.connect(
+            host=cfg.postgres.host,
+            database=cfg.postgres.database,
+            user=cfg.postgres.user,
+            password=cfg.postgres.password
+        )
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT url, name, description, key_words, interval, make_screenshot, enabled, monitoring_polygon, starts_from FROM resources WHERE id = %s", (resource_id,))
+            result = cur.fetchone()
+        finally:
+            conn.close()
+        if result is None:
+            return None
+        return {
+            'id': resource_id,
+            'url': result[0],
+            'name': result[1],
+            'description': result[2],
+            'keywords': result[3],
+            'interval': result[4],
+            'make_screenshot': result[5],
+            'enabled': result[6],
+            'polygon': result[7],
+            'starts_from': result[8].isoformat() if result[8] else None,
+        }
+
+    resource = read_through(cfg.redis, RESOURCE_CACHE_KEY.format(resource_id), load)
+    if resource is None:
         return None
     return ResourceMonitoringParams(
         resource_id=resource_id,
-        url=result[0],
-        polygon=result[1],
-        keywords=result[2],
-        starts_from=result[3],
-        enabled=result[4],
-        make_screenshot=result[5]
+        url=resource['url'],
+        polygon=resource['polygon'],
+        keywords=resource['keywords'],
+        starts_from=datetime.fromisoformat(resource['starts_from']) if resource['starts_from'] else None,
+        enabled=resource['enabled'],
+        make_screenshot=resource['make_screenshot']
     )
 
 
@@ -83,13 +115,15 @@ def save_screenshot(cfg: S3Config, url: str, file_name: str) -> None:
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
     driver = webdriver.Chrome(options=chrome_options)
-    driver.get(url)
-    time.sleep(5)
-    page_height = driver.execute_script("return document.body.scrollHeight")
-    page_width = driver.execute_script("return document.body.scrollWidth")
-    driver.set_window_size(page_width, page_height)
-    driver.save_screenshot('/tmp/' + file_name)
-    driver.quit()
+    try:
+        driver.get(url)
+        time.sleep(5)
+        page_height = driver.execute_script("return document.body.scrollHeight")
+        page_width = driver.execute_script("return document.body.scrollWidth")
+        driver.set_window_size(page_width, page_height)
+        driver.save_screenshot('/tmp/' + file_name)
+    finally:
+        driver.quit()
     add_object(cfg, 'images', '/tmp/' + file_name, file_name)
 
 
@@ -110,16 +144,116 @@ def monitor_url(cfg: S3Config, url: str, screenshot_path: str, html_path: str) -
         save_html(cfg, url, html_path)
 
 
-def extract_text_from_html(cfg: S3Config, html_path: str):
+@dataclass
+class UrlCapture:
+    id: str
+    snapshot_id: str
+
+
+def find_recent_capture(cur, url: str, window: int, need_html: bool, need_screenshot: bool) -> Optional[UrlCapture]:
+    query = (
+        "SELECT id, snapshot_id FROM url_captures "
+        "WHERE url = %s AND captured_at >= %s AND (has_html OR NOT %s) AND (has_screenshot OR NOT %s) "
+        "ORDER BY captured_at DESC LIMIT 1"
+    )
+    cur.execute(query, (url, datetime.utcnow() - timedelta(seconds=window), need_html, need_screenshot))
+    result = cur.fetchone()
+    if result is None:
+        return None
+    return UrlCapture(id=result[0], snapshot_id=result[1])
+
+
+def reuse_capture(cfg: S3Config, capture: UrlCapture, screenshot_path: Optional[str], html_path: Optional[str]) -> bool:
+    if screenshot_path and not copy_object(cfg, 'images', capture.snapshot_id + '.png', screenshot_path):
+        return False
+    if html_path and not copy_object(cfg, 'htmls', capture.snapshot_id + '.html', html_path):
+        return False
+    return True
+
+
+def save_snapshot(cur, resource_id: str, snapshot_id: str, has_screenshot: bool, has_html: bool) -> None:
+    query = "INSERT INTO snapshots (id, resource_id, has_screenshot, has_html, created_at) VALUES (%s, %s, %s, %s, NOW()) ON CONFLICT (id) DO NOTHING"
+    cur.execute(query, (snapshot_id, resource_id, has_screenshot, has_html))
+
+
+def capture_url(cfg: Config, resource_id: str, url: str, snapshot_id: str, screenshot_path: Optional[str], html_path: Optional[str]) -> None:
+    if not screenshot_path and not html_path:
+        return
+    # checks of the same url scheduled at the same time are serialized by the
+    # advisory lock, so only the first one launches the browser and the others
+    # copy its objects
+    conn = get_connection(cfg.postgres)
+    cur = conn.cursor()
     try:
-        html_content = get_object(cfg, 'htmls', html_path)
-        soup = BeautifulSoup(html_content, 'html.parser')
-        for script in soup(['script', 'style']):
-            script.decompose()
+        cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (url,))
+        window = cfg.monitoring.capture_dedup_window
+        capture = None
+        if window > 0:
+            capture = find_recent_capture(cur, url, window, html_path is not None, screenshot_path is not None)
+        if capture is not None and reuse_capture(cfg.s3, capture, screenshot_path, html_path):
+            cur.execute("UPDATE url_captures SET reused = reused + 1 WHERE id = %s", (capture.id,))
+            save_snapshot(cur, resource_id, snapshot_id, screenshot_path is not None, html_path is not None)
+            conn.commit()
+            print(f'capture {capture.snapshot_id} reused for snapshot {snapshot_id}')
+            return
+        monitor_url(cfg.s3, url, screenshot_path, html_path)
+        query = "INSERT INTO url_captures (id, url, resource_id, snapshot_id, has_html, has_screenshot, captured_at, reused) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"
+        cur.execute(query, (
+            str(uuid.uuid4()),
+            url,
+            resource_id,
+            snapshot_id,
+            html_path is not None,
+            screenshot_path is not None,
+            datetime.utcnow(),
+            0,
+        ))
+        save_snapshot(cur, resource_id, snapshot_id, screenshot_path is not None, html_path is not None)
+        conn.commit()
+    finally:
+        cur.close()
+        conn.close()
 
-        return soup.get_text(separator='\n', strip=True)
-    except Exception as e:
-        return str(e)
+
+# normalized page texts by html object name, each snapshot is read at most once per run
+_snapshot_texts: Dict[str, str] = {}
+
+
+def normalize_text(raw_html_text: str) -> str:
+    return ' '.join(re.findall(r'\b\w+\b', raw_html_text))
+
+
+def extract_text_from_html(cfg: S3Config, html_path: str) -> Optional[str]:
+    if html_path in _snapshot_texts:
+        return _snapshot_texts[html_path]
+    snapshot_id = html_path[:-len('.html')]
+    # get_object returns False when the object is missing or s3 fails
+    stored_text = get_object(cfg, 'texts', snapshot_id + '.txt.gz')
+    if stored_text:
+        text = gzip.decompress(stored_text).decode('utf-8')
+    else:
+        html_content = get_object(cfg, 'htmls', html_path)
+        if not html_content:
+            return None
+        try:
+            soup = BeautifulSoup(html_content, 'html.parser')
+            for script in soup(['script', 'style']):
+                script.decompose()
+            text = normalize_text(soup.get_text(separator='\n', strip=True))
+        except Exception as e:
+            print(f'failed to extract text from {html_path}: {e}')
+            return None
+    _snapshot_texts[html_path] = text
+    return text
+
+
+def save_snapshot_text(cfg: S3Config, html_path: str) -> None:
+    text = extract_text_from_html(cfg, html_path)
+    if text is None:
+        return
+    snapshot_id = html_path[:-len('.html')]
+    if not put_object(cfg, 'texts', snapshot_id + '.txt.gz', gzip.compress(text.encode('utf-8')), 'application/gzip'):
+        print(f'failed to store text of snapshot {snapshot_id}')
 
 
 def extract_words(raw_html_text: str):
@@ -127,14 +261,23 @@ def extract_words(raw_html_text: str):
     return [word.lower() for word in words]
 
 
+_morph: Optional[pymorphy2.MorphAnalyzer] = None
+
+
+@lru_cache(maxsize=100000)
+def lemmatize_word(word: str) -> str:
+    global _morph
+    if _morph is None:
+        # вначале надо устанавливать пакет для русских слов: pip install -U pymorphy2-dicts-ru
+        _morph = pymorphy2.MorphAnalyzer(lang='ru')
+    return _morph.parse(word)[0].normal_form
+
+
 def search_keywords(cfg: S3Config, html_path: str, keywords: List[str]) -> List[str]:
-    raw_html_text = extract_text_from_html(cfg, html_path)
-    words = extract_words(raw_html_text)
+    words = extract_words(extract_text_from_html(cfg, html_path) or '')
     found = dict()
-    # вначале надо устанавливать пакет для русских слов: pip install -U pymorphy2-dicts-ru
-    morph = pymorphy2.MorphAnalyzer(lang='ru')
-    keywords_root = [morph.parse(keyword.lower())[0].normal_form for keyword in keywords]
-    words_root = [morph.parse(word)[0].normal_form for word in words]
+    keywords_root = [lemmatize_word(keyword.lower()) for keyword in keywords]
+    words_root = [lemmatize_word(word) for word in words]
     for keyword in keywords_root:
         amount = 0
         for word in words_root:
@@ -311,16 +454,48 @@ def save_monitoring_events(postgre_cfg: PostgreConfig, notification_cfg: Notific
     conn.close()
 
 
-def get_last_snapshot_id(cfg: S3Config, resource_id: str) -> int:
-    images = get_all_files(cfg, 'images')
-    htmls = get_all_files(cfg, 'htmls')
+def index_snapshot_text(postgre_cfg: PostgreConfig, s3_cfg: S3Config, snapshot_id: str) -> None:
+    text = extract_text_from_html(s3_cfg, snapshot_id + '.html')
+    if text is None:
+        return
+    lemmas = ' '.join(lemmatize_word(word) for word in extract_words(text))
+    conn = get_connection(postgre_cfg)
+    cur = conn.cursor()
+    query = (
+        "INSERT INTO snapshot_texts (snapshot_id, resource_id, created_at, content, search_vector) "
+        "SELECT id, resource_id, created_at, %s, snapshot_search_vector(%s, %s) FROM snapshots WHERE id = %s "
+        "ON CONFLICT (snapshot_id) DO UPDATE SET content = EXCLUDED.content, search_vector = EXCLUDED.search_vector"
+    )
+    cur.execute(query, (text, text, lemmas, snapshot_id))
+    conn.commit()
+    cur.close()
+    conn.close()
+
+
+def get_last_snapshot_id(cfg: Config, resource_id: str) -> Optional[int]:
+    conn = get_connection(cfg.postgres)
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT MAX(split_part(id, '_', 2)::int) FROM snapshots WHERE resource_id = %s", (resource_id,))
+        max_id = cur.fetchone()[0]
+    finally:
+        cur.close()
+        conn.close()
+    if max_id is not None:
+        return max_id
+    # resources captured before the snapshots table existed and not backfilled yet
+    prefix = resource_id + '_'
     max_id = 0
-    for image in images:
-        if image['Key'].startswith(resource_id):
-            max_id = max(max_id, int(image['Key'].replace('.', '_').split('_')[1]))
-    for html in htmls:
-        if html['Key'].startswith(resource_id):
-            max_id = max(max_id, int(html['Key'].replace('.', '_').split('_')[1]))
+    for bucket_name in ['images', 'htmls']:
+        files = get_all_files(cfg.s3, bucket_name, prefix)
+        # a wrong number would overwrite stored objects, so a failed listing
+        # aborts the check instead of starting from zero
+        if files is None:
+            return None
+        for obj in files:
+            number = obj['Key'][len(prefix):].split('.')[0]
+            if number.isdigit():
+                max_id = max(max_id, int(number))
     return max_id
 
 
@@ -329,7 +504,7 @@ def main():
     print(cfg)
     args = parse_args()
     print(args)
-    params = get_resource_params(cfg.postgres, args.resource_id)
+    params = get_resource_params(cfg, args.resource_id)
     if params is None:
         print('Resource not found')
         return
@@ -341,7 +516,10 @@ def main():
         return
     print(params)
 
-    snapshot_id = get_last_snapshot_id(cfg.s3, params.resource_id)
+    snapshot_id = get_last_snapshot_id(cfg, params.resource_id)
+    if snapshot_id is None:
+        print('Failed to read the last snapshot number')
+        return
     screenshot_path = None
     screenshot_prev_path = None
     html_path = None
@@ -355,10 +533,22 @@ def main():
         if snapshot_id > 0:
             screenshot_prev_path = params.resource_id + '_' + str(snapshot_id) + '.png'
 
-    monitor_url(cfg.s3, params.url, screenshot_path, html_path)
+    host = urllib.parse.urlparse(params.url).hostname or params.url
+    if not acquire_breaker(cfg.postgres, cfg.monitoring, host):
+        print(f'circuit breaker for {host} is open, check skipped')
+        return
+    try:
+        capture_url(cfg, params.resource_id, params.url, params.resource_id + '_' + str(snapshot_id + 1), screenshot_path, html_path)
+    except Exception as e:
+        state = record_failure(cfg.postgres, cfg.monitoring, host, str(e))
+        print(f'failed to capture {params.url}: {e}, circuit breaker for {host} is {state}')
+        return
+    record_success(cfg.postgres, host)
     keyword_events = []
     if params.keywords:
         keyword_events = get_keywords_events(cfg.s3, html_path, html_prev_path, params.keywords)
+        save_snapshot_text(cfg.s3, html_path)
+        index_snapshot_text(cfg.postgres, cfg.s3, params.resource_id + '_' + str(snapshot_id + 1))
     screenshot_changed = False
     if params.make_screenshot:
         screenshot_changed = get_screenshot_events(cfg.s3, screenshot_path, screenshot_prev_path, params.polygon)
@@ -38,6 +38,23 @@ def add_object(cfg: S3Config, bucket_name: str, file_name: str, object_name: str
         return False
 
 
+def put_object(cfg: S3Config, bucket_name: str, object_name: str, data: bytes, content_type: str) -> bool:
+    s3 = boto3.client(
+        's3',
+        endpoint_url=cfg.connection_string,
+        aws_access_key_id=cfg.aws_access_key_id,
+        aws_secret_access_key=cfg.aws_secret_access_key,
+    )
+    try:
+        s3.put_object(Bucket=bucket_name, Key=object_name, Body=data, ContentType=content_type)
+        return True
+    except NoCredentialsError:
+        print("invalid credentials")
+        return False
+    except Exception:
+        return False
+
+
 def get_object(cfg: S3Config, bucket_name: str, object_name: str) -> Any:
     s3 = boto3.client(
         's3',
@@ -67,7 +84,7 @@ def get_image(cfg: S3Config, bucket_name: str, image_name: str) -> Image.Image:
     return Image.open(BytesIO(image_data))
 
 
-def get_all_files(cfg: S3Config, bucket_name: str) -> Any:
+def get_all_files(cfg: S3Config, bucket_name: str, prefix: str = '') -> Any:
     s3 = boto3.client(
         's3',
         endpoint_url=cfg.connection_string,
@@ -75,12 +92,33 @@ def get_all_files(cfg: S3Config, bucket_name: str) -> Any:
         aws_secret_access_key=cfg.aws_secret_access_key,
     )
     try:
-        response = s3.list_objects(Bucket=bucket_name)
-        if 'Contents' not in response:
-            return []
-        return response['Contents']
+        files = []
+        for page in s3.get_paginator('list_objects_v2').paginate(Bucket=bucket_name, Prefix=prefix):
+            files.extend(page.get('Contents', []))
+        return files
     except NoCredentialsError:
         print("invalid credentials")
         return None
     except Exception:
         return None
+
+
+def copy_object(cfg: S3Config, bucket_name: str, source_name: str, object_name: str) -> bool:
+    s3 = boto3.client(
+        's3',
+        endpoint_url=cfg.connection_string,
+        aws_access_key_id=cfg.aws_access_key_id,
+        aws_secret_access_key=cfg.aws_secret_access_key,
+    )
+    try:
+        s3.copy_object(
+            Bucket=bucket_name,
+            Key=object_name,
+            CopySource={'Bucket': bucket_name, 'Key': source_name},
+        )
+        return True
+    except NoCredentialsError:
+        print("invalid credentials")
+        return False
+    except Exception:
+        return False
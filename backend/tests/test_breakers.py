@@ -0,0 +1,144 @@
+import json
+import uuid
+from datetime import datetime
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+from api.main import app, cfg
+from api.model.host_breaker import HostBreaker
+
+class TestBreakers(TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        self.valid_token = "valid_jwt_token"
+        self.resource_id = str(uuid.uuid4())
+
+        self.resource = MagicMock()
+        self.resource.id = self.resource_id
+        self.resource.url = "https://example.com/news?page=1"
+
+        self.breaker = HostBreaker(
+            host="example.com",
+            state="open",
+            failures=3,
+            opened_count=1,
+            opened_until=datetime.fromtimestamp(1700000300),
+            last_error="timed out",
+            updated_at=datetime.fromtimestamp(1700000000),
+        )
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.get_all_host_breakers')
+    def test_get_breakers_success(self, mock_get_breakers, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_get_breakers.return_value = [self.breaker]
+
+        response = self.app.get(
+            '/breakers?state=open',
+            headers={'Authorization': f'bearer: {self.valid_token}'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        response_data = json.loads(response.data.decode())
+        mock_get_breakers.assert_called_once_with(cfg.postgres, "open")
+        self.assertEqual(response_data['breakers'], [{
+            "host": "example.com",
+            "state": "open",
+            "failures": 3,
+            "opened_until": 1700000300,
+            "last_error": "timed out",
+            "updated_at": 1700000000,
+        }])
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    def test_get_breakers_invalid_state(self, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+
+        response = self.app.get(
+            '/breakers?state=broken',
+            headers={'Authorization': f'bearer: {self.valid_token}'}
+        )
+
+        self.assertEqual(response.status_code, 400)
+        response_data = json.loads(response.data.decode())
+        self.assertEqual(response_data['error'], "state is invalid")
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.get_resource_by_id')
+    @patch('api.main.get_host_breaker')
+    def test_get_resource_breaker_success(self, mock_get_breaker, mock_get_resource,
+                                          mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_get_resource.return_value = self.resource
+        mock_get_breaker.return_value = self.breaker
+
+        response = self.app.get(
+            f'/resources/{self.resource_id}/breaker',
+            headers={'Authorization': f'bearer: {self.valid_token}'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        mock_get_breaker.assert_called_once_with(cfg.postgres, "example.com")
+        response_data = json.loads(response.data.decode())
+        self.assertEqual(response_data['breaker']['state'], "open")
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.get_resource_by_id')
+    @patch('api.main.get_host_breaker')
+    def test_get_resource_breaker_never_failed(self, mock_get_breaker, mock_get_resource,
+                                               mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_get_resource.return_value = self.resource
+        mock_get_breaker.return_value = None
+
+        response = self.app.get(
+            f'/resources/{self.resource_id}/breaker',
+            headers={'Authorization': f'bearer: {self.valid_token}'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        response_data = json.loads(response.data.decode())
+        self.assertEqual(response_data['breaker']['state'], "closed")
+        self.assertEqual(response_data['breaker']['failures'], 0)
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.get_resource_by_id')
+    def test_get_resource_breaker_not_found(self, mock_get_resource, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_get_resource.return_value = None
+
+        response = self.app.get(
+            f'/resources/{self.resource_id}/breaker',
+            headers={'Authorization': f'bearer: {self.valid_token}'}
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_get_breakers_unauthorized(self):
+        response = self.app.get('/breakers')
+        self.assertEqual(response.status_code, 403)
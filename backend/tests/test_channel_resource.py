@@ -0,0 +1,35 @@
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+from api.main import cfg
+from api.model.channel_resource import update_resource_channels
+
+class TestUpdateResourceChannels(TestCase):
+    def setUp(self):
+        self.cursor = MagicMock()
+        connection = MagicMock()
+        connection.cursor.return_value.__enter__.return_value = self.cursor
+        patcher = patch('api.model.channel_resource.get_connection')
+        self.mock_get_connection = patcher.start()
+        self.mock_get_connection.return_value.__enter__.return_value = connection
+        self.addCleanup(patcher.stop)
+        self.resource_id = "3f0c3c1e-8a55-4a1e-9a39-2f6c64b1d0a7"
+
+    def test_many_channels_take_two_statements(self):
+        channels = [f"00000000-0000-4000-8000-{number:012d}" for number in range(50)]
+
+        update_resource_channels(cfg.postgres, self.resource_id, channels)
+
+        self.mock_get_connection.assert_called_once_with(cfg.postgres)
+        self.assertEqual(self.cursor.execute.call_count, 2)
+        disable_call, link_call = self.cursor.execute.call_args_list
+        self.assertIn("UPDATE channel_resource SET enabled = false", disable_call[0][0])
+        self.assertEqual(disable_call[0][1], (self.resource_id, channels))
+        self.assertIn("ON CONFLICT (channel_id, resource_id)", link_call[0][0])
+        self.assertEqual(link_call[0][1], (channels, self.resource_id))
+
+    def test_empty_list_only_disables(self):
+        update_resource_channels(cfg.postgres, self.resource_id, [])
+
+        self.cursor.execute.assert_called_once()
+        self.assertEqual(self.cursor.execute.call_args[0][1], (self.resource_id, []))
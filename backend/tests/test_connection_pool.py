@@ -0,0 +1,58 @@
+from dataclasses import replace
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+from psycopg2.pool import PoolError
+
+from api.main import cfg
+from api.model.connection_pool import ConnectionPool, get_connection
+
+class TestConnectionPool(TestCase):
+    def setUp(self):
+        self.cfg = replace(cfg.postgres, pool_min_size=1, pool_max_size=2, pool_timeout=0)
+        patcher = patch('api.model.connection_pool.ThreadedConnectionPool')
+        self.mock_pool_class = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_pool = self.mock_pool_class.return_value
+        self.mock_pool.getconn.side_effect = lambda: MagicMock(closed=0)
+
+    def test_checkout_waits_for_free_slot(self):
+        pool = ConnectionPool(self.cfg)
+        first = pool.getconn()
+        pool.getconn()
+        with self.assertRaises(PoolError):
+            pool.getconn()
+        pool.putconn(first)
+        pool.getconn()
+
+        stats = pool.stats()
+        self.assertEqual(stats.in_use, 2)
+        self.assertEqual(stats.checkouts, 3)
+        self.assertEqual(stats.timeouts, 1)
+
+    @patch('api.model.connection_pool.get_pool')
+    def test_get_connection_commits_and_returns_connection(self, mock_get_pool):
+        pool = ConnectionPool(self.cfg)
+        mock_get_pool.return_value = pool
+
+        with get_connection(self.cfg) as conn:
+            conn.cursor().execute("SELECT 1")
+
+        conn.commit.assert_called_once()
+        conn.rollback.assert_not_called()
+        self.mock_pool.putconn.assert_called_once_with(conn, close=False)
+        self.assertEqual(pool.stats().in_use, 0)
+
+    @patch('api.model.connection_pool.get_pool')
+    def test_get_connection_rolls_back_on_error(self, mock_get_pool):
+        pool = ConnectionPool(self.cfg)
+        mock_get_pool.return_value = pool
+
+        with self.assertRaises(ValueError):
+            with get_connection(self.cfg) as conn:
+                raise ValueError("query failed")
+
+        conn.commit.assert_not_called()
+        conn.rollback.assert_called_once()
+        self.mock_pool.putconn.assert_called_once_with(conn, close=False)
+        self.assertEqual(pool.stats().in_use, 0)
@@ -0,0 +1,37 @@
+import gzip
+import os
+import sys
+from unittest import TestCase
+from unittest.mock import patch
+
+from api.main import cfg
+
+# the daemon runs as a script, its modules import each other from its directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'daemon'))
+import daemon
+
+class TestDaemonTexts(TestCase):
+    def setUp(self):
+        self.snapshot_id = "3f0c3c1e-8a55-4a1e-9a39-2f6c64b1d0a7_5"
+        self.html_path = self.snapshot_id + '.html'
+        daemon._snapshot_texts.clear()
+        self.addCleanup(daemon._snapshot_texts.clear)
+
+    @patch('daemon.get_object')
+    def test_stored_text_is_used(self, mock_get_object):
+        mock_get_object.return_value = gzip.compress("fire on the third floor".encode('utf-8'))
+
+        self.assertEqual(daemon.extract_text_from_html(cfg.s3, self.html_path), "fire on the third floor")
+        mock_get_object.assert_called_once_with(cfg.s3, 'texts', self.snapshot_id + '.txt.gz')
+
+    @patch('daemon.get_object')
+    def test_missing_stored_text_falls_back_to_html(self, mock_get_object):
+        objects = {('htmls', self.html_path): b"<html><body><p>Fire drill</p><script>x = 1</script></body></html>"}
+        # like the s3 interactor of the daemon, missing objects are False
+        mock_get_object.side_effect = lambda s3_cfg, bucket_name, object_name: objects.get((bucket_name, object_name), False)
+
+        self.assertEqual(daemon.extract_text_from_html(cfg.s3, self.html_path), "Fire drill")
+
+    @patch('daemon.get_object', return_value=False)
+    def test_missing_snapshot(self, mock_get_object):
+        self.assertIsNone(daemon.extract_text_from_html(cfg.s3, self.html_path))
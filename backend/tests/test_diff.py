@@ -0,0 +1,100 @@
+import random
+import time
+from unittest import TestCase
+from unittest.mock import patch
+
+from api.util.diff import DiffHunk, build_hunks, diff_texts, diff_tokens, tokenize
+
+class TestDiff(TestCase):
+    def _apply(self, old, new, ops):
+        result = []
+        for op in ops:
+            if op.op == "=":
+                self.assertEqual(old[op.old_start:op.old_end], new[op.new_start:op.new_end])
+                result.extend(old[op.old_start:op.old_end])
+            elif op.op == "+":
+                result.extend(new[op.new_start:op.new_end])
+        return result
+
+    def _lcs_length(self, old, new):
+        row = [0] * (len(new) + 1)
+        for token in old:
+            previous = 0
+            for index, other in enumerate(new):
+                current = row[index + 1]
+                row[index + 1] = previous + 1 if token == other else max(row[index + 1], row[index])
+                previous = current
+        return row[-1]
+
+    def test_edit_script_is_minimal(self):
+        generator = random.Random(7)
+        for _ in range(300):
+            old = [generator.choice("abcd") for _ in range(generator.randint(0, 30))]
+            new = [generator.choice("abcd") for _ in range(generator.randint(0, 30))]
+
+            ops = diff_tokens(old, new)
+
+            self.assertEqual(self._apply(old, new, ops), new)
+            unchanged = sum(op.old_end - op.old_start for op in ops if op.op == "=")
+            self.assertEqual(unchanged, self._lcs_length(old, new))
+
+    def test_line_hunks_keep_context(self):
+        old = "".join(f"line {number}\n" for number in range(20))
+        new = old.replace("line 3\n", "line three\n").replace("line 15\n", "")
+
+        hunks = diff_texts(old, new, "line", 2)
+
+        self.assertEqual(len(hunks), 2)
+        self.assertEqual(
+            (hunks[0].old_start, hunks[0].old_count, hunks[0].new_start, hunks[0].new_count),
+            (1, 5, 1, 5)
+        )
+        self.assertEqual(hunks[0].changes, [
+            ("=", "line 1\nline 2\n"), ("-", "line 3\n"), ("+", "line three\n"), ("=", "line 4\nline 5\n"),
+        ])
+        self.assertEqual(hunks[1].changes, [
+            ("=", "line 13\nline 14\n"), ("-", "line 15\n"), ("=", "line 16\nline 17\n"),
+        ])
+
+    def test_close_changes_share_a_hunk(self):
+        old = tokenize("a b c d e f", "word")
+        new = tokenize("a x c d y f", "word")
+
+        hunks = build_hunks(old, new, diff_tokens(old, new), 3)
+
+        self.assertEqual(len(hunks), 1)
+        self.assertEqual("".join(text for op, text in hunks[0].changes if op != "-"), "a x c d y f")
+        self.assertEqual("".join(text for op, text in hunks[0].changes if op != "+"), "a b c d e f")
+
+    def test_identical_texts_have_no_hunks(self):
+        self.assertEqual(diff_texts("same\ntext\n", "same\ntext\n", "line", 3), [])
+
+    def test_unrelated_texts_are_diffed_in_bounded_time(self):
+        generator = random.Random(11)
+        words = [f"word{number}" for number in range(3000)]
+        old = tokenize(" ".join(generator.choice(words) for _ in range(10000)), "word")
+        new = tokenize(" ".join(generator.choice(words) for _ in range(10000)), "word")
+
+        started = time.monotonic()
+        ops = diff_tokens(old, new)
+        elapsed = time.monotonic() - started
+
+        # the full search takes minutes on these texts
+        self.assertLess(elapsed, 5)
+        self.assertEqual(self._apply(old, new, ops), new)
+
+    def test_cost_limit_keeps_the_script_valid(self):
+        generator = random.Random(5)
+        with patch('api.util.diff.DIFF_MIN_COST', 2), patch('api.util.diff.DIFF_MAX_WORK', 200):
+            for _ in range(100):
+                old = [generator.choice("abcd") for _ in range(generator.randint(0, 60))]
+                new = [generator.choice("abcd") for _ in range(generator.randint(0, 60))]
+                self.assertEqual(self._apply(old, new, diff_tokens(old, new)), new)
+
+    def test_large_texts_are_not_diffed(self):
+        with patch('api.util.diff.DIFF_MAX_TOKENS', 5):
+            self.assertEqual(diff_texts("one two three", "one two four", "word", 1), [
+                DiffHunk(old_start=3, old_count=2, new_start=3, new_count=2,
+                         changes=[("=", " "), ("-", "three"), ("+", "four")]),
+            ])
+            self.assertIsNone(diff_texts("one two three", "one two three four", "word", 1))
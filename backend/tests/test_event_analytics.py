@@ -0,0 +1,98 @@
+import datetime
+import json
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+from api.main import app, cfg
+from api.model.monitoring_event import EventCount
+
+class TestEventAnalytics(TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        self.valid_token = "valid_jwt_token"
+        self.headers = {'Authorization': f'bearer: {self.valid_token}'}
+        self.resource_id = "3f0c3c1e-8a55-4a1e-9a39-2f6c64b1d0a7"
+
+    def _post(self, payload):
+        return self.app.post(
+            '/events/analytics',
+            data=json.dumps(payload),
+            content_type='application/json',
+            headers=self.headers
+        )
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.get_monitoring_event_counts')
+    def test_counts_by_bucket(self, mock_get_counts, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_get_counts.return_value = [
+            EventCount(resource_id=self.resource_id, type="image", time=datetime.datetime(2025, 6, 2), count=3),
+            EventCount(resource_id=self.resource_id, type="keyword", time=datetime.datetime(2025, 6, 2), count=12),
+        ]
+
+        response = self._post({
+            "resource_ids": [self.resource_id],
+            "start_time": 1748736000,
+            "end_time": 1756512000,
+            "bucket": "week",
+        })
+
+        self.assertEqual(response.status_code, 200)
+        response_data = json.loads(response.data.decode())
+        self.assertEqual(response_data['bucket'], "week")
+        self.assertEqual(response_data['counts'], [
+            {"resource_id": self.resource_id, "type": "image", "time": "2025-06-02T00:00:00", "count": 3},
+            {"resource_id": self.resource_id, "type": "keyword", "time": "2025-06-02T00:00:00", "count": 12},
+        ])
+        mock_get_counts.assert_called_once_with(
+            cfg.postgres,
+            [self.resource_id],
+            datetime.datetime.fromtimestamp(1748736000),
+            datetime.datetime.fromtimestamp(1756512000),
+            None,
+            "week",
+        )
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.get_monitoring_event_counts')
+    def test_defaults_to_daily_counts_of_all_resources(self, mock_get_counts, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_get_counts.return_value = []
+
+        response = self._post({})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data.decode()), {"bucket": "day", "counts": []})
+        mock_get_counts.assert_called_once_with(cfg.postgres, None, None, None, None, "day")
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.get_monitoring_event_counts')
+    def test_invalid_params(self, mock_get_counts, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+
+        for payload, error in [
+            ({"bucket": "month"}, "bucket is invalid"),
+            ({"event_type": "html"}, "event_type is invalid"),
+            ({"resource_ids": self.resource_id}, "resource_ids should be list"),
+            ({"resource_ids": ["1"]}, "invalid resource_id value"),
+            ({"start_time": 1756512000, "end_time": 1748736000}, "end_time is more than start_time"),
+        ]:
+            response = self._post(payload)
+            self.assertEqual(response.status_code, 400, payload)
+            self.assertEqual(json.loads(response.data.decode())['error'], error)
+        mock_get_counts.assert_not_called()
@@ -0,0 +1,121 @@
+import datetime
+import json
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+from api.main import app
+from api.model import event_stream
+from api.model.event_stream import get_event_stream_stats, publish_event, subscribe, unsubscribe
+from api.model.monitoring_event import MonitoringEvent
+from api.util.pagination import decode_cursor, encode_cursor
+
+class TestEventStream(TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        self.valid_token = "valid_jwt_token"
+        self.headers = {'Authorization': f'bearer: {self.valid_token}'}
+        self.resource_id = "3f0c3c1e-8a55-4a1e-9a39-2f6c64b1d0a7"
+        self.other_resource_id = "9a4e1c55-2b7d-4f0e-8c63-1d2e3f4a5b6c"
+        self.events = [
+            MonitoringEvent(
+                id=f"00000000-0000-4000-8000-00000000000{number}",
+                resource_id=self.resource_id,
+                snapshot_id=f"{self.resource_id}_{number}",
+                name="keyword found",
+                created_at=datetime.datetime(2025, 6, 1, 12, number),
+                status="created",
+            )
+            for number in range(3)
+        ]
+        # the LISTEN thread is not started, notifications are published by the tests
+        patcher = patch.object(event_stream, '_listener', MagicMock())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.model.event_stream.filter_monitoring_events')
+    def test_resumes_from_last_event_id_then_streams_notifications(self, mock_filter, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_filter.return_value = self.events[1:2]
+        last_event_id = encode_cursor(self.events[0].created_at, self.events[0].id)
+
+        response = self.app.get(
+            f'/events/stream?resource_id={self.resource_id}&event_type=keyword',
+            headers={**self.headers, 'Last-Event-ID': last_event_id}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        chunks = iter(response.response)
+
+        self.assertEqual(next(chunks), b"retry: 5000\n\n")
+        message = next(chunks).decode()
+        self.assertIn("event: monitoring_event\n", message)
+        self.assertEqual(json.loads(message.split("data: ")[1])['id'], self.events[1].id)
+        event_id = message.split("\n")[0][len("id: "):]
+        self.assertEqual(decode_cursor(event_id, 2), [self.events[1].created_at.isoformat(), self.events[1].id])
+        self.assertEqual(
+            mock_filter.call_args[0][7],
+            (self.events[0].created_at, self.events[0].id)
+        )
+
+        # already sent from the table and filtered out by resource
+        publish_event(self.events[1])
+        publish_event(MonitoringEvent(**{**self.events[2].__dict__, "resource_id": self.other_resource_id}))
+        publish_event(self.events[2])
+        message = next(chunks).decode()
+        self.assertEqual(json.loads(message.split("data: ")[1])['id'], self.events[2].id)
+        self.assertEqual(get_event_stream_stats().subscribers, 1)
+
+        response.close()
+        self.assertEqual(get_event_stream_stats().subscribers, 0)
+
+    def test_slow_subscriber_is_marked_lagging(self):
+        subscription = subscribe(None, [self.resource_id], None)
+        self.addCleanup(unsubscribe, subscription)
+
+        with patch.object(subscription, 'events', MagicMock(put_nowait=MagicMock(side_effect=event_stream.queue.Full))):
+            publish_event(self.events[0])
+
+        self.assertTrue(subscription.lagging)
+        self.assertFalse(subscription.matches(
+            MonitoringEvent(**{**self.events[0].__dict__, "resource_id": self.other_resource_id})
+        ))
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    def test_invalid_params(self, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+
+        for query, headers, error in [
+            ('?resource_id=1', {}, "invalid resource_id value"),
+            ('?event_type=html', {}, "event_type is invalid"),
+            ('', {'Last-Event-ID': 'broken'}, "Last-Event-ID is invalid"),
+        ]:
+            response = self.app.get(f'/events/stream{query}', headers={**self.headers, **headers})
+            self.assertEqual(response.status_code, 400, query)
+            self.assertEqual(json.loads(response.data.decode())['error'], error)
+        self.assertEqual(get_event_stream_stats().subscribers, 0)
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    def test_subscriber_limit(self, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+
+        with patch.object(event_stream, 'EVENT_STREAM_MAX_SUBSCRIBERS', 0):
+            response = self.app.get('/events/stream', headers=self.headers)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], "5")
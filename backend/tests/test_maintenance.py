@@ -0,0 +1,73 @@
+import os
+import subprocess
+import sys
+from unittest import TestCase
+from unittest.mock import patch
+
+from api import maintenance
+from api.main import cfg
+from api.util.snapshot_retention import RetentionReport
+from api.util.utility import APP_ROOT, schedule_maintenance
+
+class TestMaintenance(TestCase):
+    def setUp(self):
+        for name in ['create_monitoring_event_partitions', 'drop_monitoring_event_partitions', 'compact_snapshots', 'parse_config']:
+            patcher = patch(f'api.maintenance.{name}')
+            setattr(self, f'mock_{name}', patcher.start())
+            self.addCleanup(patcher.stop)
+        self.mock_parse_config.return_value = cfg
+        self.mock_create_monitoring_event_partitions.return_value = ["monitoring_events_y2025m09"]
+        self.mock_drop_monitoring_event_partitions.return_value = []
+        self.mock_compact_snapshots.return_value = RetentionReport()
+
+    def test_retention_is_off_by_default(self):
+        with patch('sys.argv', ['maintenance.py']), patch.object(cfg.server, 'events_retention_months', None):
+            maintenance.main()
+
+        self.mock_create_monitoring_event_partitions.assert_called_once_with(cfg.postgres, maintenance.EVENTS_PARTITIONS_AHEAD)
+        self.mock_drop_monitoring_event_partitions.assert_not_called()
+
+    def test_retention_from_config_and_args(self):
+        with patch('sys.argv', ['maintenance.py']), patch.object(cfg.server, 'events_retention_months', 24):
+            maintenance.main()
+        self.mock_drop_monitoring_event_partitions.assert_called_once_with(cfg.postgres, 24)
+
+        self.mock_drop_monitoring_event_partitions.reset_mock()
+        with patch('sys.argv', ['maintenance.py', '--keep-months', '6', '--months-ahead', '1']):
+            maintenance.main()
+        self.mock_drop_monitoring_event_partitions.assert_called_once_with(cfg.postgres, 6)
+        self.mock_create_monitoring_event_partitions.assert_called_with(cfg.postgres, 1)
+
+    def test_snapshot_retention(self):
+        with patch('sys.argv', ['maintenance.py']):
+            maintenance.main()
+        self.mock_compact_snapshots.assert_called_once_with(cfg.postgres, cfg.s3, cfg.snapshot_retention)
+
+        self.mock_compact_snapshots.reset_mock()
+        with patch('sys.argv', ['maintenance.py']), patch.object(cfg, 'snapshot_retention', None):
+            maintenance.main()
+        self.mock_compact_snapshots.assert_not_called()
+
+    @patch('api.util.utility.sync_cron_jobs', return_value=True)
+    def test_cron_job_sets_up_the_package_path(self, mock_sync_cron_jobs):
+        self.assertTrue(schedule_maintenance(cfg.server))
+
+        [(query, schedule, job_id)] = mock_sync_cron_jobs.call_args[0][0]
+        self.assertEqual((schedule, job_id), ("0 3 * * *", "maintenance"))
+        self.assertIn(f"cd {APP_ROOT} ", query)
+        self.assertIn(f"PYTHONPATH={APP_ROOT} ", query)
+        self.assertIn("python3 -m api.maintenance ", query)
+
+    def test_module_runs_without_inherited_pythonpath(self):
+        # the way cron starts it: another working directory and a bare environment
+        env = {
+            "PATH": os.environ.get("PATH", ""),
+            "PYTHONPATH": APP_ROOT,
+            "CONFIG_FILE": os.path.join(APP_ROOT, os.getenv("CONFIG_FILE", "config/dev.yaml")),
+        }
+        result = subprocess.run(
+            [sys.executable, "-m", "api.maintenance", "--help"],
+            cwd="/", env=env, capture_output=True, text=True, timeout=60,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("--keep-months", result.stdout)
@@ -0,0 +1,73 @@
+import json
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+from api.main import app, cfg
+from api.model.url_capture import CaptureStats
+
+class TestMetrics(TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        self.valid_token = "valid_jwt_token"
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.get_capture_stats')
+    def test_metrics_success(self, mock_get_capture_stats, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_get_capture_stats.return_value = CaptureStats(captures=10, reused=4)
+
+        response = self.app.get(
+            '/metrics',
+            headers={'Authorization': f'bearer: {self.valid_token}'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        response_data = json.loads(response.data.decode())
+        self.assertEqual(response_data['captures'], {"performed": 10, "reused": 4})
+        mock_get_capture_stats.assert_called_once_with(cfg.postgres, None)
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.get_capture_stats')
+    def test_metrics_since(self, mock_get_capture_stats, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_get_capture_stats.return_value = CaptureStats(captures=0, reused=0)
+
+        response = self.app.get(
+            '/metrics?since=1700000000',
+            headers={'Authorization': f'bearer: {self.valid_token}'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(mock_get_capture_stats.call_args[0][1])
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    def test_metrics_invalid_since(self, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+
+        response = self.app.get(
+            '/metrics?since=yesterday',
+            headers={'Authorization': f'bearer: {self.valid_token}'}
+        )
+
+        self.assertEqual(response.status_code, 400)
+        response_data = json.loads(response.data.decode())
+        self.assertEqual(response_data['error'], "since is invalid")
+
+    def test_metrics_unauthorized(self):
+        response = self.app.get('/metrics')
+        self.assertEqual(response.status_code, 403)
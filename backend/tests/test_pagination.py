@@ -0,0 +1,142 @@
+import json
+import uuid
+from datetime import datetime
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+from api.main import app, cfg
+from api.model.channel import Channel
+from api.model.monitoring_event import MonitoringEvent
+from api.util.pagination import decode_cursor, encode_cursor
+
+class TestPagination(TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        self.valid_token = "valid_jwt_token"
+        self.events = [
+            MonitoringEvent(
+                id=str(uuid.uuid4()),
+                resource_id=str(uuid.uuid4()),
+                snapshot_id="snapshot_1",
+                name="keyword",
+                created_at=datetime(2025, 1, 1, 10, 0, i),
+                status="created",
+            )
+            for i in range(3)
+        ]
+
+    def test_cursor_round_trip(self):
+        cursor = encode_cursor(datetime(2025, 1, 1, 10, 0, 0), "event-id")
+
+        self.assertEqual(decode_cursor(cursor, 2), ["2025-01-01T10:00:00", "event-id"])
+        self.assertIsNone(decode_cursor(cursor, 3))
+        self.assertIsNone(decode_cursor("not a cursor", 2))
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.filter_monitoring_events')
+    def test_events_page_returns_next_cursor(self, mock_filter_events, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_filter_events.return_value = self.events
+
+        response = self.app.get(
+            '/events/all?limit=2',
+            headers={'Authorization': f'bearer: {self.valid_token}'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        response_data = json.loads(response.data.decode())
+        self.assertEqual(len(response_data['events']), 2)
+        self.assertEqual(
+            decode_cursor(response_data['next_cursor'], 2),
+            [self.events[1].created_at.isoformat(), self.events[1].id]
+        )
+        mock_filter_events.assert_called_once_with(cfg.postgres, None, None, None, None, None, 3, None)
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.filter_monitoring_events')
+    def test_events_page_follows_cursor(self, mock_filter_events, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_filter_events.return_value = self.events[2:]
+        cursor = encode_cursor(self.events[1].created_at, self.events[1].id)
+
+        response = self.app.get(
+            f'/events/all?limit=2&cursor={cursor}',
+            headers={'Authorization': f'bearer: {self.valid_token}'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        response_data = json.loads(response.data.decode())
+        self.assertEqual(len(response_data['events']), 1)
+        self.assertIsNone(response_data['next_cursor'])
+        mock_filter_events.assert_called_once_with(
+            cfg.postgres, None, None, None, None, None, 3,
+            (self.events[1].created_at, self.events[1].id)
+        )
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.get_all_channels')
+    def test_page_size_is_limited(self, mock_get_all_channels, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_get_all_channels.return_value = [
+            Channel(id=str(uuid.uuid4()), type="telegram", params={}, enabled=True, name="channel")
+        ]
+
+        response = self.app.get(
+            f'/channels/all?limit={cfg.server.max_page_size + 1}',
+            headers={'Authorization': f'bearer: {self.valid_token}'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        mock_get_all_channels.assert_called_once_with(cfg.postgres, None, cfg.server.max_page_size + 1, None)
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.get_all_resources')
+    def test_offset_is_deprecated(self, mock_get_all_resources, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_get_all_resources.return_value = []
+
+        response = self.app.get(
+            '/resources/all?offset=10&limit=5',
+            headers={'Authorization': f'bearer: {self.valid_token}'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers.get('Deprecation'), 'true')
+        mock_get_all_resources.assert_called_once_with(cfg.postgres, 10, 6, None)
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    def test_invalid_cursor(self, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+
+        response = self.app.get(
+            '/resources/all?cursor=garbage',
+            headers={'Authorization': f'bearer: {self.valid_token}'}
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.data.decode())['error'], 'cursor is invalid')
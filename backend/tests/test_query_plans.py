@@ -0,0 +1,162 @@
+import os
+from unittest import SkipTest, TestCase
+from unittest.mock import patch
+
+import psycopg2
+
+from api.config.config import SnapshotRetentionTier
+from api.main import cfg
+from api.model.snapshot import get_expendable_snapshots, get_last_snapshot_number
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'db', 'migrations')
+
+class TestQueryPlans(TestCase):
+    """Checks on a scratch copy of the schema that hot queries are served by indexes."""
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            cls.conn = psycopg2.connect(
+                database=cfg.postgres.database,
+                user=cfg.postgres.user,
+                password=cfg.postgres.password,
+                host=cfg.postgres.host,
+                port=cfg.postgres.port,
+                connect_timeout=3,
+            )
+        except psycopg2.OperationalError as e:
+            raise SkipTest(f'postgres is unavailable: {e}')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.conn.close()
+
+    def setUp(self):
+        self.cur = self.conn.cursor()
+        self.cur.execute("CREATE SCHEMA plan_check")
+        self.cur.execute("SET LOCAL search_path TO plan_check, public")
+        for migration in sorted(os.listdir(MIGRATIONS_DIR)):
+            if migration.endswith('.sql'):
+                with open(os.path.join(MIGRATIONS_DIR, migration), 'r') as f:
+                    self.cur.execute(f.read())
+        # tables are empty, so sequential scans would always win without this
+        self.cur.execute("SET LOCAL enable_seqscan = off")
+
+    def tearDown(self):
+        self.conn.rollback()
+        self.cur.close()
+
+    def _plan(self, query, params):
+        self.cur.execute("EXPLAIN " + query, params)
+        return "\n".join(row[0] for row in self.cur.fetchall())
+
+    def test_events_by_resource_and_time(self):
+        plan = self._plan(
+            "SELECT id FROM monitoring_events WHERE resource_id = %s AND created_at >= %s ORDER BY created_at",
+            ('resource', '2025-01-01'),
+        )
+        # monitoring_events is partitioned, plans name the indexes of its partitions
+        self.assertRegex(plan, r'monitoring_events_\w+_resource_id_created_at_idx')
+
+    def test_events_by_snapshot(self):
+        plan = self._plan("SELECT id FROM monitoring_events WHERE snapshot_id = %s", ('resource_1',))
+        self.assertRegex(plan, r'monitoring_events_\w+_snapshot_id_idx')
+
+    def test_events_name_search(self):
+        plan = self._plan("SELECT id FROM monitoring_events WHERE name LIKE %s", ('%keyword%',))
+        self.assertRegex(plan, r'monitoring_events_\w+_name_idx')
+
+    def test_channels_by_resource(self):
+        plan = self._plan(
+            "SELECT channel_id, enabled FROM channel_resource WHERE resource_id = %s",
+            ('resource',),
+        )
+        self.assertIn('channel_resource_resource_id_enabled_idx', plan)
+
+    def test_users_by_name(self):
+        plan = self._plan("SELECT id FROM users WHERE name = %s", ('admin',))
+        self.assertIn('users_name_idx', plan)
+
+    def test_event_rollups_by_time(self):
+        plan = self._plan(
+            "SELECT resource_id, event_type, date_trunc('day', bucket), SUM(count) FROM monitoring_event_rollups "
+            "WHERE bucket >= %s GROUP BY 1, 2, 3",
+            ('2025-01-01',),
+        )
+        self.assertIn('monitoring_event_rollups_pkey', plan)
+
+    def _partition_name(self, months_from_now):
+        self.cur.execute(
+            "SELECT monitoring_events_partition_name((date_trunc('month', LOCALTIMESTAMP) + make_interval(months => %s))::date)",
+            (months_from_now,),
+        )
+        return self.cur.fetchone()[0]
+
+    def test_events_by_time_are_pruned(self):
+        self.cur.execute("SELECT (date_trunc('month', LOCALTIMESTAMP) + INTERVAL '1 month')::text")
+        next_month = self.cur.fetchone()[0]
+        plan = self._plan(
+            "SELECT id FROM monitoring_events WHERE created_at >= %s ORDER BY created_at, id LIMIT 100",
+            (next_month,),
+        )
+        self.assertIn(self._partition_name(1), plan)
+        self.assertNotIn(self._partition_name(0), plan)
+
+    def test_event_partitions_retention(self):
+        self.cur.execute(
+            "INSERT INTO resources (id, url, name, description, key_words, interval, make_screenshot, enabled) "
+            "VALUES ('resource', 'https://example.com', 'example', '', '{}', '* * * * *', FALSE, TRUE)"
+        )
+        self.cur.execute(
+            "INSERT INTO monitoring_events (id, name, snapshot_id, resource_id, created_at, status) "
+            "VALUES ('event', 'image changed', 'resource_1', 'resource', LOCALTIMESTAMP - INTERVAL '14 months', 'created')"
+        )
+        self.cur.execute("SELECT create_monitoring_events_partitions(3)")
+        self.assertEqual([row[0] for row in self.cur.fetchall()], [self._partition_name(-14)])
+        self.cur.execute("SELECT COUNT(*) FROM monitoring_events_default")
+        self.assertEqual(self.cur.fetchone()[0], 0)
+
+        self.cur.execute("SELECT drop_monitoring_events_partitions(12)")
+        self.assertEqual([row[0] for row in self.cur.fetchall()], [self._partition_name(-14)])
+        self.cur.execute("SELECT COUNT(*) FROM monitoring_events")
+        self.assertEqual(self.cur.fetchone()[0], 0)
+        self.cur.execute("SELECT SUM(count) FROM monitoring_event_rollups")
+        self.assertEqual(self.cur.fetchone()[0], 1)
+
+    def test_expendable_snapshots(self):
+        self.cur.execute(
+            "INSERT INTO resources (id, url, name, description, key_words, interval, make_screenshot, enabled) "
+            "VALUES ('resource', 'https://example.com', 'example', '', '{}', '* * * * *', FALSE, TRUE)"
+        )
+        # two checks per hour 10 days ago, the second one has an event; and one recent check
+        self.cur.execute(
+            "INSERT INTO snapshots (id, resource_id, has_screenshot, has_html, created_at) VALUES "
+            "('resource_1', 'resource', TRUE, TRUE, date_trunc('hour', NOW()) - INTERVAL '10 days'), "
+            "('resource_2', 'resource', TRUE, TRUE, date_trunc('hour', NOW()) - INTERVAL '10 days' + INTERVAL '20 minutes'), "
+            "('resource_3', 'resource', TRUE, TRUE, date_trunc('hour', NOW()) - INTERVAL '10 days' + INTERVAL '40 minutes'), "
+            "('resource_4', 'resource', TRUE, TRUE, NOW())"
+        )
+        self.cur.execute(
+            "INSERT INTO monitoring_events (id, name, snapshot_id, resource_id, created_at, status) "
+            "VALUES ('event', 'image changed', 'resource_2', 'resource', LOCALTIMESTAMP, 'created')"
+        )
+        with patch('api.model.snapshot.get_connection') as mock_get_connection:
+            mock_get_connection.return_value.__enter__.return_value = self.conn
+            snapshots = get_expendable_snapshots(cfg.postgres, [SnapshotRetentionTier(after_days=7, interval_hours=1)], 100)
+
+        self.assertEqual([snapshot.id for snapshot in snapshots], ['resource_1', 'resource_3'])
+
+    def test_last_snapshot_number(self):
+        self.cur.execute(
+            "INSERT INTO resources (id, url, name, description, key_words, interval, make_screenshot, enabled) "
+            "VALUES ('resource', 'https://example.com', 'example', '', '{}', '* * * * *', FALSE, TRUE)"
+        )
+        with patch('api.model.snapshot.get_connection') as mock_get_connection:
+            mock_get_connection.return_value.__enter__.return_value = self.conn
+            self.assertIsNone(get_last_snapshot_number(cfg.postgres, 'resource'))
+            # numbers compare as integers, not as strings
+            self.cur.execute(
+                "INSERT INTO snapshots (id, resource_id, has_screenshot, has_html) VALUES "
+                "('resource_9', 'resource', TRUE, TRUE), ('resource_10', 'resource', TRUE, TRUE)"
+            )
+            self.assertEqual(get_last_snapshot_number(cfg.postgres, 'resource'), 10)
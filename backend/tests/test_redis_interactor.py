@@ -0,0 +1,56 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from api.main import app, cfg
+from api.model import redis_interactor
+from api.model.redis_interactor import check_jwt, check_jwts, delete_jwt, save_jwt
+
+class TestRedisInteractor(TestCase):
+    def setUp(self):
+        redis_interactor._clients.clear()
+        patcher = patch('api.model.redis_interactor.redis.Redis')
+        self.mock_redis_class = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(redis_interactor._clients.clear)
+        self.mock_client = self.mock_redis_class.return_value
+
+    def test_client_is_shared_between_calls(self):
+        self.mock_client.get.return_value = b"True"
+
+        save_jwt(cfg.redis, "token", True, 60)
+        check_jwt(cfg.redis, "token")
+        delete_jwt(cfg.redis, "token")
+
+        self.mock_redis_class.assert_called_once()
+
+    def test_save_jwt_sets_expiration_in_one_command(self):
+        save_jwt(cfg.redis, "token", True, 60)
+
+        self.mock_client.set.assert_called_once_with("token", "True", ex=60)
+        self.mock_client.expire.assert_not_called()
+
+    def test_check_jwt(self):
+        self.mock_client.get.return_value = None
+        self.assertFalse(check_jwt(cfg.redis, "token"))
+        self.mock_client.get.return_value = b"True"
+        self.assertTrue(check_jwt(cfg.redis, "token"))
+
+    def test_check_jwts_uses_single_round_trip(self):
+        self.mock_client.mget.return_value = [b"True", None]
+
+        result = check_jwts(cfg.redis, ["valid", "expired"])
+
+        self.assertEqual(result, {"valid": True, "expired": False})
+        self.mock_client.mget.assert_called_once_with(["valid", "expired"])
+        self.mock_client.get.assert_not_called()
+
+    def test_request_tokens_are_checked_in_one_round_trip(self):
+        self.mock_client.mget.return_value = [None, None]
+        client = app.test_client()
+        client.set_cookie('admin_token', 'cookie_token')
+
+        client.get('/admin/', headers={'Authorization': 'bearer: bearer_token'})
+
+        # the bearer token and the admin cookie are both checked by the admin hooks
+        self.mock_client.mget.assert_called_once_with(["bearer_token", "cookie_token"])
+        self.mock_client.get.assert_not_called()
@@ -0,0 +1,129 @@
+import json
+from io import BytesIO
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+from PIL import Image
+
+from api.main import app, cfg
+
+class TestRenditions(TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        self.valid_token = "valid_jwt_token"
+        self.snapshot_id = "resource_1"
+        output = BytesIO()
+        Image.new("RGB", (1280, 2560), (200, 10, 10)).save(output, "PNG")
+        self.image_data = output.getvalue()
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.put_object')
+    @patch('api.main.get_object')
+    def test_rendition_is_generated_and_stored(self, mock_get_object, mock_put_object,
+                                               mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_get_object.side_effect = [None, self.image_data]
+        mock_put_object.return_value = True
+
+        response = self.app.get(
+            f'/events/{self.snapshot_id}/screenshot/rendition?width=320&format=webp',
+            headers={'Authorization': f'bearer: {self.valid_token}'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content_type, 'image/webp')
+        self.assertIn('immutable', response.headers['Cache-Control'])
+        rendition = Image.open(BytesIO(response.data))
+        self.assertEqual(rendition.size, (320, 640))
+        self.assertLess(len(response.data), len(self.image_data))
+        mock_put_object.assert_called_once_with(
+            cfg.s3, "images", f"renditions/{self.snapshot_id}/w320.webp", response.data, "image/webp"
+        )
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.put_object')
+    @patch('api.main.get_object')
+    def test_tall_screenshot_is_cropped_to_encoder_limit(self, mock_get_object, mock_put_object,
+                                                         mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        output = BytesIO()
+        # the default 320px rendition of it would be 24000px tall, over the webp limit
+        Image.new("RGB", (400, 30000), (200, 10, 10)).save(output, "PNG")
+        mock_get_object.side_effect = [None, output.getvalue()]
+        mock_put_object.return_value = True
+
+        response = self.app.get(
+            f'/events/{self.snapshot_id}/screenshot/rendition',
+            headers={'Authorization': f'bearer: {self.valid_token}'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content_type, 'image/webp')
+        self.assertEqual(Image.open(BytesIO(response.data)).size, (320, 16383))
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.put_object')
+    @patch('api.main.get_object')
+    def test_stored_rendition_is_served(self, mock_get_object, mock_put_object, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_get_object.return_value = b'stored rendition'
+
+        response = self.app.get(
+            f'/events/{self.snapshot_id}/screenshot/rendition?width=160&format=jpeg',
+            headers={'Authorization': f'bearer: {self.valid_token}'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, b'stored rendition')
+        mock_get_object.assert_called_once_with(cfg.s3, "images", f"renditions/{self.snapshot_id}/w160.jpeg")
+        mock_put_object.assert_not_called()
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.get_object')
+    def test_missing_screenshot(self, mock_get_object, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_get_object.return_value = None
+
+        response = self.app.get(
+            f'/events/{self.snapshot_id}/screenshot/rendition',
+            headers={'Authorization': f'bearer: {self.valid_token}'}
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    def test_invalid_width(self, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+
+        response = self.app.get(
+            f'/events/{self.snapshot_id}/screenshot/rendition?width=333',
+            headers={'Authorization': f'bearer: {self.valid_token}'}
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.data.decode())['error'], 'width is invalid')
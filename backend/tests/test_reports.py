@@ -1,4 +1,5 @@
 import csv
+import gzip
 import io
 import json
 import uuid
@@ -7,6 +8,7 @@ from unittest import TestCase
 from unittest.mock import patch, MagicMock, call
 
 from api.main import app, cfg
+from api.model.monitoring_event import ReportRow
 
 class TestGetFiltredEvents(TestCase):
     def setUp(self):
@@ -56,6 +58,21 @@ class TestGetFiltredEvents(TestCase):
         self.snapshot_time_1 = "2023-01-01T10:00:00Z"
         self.snapshot_time_2 = "2023-01-02T11:00:00Z"
 
+        self.report_row_1 = ReportRow(
+            snapshot_id=self.snapshot_id_1,
+            resource_id=self.resource_id,
+            snapshot_time=self.snapshot_time_1,
+            image=False,
+            text=True,
+        )
+        self.report_row_2 = ReportRow(
+            snapshot_id=self.snapshot_id_2,
+            resource_id=self.resource_id,
+            snapshot_time=self.snapshot_time_2,
+            image=True,
+            text=False,
+        )
+
     @patch('api.main.jwt.decode')
     @patch('api.main.get_user_by_email')
     @patch('api.main.validate_uuid')
@@ -544,10 +561,10 @@ class TestGetFiltredEvents(TestCase):
     
     @patch('api.main.jwt.decode')
     @patch('api.main.get_user_by_email')
-    @patch('api.main.get_monitoring_event_by_id')
-    @patch('api.main.filter_monitoring_events_for_report')
-    @patch('api.main.get_object_created_at')
-    def test_generate_report_with_event_ids(self, mock_get_object_created_at, 
+    @patch('api.main.get_existing_monitoring_event_ids')
+    @patch('api.main.iter_report_rows')
+    @patch('api.main.get_snapshot_times')
+    def test_generate_report_with_event_ids(self, mock_get_snapshot_times, 
                                         mock_filter_events, mock_get_event, 
                                         mock_get_user, mock_jwt_decode):
         mock_jwt_decode.return_value = {"user": "test@example.com"}
@@ -556,14 +573,14 @@ class TestGetFiltredEvents(TestCase):
         mock_user.deleted_at = None
         mock_get_user.return_value = mock_user
         
-        mock_get_event.side_effect = [self.event_1, self.event_2]
+        mock_get_event.return_value = {"event1", "event2"}
         
-        mock_filter_events.return_value = [self.event_1, self.event_2]
+        mock_filter_events.return_value = iter([self.report_row_1, self.report_row_2])
         
-        mock_get_object_created_at.side_effect = [
-            self.snapshot_time_1,
-            self.snapshot_time_2,
-        ]
+        mock_get_snapshot_times.return_value = {
+            self.snapshot_id_1: self.snapshot_time_1,
+            self.snapshot_id_2: self.snapshot_time_2,
+        }
         
         payload = {
             "event_ids": ["event1", "event2"]
@@ -580,11 +597,8 @@ class TestGetFiltredEvents(TestCase):
         self.assertEqual(response.content_type, 'text/csv; charset=utf-8')
         self.assertEqual(response.headers['Content-Disposition'], 'attachment;filename=data.csv')
         
-        mock_get_event.assert_has_calls([
-            call(cfg.postgres, "event1"),
-            call(cfg.postgres, "event2")
-        ])
-        mock_filter_events.assert_called_once_with(cfg.postgres, None, ["event1", "event2"])
+        mock_get_event.assert_called_once_with(cfg.postgres, ["event1", "event2"])
+        mock_filter_events.assert_called_once_with(cfg.postgres, None, ["event1", "event2"], None, None)
         
         csv_content = response.data.decode('utf-8')
         csv_reader = csv.reader(io.StringIO(csv_content))
@@ -604,10 +618,10 @@ class TestGetFiltredEvents(TestCase):
 
     @patch('api.main.jwt.decode')
     @patch('api.main.get_user_by_email')
-    @patch('api.main.get_object_created_at')
-    @patch('api.main.filter_monitoring_events_for_report')
+    @patch('api.main.get_snapshot_times')
+    @patch('api.main.iter_report_rows')
     def test_generate_report_with_snapshot_ids(self, mock_filter_events, 
-                                          mock_get_object_created_at, 
+                                          mock_get_snapshot_times, 
                                           mock_get_user, mock_jwt_decode):
         mock_jwt_decode.return_value = {"user": "test@example.com"}
         mock_user = MagicMock()
@@ -615,16 +629,12 @@ class TestGetFiltredEvents(TestCase):
         mock_user.deleted_at = None
         mock_get_user.return_value = mock_user
         
-        mock_get_object_created_at.side_effect = [
-            self.snapshot_time_1,
-            None,
-            self.snapshot_time_2,
-            None,
-            self.snapshot_time_1,
-            self.snapshot_time_2,
-        ]
+        mock_get_snapshot_times.return_value = {
+            self.snapshot_id_1: self.snapshot_time_1,
+            self.snapshot_id_2: self.snapshot_time_2,
+        }
         
-        mock_filter_events.return_value = []
+        mock_filter_events.return_value = iter([self.report_row_1, self.report_row_2])
         
         payload = {
             "snapshot_ids": [self.snapshot_id_1, self.snapshot_id_2]
@@ -643,6 +653,8 @@ class TestGetFiltredEvents(TestCase):
         mock_filter_events.assert_called_once_with(
             cfg.postgres, 
             [self.snapshot_id_1, self.snapshot_id_2], 
+            None,
+            None,
             None
         )
         
@@ -655,11 +667,11 @@ class TestGetFiltredEvents(TestCase):
 
     @patch('api.main.jwt.decode')
     @patch('api.main.get_user_by_email')
-    @patch('api.main.get_monitoring_event_by_id')
-    @patch('api.main.get_object_created_at')
-    @patch('api.main.filter_monitoring_events_for_report')
+    @patch('api.main.get_existing_monitoring_event_ids')
+    @patch('api.main.get_snapshot_times')
+    @patch('api.main.iter_report_rows')
     def test_generate_report_with_both_ids(self, mock_filter_events, 
-                                      mock_get_object_created_at, 
+                                      mock_get_snapshot_times, 
                                       mock_get_event, mock_get_user, mock_jwt_decode):
         mock_jwt_decode.return_value = {"user": "test@example.com"}
         mock_user = MagicMock()
@@ -667,18 +679,14 @@ class TestGetFiltredEvents(TestCase):
         mock_user.deleted_at = None
         mock_get_user.return_value = mock_user
         
-        mock_get_event.side_effect = [self.event_1, self.event_2]
+        mock_get_event.return_value = {"event1", "event2"}
         
-        mock_filter_events.return_value = [self.event_1, self.event_2]
+        mock_filter_events.return_value = iter([self.report_row_1, self.report_row_2])
         
-        mock_get_object_created_at.side_effect = [
-            self.snapshot_time_1,
-            None,
-            self.snapshot_time_2,
-            None,
-            self.snapshot_time_1,
-            self.snapshot_time_2,
-        ]
+        mock_get_snapshot_times.return_value = {
+            self.snapshot_id_1: self.snapshot_time_1,
+            self.snapshot_id_2: self.snapshot_time_2,
+        }
         
         payload = {
             "event_ids": ["event1", "event2"],
@@ -694,14 +702,13 @@ class TestGetFiltredEvents(TestCase):
         
         self.assertEqual(response.status_code, 200)
         
-        mock_get_event.assert_has_calls([
-            call(cfg.postgres, "event1"),
-            call(cfg.postgres, "event2")
-        ])
+        mock_get_event.assert_called_once_with(cfg.postgres, ["event1", "event2"])
         mock_filter_events.assert_called_once_with(
             cfg.postgres, 
             [self.snapshot_id_1, self.snapshot_id_2], 
-            ["event1", "event2"]
+            ["event1", "event2"],
+            None,
+            None
         )
         
         csv_content = response.data.decode('utf-8')
@@ -710,6 +717,89 @@ class TestGetFiltredEvents(TestCase):
         
         self.assertEqual(len(rows), 3)
 
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.get_snapshot_times')
+    @patch('api.main.iter_report_rows')
+    def test_generate_report_ndjson_gzip(self, mock_report_rows, mock_get_snapshot_times,
+                                         mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_get_snapshot_times.return_value = {
+            self.snapshot_id_1: self.snapshot_time_1,
+            self.snapshot_id_2: self.snapshot_time_2,
+        }
+        self.report_row_1.snapshot_time = datetime(2023, 1, 1, 10, 0)
+        self.report_row_2.snapshot_time = None
+        mock_report_rows.return_value = iter([self.report_row_1, self.report_row_2])
+
+        with patch('api.main.get_objects_created_at') as mock_get_objects_created_at:
+            mock_get_objects_created_at.return_value = {self.snapshot_id_2 + ".png": datetime(2023, 1, 2, 11, 0)}
+            response = self.app.post(
+                '/report?format=ndjson',
+                data=json.dumps({"snapshot_ids": [self.snapshot_id_1, self.snapshot_id_2]}),
+                content_type='application/json',
+                headers={'Authorization': f'bearer: {self.valid_token}', 'Accept-Encoding': 'gzip'}
+            )
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+            self.assertEqual(response.content_type, 'application/x-ndjson')
+            rows = [json.loads(line) for line in gzip.decompress(response.data).decode().splitlines()]
+            mock_get_objects_created_at.assert_called_once_with(cfg.s3, "images", [self.snapshot_id_2 + ".png"])
+
+        self.assertEqual(rows, [
+            {"resource_id": self.resource_id, "snapshot_id": self.snapshot_id_1,
+             "time": "2023-01-01T10:00:00", "image": False, "text": True},
+            {"resource_id": self.resource_id, "snapshot_id": self.snapshot_id_2,
+             "time": "2023-01-02T11:00:00", "image": True, "text": False},
+        ])
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    def test_generate_report_invalid_format(self, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+
+        response = self.app.post(
+            '/report?format=xml',
+            data=json.dumps({"event_ids": []}),
+            content_type='application/json',
+            headers={'Authorization': f'bearer: {self.valid_token}'}
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.data.decode())["error"], "format is invalid")
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.get_existing_monitoring_event_ids')
+    def test_generate_report_reports_all_missing_events(self, mock_get_events, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_get_events.return_value = {"event2"}
+
+        response = self.app.post(
+            '/report',
+            data=json.dumps({"event_ids": ["event1", "event2", "event3"]}),
+            content_type='application/json',
+            headers={'Authorization': f'bearer: {self.valid_token}'}
+        )
+
+        self.assertEqual(response.status_code, 404)
+        response_data = json.loads(response.data.decode())
+        self.assertEqual(response_data["missing_event_ids"], ["event1", "event3"])
+        mock_get_events.assert_called_once_with(cfg.postgres, ["event1", "event2", "event3"])
+
     @patch('api.main.jwt.decode')
     @patch('api.main.get_user_by_email')
     def test_generate_report_invalid_event_ids_format(self, mock_get_user, mock_jwt_decode):
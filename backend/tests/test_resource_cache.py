@@ -0,0 +1,81 @@
+import datetime
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+from api.main import cfg
+from api.model.cache import get_cache_stats
+from api.model.connection_pool import transaction
+from api.model.resource import get_resource_by_id, update_resource
+
+class TestResourceCache(TestCase):
+    def setUp(self):
+        self.resource_id = "3f0c3c1e-8a55-4a1e-9a39-2f6c64b1d0a7"
+        self.key = f"resource:v1:{self.resource_id}"
+        self.cached = {}
+
+        patches = {
+            'api.model.cache._redis_cfg': cfg.redis,
+            'api.model.cache.get_json': MagicMock(side_effect=lambda redis_cfg, key: self.cached.get(key)),
+            'api.model.cache.set_json': MagicMock(
+                side_effect=lambda redis_cfg, key, value, expire_seconds: self.cached.__setitem__(key, value)
+            ),
+            'api.model.cache.delete_keys': MagicMock(
+                side_effect=lambda redis_cfg, keys: [self.cached.pop(key, None) for key in keys]
+            ),
+            'api.model.resource.get_connection': MagicMock(),
+        }
+        for target, value in patches.items():
+            patcher = patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.mock_get_connection = patches['api.model.resource.get_connection']
+        self.cursor = self.mock_get_connection.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value
+        self.cursor.fetchone.return_value = (
+            "https://example.com", "Example", "", ["fire"], "*/5 * * * *",
+            False, True, None, datetime.datetime(2025, 6, 1, 12, 0),
+        )
+
+    def _stats(self):
+        stats = get_cache_stats().get("resource")
+        return (stats.hits, stats.misses, stats.errors) if stats else (0, 0, 0)
+
+    def test_second_read_is_served_from_cache(self):
+        hits, misses, errors = self._stats()
+
+        first = get_resource_by_id(cfg.postgres, self.resource_id)
+        second = get_resource_by_id(cfg.postgres, self.resource_id)
+
+        self.assertEqual(first, second)
+        self.assertEqual(second.starts_from, datetime.datetime(2025, 6, 1, 12, 0))
+        self.assertEqual(self.cursor.execute.call_count, 1)
+        self.assertEqual(self._stats(), (hits + 1, misses + 1, errors))
+
+    def test_update_invalidates(self):
+        get_resource_by_id(cfg.postgres, self.resource_id)
+        self.assertIn(self.key, self.cached)
+
+        update_resource(cfg.postgres, self.resource_id, "updated", None, None, None, None, None)
+
+        self.assertNotIn(self.key, self.cached)
+
+    def test_transaction_bypasses_cache_and_invalidates_after_commit(self):
+        pool = MagicMock()
+        pool.getconn.return_value = MagicMock(closed=0)
+        with patch('api.model.connection_pool.get_pool', return_value=pool):
+            with transaction(cfg.postgres):
+                get_resource_by_id(cfg.postgres, self.resource_id)
+                self.assertNotIn(self.key, self.cached)
+                update_resource(cfg.postgres, self.resource_id, "updated", None, None, None, None, None)
+                # a reader outside of the transaction refills the cache with the old row
+                self.cached[self.key] = {"stale": True}
+
+        self.assertNotIn(self.key, self.cached)
+
+    def test_redis_failure_falls_back_to_database(self):
+        hits, misses, errors = self._stats()
+
+        with patch('api.model.cache.get_json', side_effect=ConnectionError("redis is down")):
+            resource = get_resource_by_id(cfg.postgres, self.resource_id)
+
+        self.assertEqual(resource.url, "https://example.com")
+        self.assertEqual(self._stats(), (hits, misses, errors + 1))
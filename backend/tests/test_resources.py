@@ -1172,6 +1172,36 @@ class TestResourcesEndpoint(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         mock_update_channels.assert_called_once_with(cfg.postgres, '1', [channel_id])
     
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.get_resource_by_id')
+    @patch('api.main.update_resource')
+    @patch('api.main.update_daemon_cron_job_for_resource')
+    @patch('api.main.validate_uuid')
+    @patch('api.main.transaction')
+    def test_patch_resource_cron_job_failure(self, mock_transaction, mock_validate_uuid, mock_update_cron,
+                                             mock_update_resource, mock_get_resource,
+                                             mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_validate_uuid.return_value = True
+        mock_get_resource.side_effect = [self.resource, self.resource]
+        mock_update_cron.return_value = False
+
+        response = self.app.patch(
+            f'/resources/1',
+            data=json.dumps({"enabled": False}),
+            content_type='application/json',
+            headers={'Authorization': f'bearer: {self.valid_token}'}
+        )
+
+        self.assertEqual(response.status_code, 500)
+        self.assertIn('failed to update daemon cron job', response.data.decode())
+        mock_transaction.return_value.__enter__.return_value.rollback.assert_called_once()
+
     @patch('api.main.jwt.decode')
     @patch('api.main.get_user_by_email')
     @patch('api.main.get_resource_by_id')
@@ -1277,6 +1307,34 @@ class TestResourcesEndpoint(unittest.TestCase):
         mock_update_cron.assert_called_once_with(updated_resource, cfg.server)
         self.assertEqual(response.data.decode(), '{}\n')
 
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.get_resource_by_id')
+    @patch('api.main.update_resource')
+    @patch('api.main.update_daemon_cron_job_for_resource')
+    @patch('api.main.validate_uuid')
+    @patch('api.main.transaction')
+    def test_delete_resource_cron_job_failure(self, mock_transaction, mock_validate_uuid, mock_update_cron,
+                                              mock_update_resource, mock_get_resource,
+                                              mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_validate_uuid.return_value = True
+        mock_get_resource.side_effect = [self.resource, self.resource]
+        mock_update_cron.return_value = False
+
+        response = self.app.delete(
+            f'/resources/1',
+            headers={'Authorization': f'bearer: {self.valid_token}'}
+        )
+
+        self.assertEqual(response.status_code, 500)
+        self.assertIn('failed to update daemon cron job', response.data.decode())
+        mock_transaction.return_value.__enter__.return_value.rollback.assert_called_once()
+
     def test_delete_resource_unauthorized(self):
         response = self.app.delete(f'/resources/1')
         
@@ -0,0 +1,173 @@
+import datetime
+import json
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+from api.main import app, cfg
+from api.model.resource import Resource, ResourceUpdate
+
+class TestResourcesBulk(TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        self.valid_token = "valid_jwt_token"
+        self.headers = {'Authorization': f'bearer: {self.valid_token}'}
+        self.channel_id = "0b3d9f0e-6a43-4c52-8d11-5f2a8c4b7e10"
+        self.resource_id = "3f0c3c1e-8a55-4a1e-9a39-2f6c64b1d0a7"
+        self.resource = Resource(
+            id=self.resource_id,
+            url="https://example.com",
+            name="Example",
+            description="",
+            keywords=["fire"],
+            interval="*/5 * * * *",
+            starts_from=None,
+            make_screenshot=False,
+            enabled=False,
+            polygon=None,
+        )
+
+        for name in ['get_existing_channel_ids', 'get_resources_by_ids', 'create_resources',
+                     'update_resources', 'set_resources_enabled', 'sync_daemon_cron_jobs_for_resources']:
+            patcher = patch(f'api.main.{name}')
+            setattr(self, f'mock_{name}', patcher.start())
+            self.addCleanup(patcher.stop)
+        self.mock_get_existing_channel_ids.return_value = {self.channel_id}
+        self.mock_create_resources.side_effect = lambda cfg, definitions: [
+            Resource(
+                id=f"00000000-0000-4000-8000-00000000000{number}",
+                url=definition.url,
+                name=definition.name,
+                description=definition.description,
+                keywords=definition.keywords,
+                interval=definition.interval,
+                starts_from=definition.starts_from,
+                make_screenshot=definition.make_screenshot,
+                enabled=True,
+                polygon=definition.polygon,
+            )
+            for number, definition in enumerate(definitions)
+        ]
+        self.mock_get_resources_by_ids.side_effect = lambda cfg, resource_ids: {
+            resource_id: self.resource for resource_id in resource_ids if resource_id == self.resource_id
+        }
+        self.mock_sync_daemon_cron_jobs_for_resources.return_value = True
+
+    def _post(self, resources):
+        return self.app.post(
+            '/resources/bulk',
+            data=json.dumps({"resources": resources}),
+            content_type='application/json',
+            headers=self.headers
+        )
+
+    def _definition(self, name, channels=None):
+        return {
+            "action": "create",
+            "url": "https://example.com/" + name,
+            "name": name,
+            "interval": {"minutes": "* / 5", "hours": "*", "days": "*", "months": "*", "day_of_week": "*"},
+            "keywords": ["fire"],
+            "channels": channels if channels is not None else [self.channel_id],
+        }
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    def test_bulk_create_checks_channels_once(self, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        missing_channel = "9a4e1c55-2b7d-4f0e-8c63-1d2e3f4a5b6c"
+
+        response = self._post([
+            self._definition("first"),
+            self._definition("second"),
+            self._definition("broken", [missing_channel]),
+            {"action": "create", "name": "no url"},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        results = json.loads(response.data.decode())['results']
+        self.assertEqual([result['status'] for result in results], [201, 201, 404, 400])
+        self.assertEqual(results[0]['resource']['name'], "first")
+        self.assertEqual(results[0]['resource']['channels'], [self.channel_id])
+        self.assertEqual(results[2]['error'], f"channel {missing_channel} not found")
+        self.assertEqual(results[3]['error'], "url is missing")
+        self.mock_get_existing_channel_ids.assert_called_once()
+        self.assertEqual(
+            sorted(self.mock_get_existing_channel_ids.call_args[0][1]),
+            sorted([self.channel_id, missing_channel])
+        )
+        created = self.mock_create_resources.call_args[0][1]
+        self.assertEqual([definition.name for definition in created], ["first", "second"])
+        scheduled = self.mock_sync_daemon_cron_jobs_for_resources.call_args[0][0]
+        self.assertEqual([resource.name for resource in scheduled], ["first", "second"])
+        self.mock_sync_daemon_cron_jobs_for_resources.assert_called_once()
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    def test_bulk_update_and_disable(self, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        unknown_id = "9a4e1c55-2b7d-4f0e-8c63-1d2e3f4a5b6c"
+
+        response = self._post([
+            {"action": "update", "id": self.resource_id, "description": "updated", "starts_from": 1748736000},
+            {"action": "disable", "id": self.resource_id},
+            {"action": "disable", "id": unknown_id},
+            {"action": "update", "id": self.resource_id, "channels": [self.channel_id]},
+            {"action": "delete", "id": self.resource_id},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        results = json.loads(response.data.decode())['results']
+        self.assertEqual([result['status'] for result in results], [200, 200, 404, 400, 400])
+        self.assertEqual(results[2]['error'], f"resource {unknown_id} not found")
+        self.assertEqual(results[3]['error'], "channels can only be changed with PATCH /resources/<resource_id>")
+        self.assertEqual(results[4]['error'], "action is invalid")
+        self.mock_update_resources.assert_called_once_with(cfg.postgres, [
+            ResourceUpdate(
+                resource_id=self.resource_id,
+                description="updated",
+                starts_from=datetime.datetime.fromtimestamp(1748736000),
+            )
+        ])
+        self.mock_set_resources_enabled.assert_called_once_with(cfg.postgres, [self.resource_id], False)
+        self.mock_sync_daemon_cron_jobs_for_resources.assert_called_once_with([self.resource], cfg.server)
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    def test_bulk_cron_failure(self, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        self.mock_sync_daemon_cron_jobs_for_resources.return_value = False
+
+        response = self._post([self._definition("first")])
+
+        self.assertEqual(response.status_code, 500)
+        response_data = json.loads(response.data.decode())
+        self.assertEqual(response_data, {"error": "failed to update daemon cron jobs"})
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    def test_bulk_invalid_body(self, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+
+        response = self._post([])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.data.decode())['error'], "resources should be non-empty list")
+
+        response = self._post([self._definition("resource")] * 1001)
+        self.assertEqual(response.status_code, 400)
+        self.mock_create_resources.assert_not_called()
@@ -0,0 +1,120 @@
+import json
+import threading
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+from api.main import app
+from api.util import screenshot_jobs
+from api.util.screenshot_jobs import clear_screenshot_jobs
+
+class TestScreenshotJobs(TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        self.valid_token = "valid_jwt_token"
+        self.headers = {'Authorization': f'bearer: {self.valid_token}'}
+        clear_screenshot_jobs()
+        self.addCleanup(clear_screenshot_jobs)
+
+    def _submit(self, url):
+        return self.app.post(
+            '/screenshot/jobs',
+            data=json.dumps({"url": url}),
+            content_type='application/json',
+            headers=self.headers
+        )
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.get_url_image_base_64')
+    def test_job_result_is_polled_and_cached(self, mock_get_url_image, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_get_url_image.return_value = "c2NyZWVuc2hvdA=="
+
+        response = self._submit("https://example.com/jobs")
+
+        self.assertEqual(response.status_code, 202)
+        job = json.loads(response.data.decode())['job']
+        self.assertEqual(response.headers['Location'], f"/screenshot/jobs/{job['id']}")
+
+        response = self.app.get(f"/screenshot/jobs/{job['id']}?wait=5", headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        job = json.loads(response.data.decode())['job']
+        self.assertEqual(job['status'], 'done')
+        self.assertEqual(job['screenshot'], "c2NyZWVuc2hvdA==")
+
+        response = self._submit("https://example.com/jobs")
+
+        self.assertEqual(json.loads(response.data.decode())['job']['status'], 'done')
+        mock_get_url_image.assert_called_once_with("https://example.com/jobs")
+
+        with patch('api.main.get_capture_stats') as mock_get_capture_stats:
+            mock_get_capture_stats.return_value = MagicMock(captures=0, reused=0)
+            response = self.app.get('/metrics', headers=self.headers)
+        queue = json.loads(response.data.decode())['screenshot_queue']
+        self.assertGreaterEqual(queue['completed'], 1)
+        self.assertGreaterEqual(queue['cache_hits'], 1)
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.get_url_image_base_64')
+    def test_failed_job_reports_error(self, mock_get_url_image, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_get_url_image.side_effect = Exception("chrome crashed")
+
+        job_id = json.loads(self._submit("https://example.com/failing").data.decode())['job']['id']
+        response = self.app.get(f"/screenshot/jobs/{job_id}?wait=5", headers=self.headers)
+
+        job = json.loads(response.data.decode())['job']
+        self.assertEqual(job['status'], 'failed')
+        self.assertEqual(job['error'], "chrome crashed")
+        self.assertNotIn('screenshot', job)
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.get_url_image_base_64')
+    def test_full_queue_is_rejected(self, mock_get_url_image, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        release = threading.Event()
+        mock_get_url_image.side_effect = lambda url: release.wait(5) and ""
+        self.addCleanup(release.set)
+
+        with patch.object(screenshot_jobs, 'SCREENSHOT_QUEUE_SIZE', 1):
+            first = self._submit("https://example.com/slow")
+            same = self._submit("https://example.com/slow")
+            other = self._submit("https://example.com/other")
+
+        self.assertEqual(first.status_code, 202)
+        self.assertEqual(
+            json.loads(same.data.decode())['job']['id'],
+            json.loads(first.data.decode())['job']['id']
+        )
+        self.assertEqual(other.status_code, 503)
+        self.assertEqual(json.loads(other.data.decode())['error'], "screenshot queue is full")
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    def test_unknown_job(self, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+
+        response = self.app.get('/screenshot/jobs/2c1b8a43-5a4f-4c2b-9d33-6b0d5e0f6b11', headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+
+        response = self.app.get('/screenshot/jobs/not-a-job', headers=self.headers)
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,166 @@
+import json
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+from api.main import app, cfg
+from api.util.html_parser import extract_text_from_html
+
+class TestSnapshotDiff(TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        self.valid_token = "valid_jwt_token"
+        self.headers = {'Authorization': f'bearer: {self.valid_token}'}
+        self.resource_id = "3f0c3c1e-8a55-4a1e-9a39-2f6c64b1d0a7"
+        self.base = f"{self.resource_id}_3"
+        self.snapshot_id = f"{self.resource_id}_7"
+        page = (
+            "<html><head><title>Городские новости</title><script>var updated = 1;</script></head>"
+            "<body><h1>Городские новости</h1><p>Учебная пожарная тревога прошла в 10:00.</p>"
+            "<p>Происшествий не зарегистрировано.</p><footer>Редакция</footer></body></html>"
+        )
+        # stored texts are extracted like this, one line of words
+        self.texts = {
+            self.base: extract_text_from_html(page),
+            self.snapshot_id: extract_text_from_html(
+                page.replace("Происшествий не зарегистрировано.", "Возгорание на третьем этаже.")
+            ),
+        }
+        self.cached = {}
+
+        patches = {
+            'api.model.cache._redis_cfg': cfg.redis,
+            'api.model.cache.get_json': MagicMock(side_effect=lambda redis_cfg, key: self.cached.get(key)),
+            'api.model.cache.set_json': MagicMock(
+                side_effect=lambda redis_cfg, key, value, expire_seconds: self.cached.__setitem__(key, value)
+            ),
+            'api.main.get_snapshot_text': MagicMock(side_effect=lambda s3_cfg, snapshot_id: self.texts.get(snapshot_id)),
+            'api.main.get_object': MagicMock(return_value=None),
+            'api.main.get_previous_snapshot_id': MagicMock(return_value=self.base),
+        }
+        for target, value in patches.items():
+            patcher = patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.mock_get_snapshot_text = patches['api.main.get_snapshot_text']
+        self.mock_get_previous_snapshot_id = patches['api.main.get_previous_snapshot_id']
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    def test_diff_with_previous_snapshot_is_cached(self, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+
+        response = self.app.get(f'/snapshots/{self.snapshot_id}/diff', headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data.decode())
+        self.assertEqual(data['base'], self.base)
+        self.assertEqual(data['granularity'], "word")
+        self.assertEqual(data['hunks'], [{
+            "old_start": 12, "old_count": 17, "new_start": 12, "new_count": 19,
+            "changes": [
+                ["=", "тревога прошла в 10 00 "],
+                ["-", "Происшествий"], ["+", "Возгорание"], ["=", " "],
+                ["-", "не"], ["+", "на"], ["=", " "],
+                ["-", "зарегистрировано"], ["+", "третьем этаже"],
+                ["=", " Редакция"],
+            ],
+        }])
+        self.mock_get_previous_snapshot_id.assert_called_once_with(cfg.postgres, self.snapshot_id)
+        self.assertEqual(self.mock_get_snapshot_text.call_count, 2)
+
+        cached = self.app.get(f'/snapshots/{self.snapshot_id}/diff', headers=self.headers)
+        self.assertEqual(json.loads(cached.data.decode()), data)
+        self.assertEqual(self.mock_get_snapshot_text.call_count, 2)
+
+        not_modified = self.app.get(
+            f'/snapshots/{self.snapshot_id}/diff',
+            headers={**self.headers, 'If-None-Match': response.headers['ETag']}
+        )
+        self.assertEqual(not_modified.status_code, 304)
+        # the previous snapshot may be thinned out, so the same url can change
+        self.assertEqual(response.headers['Cache-Control'], "private, no-cache")
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    def test_diff_with_explicit_base(self, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+
+        response = self.app.get(
+            f'/snapshots/{self.snapshot_id}/diff?base={self.base}&context=0',
+            headers=self.headers
+        )
+
+        self.assertEqual(response.status_code, 200)
+        hunks = json.loads(response.data.decode())['hunks']
+        self.assertEqual(
+            [change for hunk in hunks for change in hunk['changes']],
+            [["-", "Происшествий"], ["+", "Возгорание"], ["-", "не"], ["+", "на"],
+             ["-", "зарегистрировано"], ["+", "третьем этаже"]]
+        )
+        self.mock_get_previous_snapshot_id.assert_not_called()
+        self.assertIn("immutable", response.headers['Cache-Control'])
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    def test_large_texts(self, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+
+        with patch('api.util.diff.DIFF_MAX_TOKENS', 20):
+            response = self.app.get(f'/snapshots/{self.snapshot_id}/diff', headers=self.headers)
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(json.loads(response.data.decode())['error'], "snapshot texts are too large to diff")
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    def test_missing_snapshots(self, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        missing = f"{self.resource_id}_9"
+
+        response = self.app.get(f'/snapshots/{self.snapshot_id}/diff?base={missing}', headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(json.loads(response.data.decode())['error'], f"snapshot {missing} not found")
+        self.assertEqual(self.cached, {})
+
+        self.mock_get_previous_snapshot_id.return_value = None
+        response = self.app.get(f'/snapshots/{self.snapshot_id}/diff', headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(
+            json.loads(response.data.decode())['error'],
+            f"snapshot {self.snapshot_id} has no previous snapshot"
+        )
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    def test_invalid_params(self, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+
+        for path, error in [
+            ('/snapshots/broken/diff', "snapshot_id is invalid"),
+            (f'/snapshots/{self.snapshot_id}/diff?base=broken', "base is invalid"),
+            (f'/snapshots/{self.snapshot_id}/diff?granularity=char', "granularity is invalid"),
+            (f'/snapshots/{self.snapshot_id}/diff?context=-1', "context is invalid"),
+            (f'/snapshots/{self.snapshot_id}/diff?context=1000', "context is invalid"),
+        ]:
+            response = self.app.get(path, headers=self.headers)
+            self.assertEqual(response.status_code, 400, path)
+            self.assertEqual(json.loads(response.data.decode())['error'], error)
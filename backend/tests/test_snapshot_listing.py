@@ -0,0 +1,94 @@
+import uuid
+from datetime import datetime, timezone
+from unittest import TestCase
+from unittest.mock import patch, call
+
+from api.main import cfg
+from api.model.s3_interactor import get_all_files
+from api.util.utility import get_last_snapshot_id, get_snapshot_times_by_resource_id
+
+class TestSnapshotListing(TestCase):
+    def setUp(self):
+        self.resource_id = str(uuid.uuid4())
+        self.time_1 = datetime(2025, 1, 1, 10, 0, tzinfo=timezone.utc)
+        self.time_2 = datetime(2025, 1, 2, 10, 0, tzinfo=timezone.utc)
+
+    @patch('api.model.s3_interactor.boto3.client')
+    def test_get_all_files_follows_pages(self, mock_client):
+        paginator = mock_client.return_value.get_paginator.return_value
+        paginator.paginate.return_value = [
+            {'Contents': [{'Key': 'a_1.png'}]},
+            {'Contents': [{'Key': 'a_2.png'}]},
+            {},
+        ]
+
+        files = get_all_files(cfg.s3, 'images', 'a_')
+
+        self.assertEqual([file['Key'] for file in files], ['a_1.png', 'a_2.png'])
+        mock_client.return_value.get_paginator.assert_called_once_with('list_objects_v2')
+        paginator.paginate.assert_called_once_with(Bucket='images', Prefix='a_')
+
+    @patch('api.util.utility.get_all_files')
+    @patch('api.util.utility.get_last_snapshot_number')
+    def test_last_snapshot_id_comes_from_table(self, mock_get_last_number, mock_get_all_files):
+        mock_get_last_number.return_value = 12
+
+        self.assertEqual(get_last_snapshot_id(cfg.postgres, cfg.s3, self.resource_id), 12)
+        mock_get_last_number.assert_called_once_with(cfg.postgres, self.resource_id)
+        mock_get_all_files.assert_not_called()
+
+    @patch('api.util.utility.get_all_files')
+    @patch('api.util.utility.get_last_snapshot_number', return_value=None)
+    def test_last_snapshot_id_lists_resource_prefix(self, mock_get_last_number, mock_get_all_files):
+        mock_get_all_files.side_effect = [
+            [{'Key': f'{self.resource_id}_2.png'}, {'Key': f'{self.resource_id}_10.png'}],
+            [{'Key': f'{self.resource_id}_11.html'}],
+        ]
+
+        self.assertEqual(get_last_snapshot_id(cfg.postgres, cfg.s3, self.resource_id), 11)
+        mock_get_all_files.assert_has_calls([
+            call(cfg.s3, 'images', self.resource_id + '_'),
+            call(cfg.s3, 'htmls', self.resource_id + '_'),
+        ])
+
+    @patch('api.util.utility.get_all_files')
+    @patch('api.util.utility.get_last_snapshot_number', return_value=None)
+    def test_last_snapshot_id_listing_failure(self, mock_get_last_number, mock_get_all_files):
+        # numbering from zero would overwrite the stored objects
+        mock_get_all_files.side_effect = [[{'Key': f'{self.resource_id}_2.png'}], None]
+
+        self.assertIsNone(get_last_snapshot_id(cfg.postgres, cfg.s3, self.resource_id))
+
+    @patch('api.util.utility.get_all_files')
+    @patch('api.util.utility.get_resource_snapshot_times')
+    def test_snapshot_times_come_from_table(self, mock_get_times, mock_get_all_files):
+        mock_get_times.return_value = [(self.time_1, 1), (self.time_2, 2)]
+
+        dates = get_snapshot_times_by_resource_id(cfg.postgres, cfg.s3, self.resource_id, 0, 2)
+
+        self.assertEqual(dates, [(self.time_1, 1), (self.time_2, 2)])
+        mock_get_times.assert_called_once_with(cfg.postgres, self.resource_id, 0, 2)
+        mock_get_all_files.assert_not_called()
+
+    @patch('api.util.utility.get_all_files')
+    @patch('api.util.utility.has_resource_snapshots')
+    @patch('api.util.utility.get_resource_snapshot_times')
+    def test_snapshot_times_fall_back_to_prefix_listing(self, mock_get_times, mock_has_snapshots,
+                                                       mock_get_all_files):
+        mock_get_times.return_value = []
+        mock_has_snapshots.return_value = False
+        mock_get_all_files.return_value = [
+            {'Key': f'{self.resource_id}_2.png', 'LastModified': self.time_2},
+            {'Key': f'{self.resource_id}_1.png', 'LastModified': self.time_1},
+        ]
+
+        dates = get_snapshot_times_by_resource_id(cfg.postgres, cfg.s3, self.resource_id, 1, 1)
+
+        self.assertEqual(dates, [(self.time_2, 2)])
+        mock_get_all_files.assert_called_once_with(cfg.s3, 'images', self.resource_id + '_')
+
+    @patch('api.util.utility.get_all_files', return_value=None)
+    @patch('api.util.utility.has_resource_snapshots', return_value=False)
+    @patch('api.util.utility.get_resource_snapshot_times', return_value=[])
+    def test_snapshot_times_listing_failure(self, mock_get_times, mock_has_snapshots, mock_get_all_files):
+        self.assertIsNone(get_snapshot_times_by_resource_id(cfg.postgres, cfg.s3, self.resource_id, None, None))
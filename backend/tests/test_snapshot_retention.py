@@ -0,0 +1,93 @@
+from unittest import TestCase
+from unittest.mock import patch, call
+
+from api.config.config import SnapshotRetentionConfig, SnapshotRetentionTier
+from api.main import cfg
+from api.model.snapshot import ExpendableSnapshot
+from api.util.snapshot_retention import compact_snapshots
+
+class TestSnapshotRetention(TestCase):
+    def setUp(self):
+        self.resource_id = "3f0c3c1e-8a55-4a1e-9a39-2f6c64b1d0a7"
+        self.retention = SnapshotRetentionConfig(tiers=[
+            SnapshotRetentionTier(after_days=7, interval_hours=1),
+            SnapshotRetentionTier(after_days=30, interval_hours=24),
+        ])
+        self.objects = {
+            'images': [
+                {'Key': f'{self.resource_id}_1.png', 'Size': 1000},
+                {'Key': f'{self.resource_id}_2.png', 'Size': 2000},
+                {'Key': f'{self.resource_id}_3.png', 'Size': 3000},
+            ],
+            'renditions': [
+                {'Key': f'renditions/{self.resource_id}_1/w320.webp', 'Size': 10},
+            ],
+            'htmls': [
+                {'Key': f'{self.resource_id}_1.html', 'Size': 100},
+                {'Key': f'{self.resource_id}_2.html', 'Size': 200},
+            ],
+            'texts': [],
+        }
+        for name in ['get_expendable_snapshots', 'delete_snapshots', 'get_all_files', 'delete_objects']:
+            patcher = patch(f'api.util.snapshot_retention.{name}')
+            setattr(self, f'mock_{name}', patcher.start())
+            self.addCleanup(patcher.stop)
+        self.mock_get_expendable_snapshots.side_effect = [
+            [
+                ExpendableSnapshot(id=f'{self.resource_id}_1', resource_id=self.resource_id),
+                ExpendableSnapshot(id=f'{self.resource_id}_2', resource_id=self.resource_id),
+            ],
+            [],
+        ]
+        self.mock_get_all_files.side_effect = lambda s3_cfg, bucket_name, prefix: (
+            self.objects['renditions'] if prefix.startswith('renditions/') else self.objects[bucket_name]
+        )
+        self.mock_delete_objects.side_effect = lambda s3_cfg, bucket_name, object_names: object_names
+        self.mock_delete_snapshots.side_effect = lambda postgre_cfg, snapshot_ids: len(snapshot_ids)
+
+    def test_deletes_objects_of_expendable_snapshots(self):
+        report = compact_snapshots(cfg.postgres, cfg.s3, self.retention)
+
+        self.assertEqual(report.snapshots, 2)
+        self.assertEqual(report.objects, 5)
+        self.assertEqual(report.reclaimed_bytes, 1000 + 2000 + 10 + 100 + 200)
+        self.assertEqual(report.failed_objects, 0)
+        self.mock_get_expendable_snapshots.assert_called_with(cfg.postgres, self.retention.tiers, 1000)
+        # one DeleteObjects batch per bucket, the latest snapshot is untouched
+        self.assertEqual(self.mock_delete_objects.call_args_list, [
+            call(cfg.s3, 'images', [
+                f'{self.resource_id}_1.png',
+                f'{self.resource_id}_2.png',
+                f'renditions/{self.resource_id}_1/w320.webp',
+            ]),
+            call(cfg.s3, 'htmls', [f'{self.resource_id}_1.html', f'{self.resource_id}_2.html']),
+        ])
+        self.mock_delete_snapshots.assert_called_once_with(
+            cfg.postgres, [f'{self.resource_id}_1', f'{self.resource_id}_2']
+        )
+
+    def test_failed_objects_keep_their_snapshot(self):
+        self.mock_delete_objects.side_effect = lambda s3_cfg, bucket_name, object_names: [
+            object_name for object_name in object_names if object_name != f'{self.resource_id}_2.html'
+        ]
+
+        report = compact_snapshots(cfg.postgres, cfg.s3, self.retention)
+
+        self.assertEqual(report.failed_objects, 1)
+        self.assertEqual(report.reclaimed_bytes, 1000 + 2000 + 10 + 100)
+        self.mock_delete_snapshots.assert_called_once_with(cfg.postgres, [f'{self.resource_id}_1'])
+
+    def test_listing_failure_keeps_resource_snapshots(self):
+        self.mock_get_all_files.side_effect = lambda s3_cfg, bucket_name, prefix: None
+        self.mock_get_expendable_snapshots.side_effect = None
+        self.mock_get_expendable_snapshots.return_value = [
+            ExpendableSnapshot(id=f'{self.resource_id}_1', resource_id=self.resource_id),
+        ]
+        self.mock_delete_snapshots.side_effect = None
+        self.mock_delete_snapshots.return_value = 0
+
+        report = compact_snapshots(cfg.postgres, cfg.s3, self.retention)
+
+        self.assertEqual(report.snapshots, 0)
+        self.mock_delete_objects.assert_not_called()
+        self.mock_delete_snapshots.assert_called_once_with(cfg.postgres, [])
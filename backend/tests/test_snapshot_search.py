@@ -0,0 +1,109 @@
+import datetime
+import json
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+from api.main import app, cfg
+from api.model.snapshot import SnapshotMatch
+from api.util.pagination import decode_cursor, encode_cursor
+
+class TestSnapshotSearch(TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        self.valid_token = "valid_jwt_token"
+        self.headers = {'Authorization': f'bearer: {self.valid_token}'}
+        self.resource_id = "3f0c3c1e-8a55-4a1e-9a39-2f6c64b1d0a7"
+        self.matches = [
+            SnapshotMatch(
+                snapshot_id=f"{self.resource_id}_{number}",
+                resource_id=self.resource_id,
+                created_at=datetime.datetime(2025, 6, number, 12, 0, tzinfo=datetime.timezone.utc),
+                snippet="горят <b>леса</b> под Томском",
+            )
+            for number in [3, 2, 1]
+        ]
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.lemmatize')
+    @patch('api.main.search_snapshot_texts')
+    def test_search_returns_page_and_cursor(self, mock_search, mock_lemmatize, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_lemmatize.return_value = "лес"
+        mock_search.return_value = self.matches
+
+        response = self.app.get(
+            f'/snapshots/search?q=лесами&resource_id={self.resource_id}&since=1748736000&limit=2',
+            headers=self.headers
+        )
+
+        self.assertEqual(response.status_code, 200)
+        response_data = json.loads(response.data.decode())
+        self.assertEqual(
+            [snapshot['snapshot_id'] for snapshot in response_data['snapshots']],
+            [f"{self.resource_id}_3", f"{self.resource_id}_2"]
+        )
+        self.assertEqual(response_data['snapshots'][0]['snippet'], "горят <b>леса</b> под Томском")
+        self.assertEqual(
+            decode_cursor(response_data['next_cursor'], 2),
+            [self.matches[1].created_at.isoformat(), self.matches[1].snapshot_id]
+        )
+        mock_lemmatize.assert_called_once_with("лесами")
+        mock_search.assert_called_once_with(
+            cfg.postgres,
+            "лесами",
+            "лес",
+            self.resource_id,
+            datetime.datetime.fromtimestamp(1748736000),
+            None,
+            3,
+            None,
+        )
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.lemmatize')
+    @patch('api.main.search_snapshot_texts')
+    def test_search_continues_from_cursor(self, mock_search, mock_lemmatize, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_lemmatize.return_value = "лес"
+        mock_search.return_value = self.matches[2:]
+        cursor = encode_cursor(self.matches[1].created_at, self.matches[1].snapshot_id)
+
+        response = self.app.get(f'/snapshots/search?q=лес&limit=2&cursor={cursor}', headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        response_data = json.loads(response.data.decode())
+        self.assertEqual([snapshot['snapshot_id'] for snapshot in response_data['snapshots']], [f"{self.resource_id}_1"])
+        self.assertIsNone(response_data['next_cursor'])
+        self.assertEqual(mock_search.call_args[0][7], (self.matches[1].created_at, self.matches[1].snapshot_id))
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.search_snapshot_texts')
+    def test_search_invalid_params(self, mock_search, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+
+        for query, error in [
+            ('', "q is required"),
+            ('?q=%20', "q is required"),
+            ('?q=лес&resource_id=1', "resource_id is invalid"),
+            ('?q=лес&until=yesterday', "until is invalid"),
+            ('?q=лес&offset=10', "offset is not supported, use cursor"),
+        ]:
+            response = self.app.get(f'/snapshots/search{query}', headers=self.headers)
+            self.assertEqual(response.status_code, 400, query)
+            self.assertEqual(json.loads(response.data.decode())['error'], error)
+        mock_search.assert_not_called()
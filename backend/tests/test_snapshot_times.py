@@ -0,0 +1,105 @@
+import json
+import uuid
+from datetime import datetime, timezone
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+from api.main import app, cfg, resolve_snapshot_times
+
+class TestSnapshotTimes(TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        self.valid_token = "valid_jwt_token"
+        self.resource_id = str(uuid.uuid4())
+        self.snapshot_id_1 = self.resource_id + "_1"
+        self.snapshot_id_2 = self.resource_id + "_2"
+        self.snapshot_id_3 = self.resource_id + "_3"
+        self.time_1 = datetime(2025, 1, 1, 10, 0, tzinfo=timezone.utc)
+        self.time_2 = datetime(2025, 1, 2, 10, 0, tzinfo=timezone.utc)
+        self.time_3 = datetime(2025, 1, 3, 10, 0, tzinfo=timezone.utc)
+
+    @patch('api.main.get_objects_created_at')
+    @patch('api.main.get_snapshot_times')
+    def test_missing_rows_fall_back_to_s3_metadata(self, mock_get_snapshot_times, mock_get_objects_created_at):
+        mock_get_snapshot_times.return_value = {self.snapshot_id_1: self.time_1}
+        mock_get_objects_created_at.side_effect = [
+            {self.snapshot_id_2 + ".png": self.time_2},
+            {self.snapshot_id_3 + ".html": self.time_3},
+        ]
+
+        times = resolve_snapshot_times([self.snapshot_id_1, self.snapshot_id_2, self.snapshot_id_3])
+
+        self.assertEqual(times, {
+            self.snapshot_id_1: self.time_1,
+            self.snapshot_id_2: self.time_2,
+            self.snapshot_id_3: self.time_3,
+        })
+        mock_get_snapshot_times.assert_called_once_with(
+            cfg.postgres, [self.snapshot_id_1, self.snapshot_id_2, self.snapshot_id_3]
+        )
+        mock_get_objects_created_at.assert_any_call(
+            cfg.s3, "images", [self.snapshot_id_2 + ".png", self.snapshot_id_3 + ".png"]
+        )
+        mock_get_objects_created_at.assert_any_call(cfg.s3, "htmls", [self.snapshot_id_3 + ".html"])
+
+    @patch('api.main.get_objects_created_at')
+    @patch('api.main.get_snapshot_times')
+    def test_all_rows_in_table_skip_s3(self, mock_get_snapshot_times, mock_get_objects_created_at):
+        mock_get_snapshot_times.return_value = {self.snapshot_id_1: self.time_1}
+
+        self.assertEqual(resolve_snapshot_times([self.snapshot_id_1]), {self.snapshot_id_1: self.time_1})
+        mock_get_objects_created_at.assert_not_called()
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.filter_monitoring_events_for_report')
+    @patch('api.main.get_snapshot_times')
+    def test_events_list_uses_snapshot_table(self, mock_get_snapshot_times, mock_filter_events,
+                                             mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_get_snapshot_times.return_value = {self.snapshot_id_1: self.time_1}
+        mock_filter_events.return_value = []
+
+        response = self.app.post(
+            '/events/list',
+            data=json.dumps({"snapshot_ids": [self.snapshot_id_1]}),
+            content_type='application/json',
+            headers={'Authorization': f'bearer: {self.valid_token}'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        events = json.loads(response.data.decode())['events']
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]['snapshot_id'], self.snapshot_id_1)
+        self.assertIsNotNone(events[0]['snapshot_time'])
+        mock_get_snapshot_times.assert_called_once_with(cfg.postgres, [self.snapshot_id_1])
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.get_objects_created_at')
+    @patch('api.main.get_snapshot_times')
+    def test_events_list_unknown_snapshot(self, mock_get_snapshot_times, mock_get_objects_created_at,
+                                          mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_get_snapshot_times.return_value = {}
+        mock_get_objects_created_at.return_value = {}
+
+        response = self.app.post(
+            '/events/list',
+            data=json.dumps({"snapshot_ids": [self.snapshot_id_1]}),
+            content_type='application/json',
+            headers={'Authorization': f'bearer: {self.valid_token}'}
+        )
+
+        self.assertEqual(response.status_code, 404)
+        response_data = json.loads(response.data.decode())
+        self.assertEqual(response_data['error'], f"snapshots {self.snapshot_id_1} not found")
+        self.assertEqual(response_data['missing_snapshot_ids'], [self.snapshot_id_1])
@@ -47,6 +47,14 @@ class TestGetEvent(TestCase):
         
         self.extracted_text = "Test Heading\nThis is a test paragraph."
 
+        # snapshots below predate stored texts unless a test says otherwise
+        get_snapshot_text_patcher = patch('api.main.get_snapshot_text', return_value=None)
+        self.mock_get_snapshot_text = get_snapshot_text_patcher.start()
+        self.addCleanup(get_snapshot_text_patcher.stop)
+        save_snapshot_text_patcher = patch('api.main.save_snapshot_text')
+        self.mock_save_snapshot_text = save_snapshot_text_patcher.start()
+        self.addCleanup(save_snapshot_text_patcher.stop)
+
     @patch('api.main.jwt.decode')
     @patch('api.main.get_user_by_email')
     @patch('api.main.validate_uuid')
@@ -545,6 +553,103 @@ class TestGetEvent(TestCase):
         
         self.assertEqual(response_data['image'], self.test_image_base64)
 
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.has_object')
+    @patch('api.main.get_object')
+    def test_get_event_snapshot_not_modified(self, mock_get_object, mock_has_object, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_get_object.return_value = self.test_image_data
+        mock_has_object.return_value = True
+
+        response = self.app.get(
+            f'/events/{self.snapshot_id}/screenshot',
+            headers={'Authorization': f'bearer: {self.valid_token}'}
+        )
+        etag = response.headers['ETag']
+        self.assertIn('immutable', response.headers['Cache-Control'])
+        mock_get_object.reset_mock()
+
+        response = self.app.get(
+            f'/events/{self.snapshot_id}/screenshot',
+            headers={'Authorization': f'bearer: {self.valid_token}', 'If-None-Match': etag}
+        )
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        self.assertEqual(response.headers['ETag'], etag)
+        self.assertIn('immutable', response.headers['Cache-Control'])
+        # answered from a HEAD request, the screenshot is not downloaded
+        mock_has_object.assert_called_once_with(cfg.s3, "images", f"{self.snapshot_id}.png")
+        mock_get_object.assert_not_called()
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.has_object')
+    @patch('api.main.get_object')
+    def test_get_event_snapshot_deleted_is_not_modified(self, mock_get_object, mock_has_object,
+                                                       mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_get_object.return_value = None
+        mock_has_object.return_value = False
+
+        response = self.app.get(
+            f'/events/{self.snapshot_id}/screenshot',
+            headers={'Authorization': f'bearer: {self.valid_token}', 'If-None-Match': f'"{self.snapshot_id}-base64"'}
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.get_object')
+    def test_get_event_html_raw_is_sandboxed(self, mock_get_object, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_get_object.return_value = b"<html><script>alert(1)</script></html>"
+
+        response = self.app.get(
+            f'/events/{self.snapshot_id}/html?raw=true',
+            headers={'Authorization': f'bearer: {self.valid_token}'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content_type, 'text/html; charset=utf-8')
+        self.assertEqual(response.headers['Content-Security-Policy'], "sandbox")
+        self.assertEqual(response.headers['X-Content-Type-Options'], "nosniff")
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.get_object')
+    def test_get_event_snapshot_raw_range(self, mock_get_object, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_get_object.return_value = self.test_image_data
+
+        response = self.app.get(
+            f'/events/{self.snapshot_id}/screenshot?raw=true',
+            headers={'Authorization': f'bearer: {self.valid_token}', 'Range': 'bytes=0-3'}
+        )
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content_type, 'image/png')
+        self.assertEqual(response.data, self.test_image_data[:4])
+        self.assertEqual(response.headers['Content-Range'], f'bytes 0-3/{len(self.test_image_data)}')
+
     @patch('api.main.jwt.decode')
     @patch('api.main.get_user_by_email')
     @patch('api.main.get_object')
@@ -732,6 +837,32 @@ class TestGetEvent(TestCase):
         self.assertIn('text', response_data)
         
         self.assertEqual(response_data['text'], self.extracted_text)
+        self.mock_save_snapshot_text.assert_called_once_with(cfg.s3, self.snapshot_id, self.extracted_text)
+
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.get_object')
+    @patch('api.main.extract_text_from_html')
+    def test_get_event_text_stored(self, mock_extract_text, mock_get_object,
+                                   mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        self.mock_get_snapshot_text.return_value = self.extracted_text
+
+        response = self.app.get(
+            f'/events/{self.snapshot_id}/text',
+            headers={'Authorization': f'bearer: {self.valid_token}'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data.decode())['text'], self.extracted_text)
+        self.mock_get_snapshot_text.assert_called_once_with(cfg.s3, self.snapshot_id)
+        mock_get_object.assert_not_called()
+        mock_extract_text.assert_not_called()
+        self.mock_save_snapshot_text.assert_not_called()
 
     @patch('api.main.jwt.decode')
     @patch('api.main.get_user_by_email')
@@ -921,7 +1052,7 @@ class TestGetEvent(TestCase):
         
         mock_validate_uuid.assert_called_once_with(self.resource_id)
         mock_get_resource.assert_called_once_with(cfg.postgres, self.resource_id)
-        mock_get_last_snapshot.assert_called_once_with(cfg.s3, self.resource_id)
+        mock_get_last_snapshot.assert_called_once_with(cfg.postgres, cfg.s3, self.resource_id)
         
         self.assertIn('snapshot_id', response_data)
         
@@ -1169,6 +1300,31 @@ class TestGetEvent(TestCase):
         self.assertIsInstance(response_data['snapshots'], list)
         self.assertEqual(len(response_data['snapshots']), 0)
 
+    @patch('api.main.jwt.decode')
+    @patch('api.main.get_user_by_email')
+    @patch('api.main.validate_uuid')
+    @patch('api.main.get_resource_by_id')
+    @patch('api.main.get_snapshot_times_by_resource_id')
+    def test_get_snapshot_times_listing_failure(self, mock_get_snapshot_times, mock_get_resource,
+                                                mock_validate_uuid, mock_get_user, mock_jwt_decode):
+        mock_jwt_decode.return_value = {"user": "test@example.com"}
+        mock_user = MagicMock()
+        mock_user.email = "test@example.com"
+        mock_user.deleted_at = None
+        mock_get_user.return_value = mock_user
+        mock_validate_uuid.return_value = True
+        mock_get_resource.return_value = self.resource
+        mock_get_snapshot_times.return_value = None
+
+        response = self.app.get(
+            f'/resources/{self.resource_id}/snapshot_times',
+            headers={'Authorization': f'bearer: {self.valid_token}'}
+        )
+
+        self.assertEqual(response.status_code, 500)
+        response_data = json.loads(response.data.decode())
+        self.assertEqual(response_data, {"error": "failed to list snapshots"})
+
     def test_get_snapshot_times_unauthorized(self):
         response = self.app.get(f'/resources/{self.resource_id}/snapshot_times')
         
@@ -0,0 +1,57 @@
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+from api.main import cfg
+from api.model.connection_pool import get_connection, transaction
+
+class TestUnitOfWork(TestCase):
+    def setUp(self):
+        self.pool = MagicMock()
+        self.pool.getconn.side_effect = lambda: MagicMock(closed=0)
+        patcher = patch('api.model.connection_pool.get_pool', return_value=self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_operations_share_one_connection(self):
+        with transaction(cfg.postgres):
+            with get_connection(cfg.postgres) as first:
+                pass
+            with transaction(cfg.postgres):
+                with get_connection(cfg.postgres) as second:
+                    pass
+
+        self.assertIs(first, second)
+        self.pool.getconn.assert_called_once()
+        first.commit.assert_called_once()
+        first.rollback.assert_not_called()
+        self.pool.putconn.assert_called_once_with(first, close=False)
+
+    def test_exception_rolls_back(self):
+        with self.assertRaises(ValueError):
+            with transaction(cfg.postgres):
+                with get_connection(cfg.postgres) as conn:
+                    pass
+                raise ValueError("failed")
+
+        conn.commit.assert_not_called()
+        conn.rollback.assert_called_once()
+        self.pool.putconn.assert_called_once_with(conn, close=False)
+
+    def test_explicit_rollback(self):
+        with transaction(cfg.postgres) as unit_of_work:
+            with get_connection(cfg.postgres) as conn:
+                pass
+            unit_of_work.rollback()
+
+        conn.commit.assert_not_called()
+        conn.rollback.assert_called_once()
+
+    def test_unused_transaction_does_not_check_out(self):
+        with transaction(cfg.postgres):
+            pass
+
+        self.pool.getconn.assert_not_called()
+
+        with get_connection(cfg.postgres) as conn:
+            pass
+        conn.commit.assert_called_once()
@@ -0,0 +1,55 @@
+from contextlib import contextmanager
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+from api.main import cfg
+from api.model import user as user_model
+
+class TestUserCache(TestCase):
+    def setUp(self):
+        user_model.invalidate_user_cache()
+        self.addCleanup(user_model.invalidate_user_cache)
+        self.cursor = MagicMock()
+        self.cursor.fetchone.return_value = ('user-id', 'user', 'hash', None, False)
+        conn = MagicMock()
+        conn.cursor.return_value.__enter__.return_value = self.cursor
+
+        @contextmanager
+        def fake_connection(_cfg):
+            yield conn
+
+        patcher = patch('api.model.user.get_connection', side_effect=fake_connection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_user_is_cached_by_email_and_id(self):
+        first = user_model.get_user_by_email(cfg.postgres, 'user@example.com')
+        second = user_model.get_user_by_email(cfg.postgres, 'user@example.com')
+        by_id = user_model.get_user_by_id(cfg.postgres, 'user-id')
+
+        self.assertEqual(first, second)
+        self.assertEqual(by_id, first)
+        self.assertEqual(self.cursor.execute.call_count, 1)
+
+    def test_invalidate_drops_cached_users(self):
+        user_model.get_user_by_email(cfg.postgres, 'user@example.com')
+        user_model.invalidate_user_cache()
+        user_model.get_user_by_email(cfg.postgres, 'user@example.com')
+
+        self.assertEqual(self.cursor.execute.call_count, 2)
+
+    def test_missing_user_is_not_cached(self):
+        self.cursor.fetchone.return_value = None
+        self.assertIsNone(user_model.get_user_by_email(cfg.postgres, 'user@example.com'))
+        self.assertIsNone(user_model.get_user_by_email(cfg.postgres, 'user@example.com'))
+
+        self.assertEqual(self.cursor.execute.call_count, 2)
+
+    @patch('api.model.user.time.monotonic')
+    def test_cached_user_expires(self, mock_monotonic):
+        mock_monotonic.return_value = 100.0
+        user_model.get_user_by_email(cfg.postgres, 'user@example.com')
+        mock_monotonic.return_value = 100.0 + user_model.USER_CACHE_TTL + 1
+        user_model.get_user_by_email(cfg.postgres, 'user@example.com')
+
+        self.assertEqual(self.cursor.execute.call_count, 2)
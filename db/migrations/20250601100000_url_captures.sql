@@ -0,0 +1,12 @@
+CREATE TABLE IF NOT EXISTS url_captures (
+    id VARCHAR(36) PRIMARY KEY NOT NULL,
+    url VARCHAR(255) NOT NULL,
+    resource_id VARCHAR(36) NOT NULL REFERENCES resources(id),
+    snapshot_id VARCHAR(46) NOT NULL,
+    has_html BOOLEAN NOT NULL,
+    has_screenshot BOOLEAN NOT NULL,
+    captured_at TIMESTAMP NOT NULL,
+    reused INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS url_captures_url_captured_at_idx ON url_captures (url, captured_at);
@@ -0,0 +1,9 @@
+CREATE TABLE IF NOT EXISTS host_breakers (
+    host VARCHAR(255) PRIMARY KEY NOT NULL,
+    state VARCHAR(16) NOT NULL,
+    failures INTEGER NOT NULL DEFAULT 0,
+    opened_count INTEGER NOT NULL DEFAULT 0,
+    opened_until TIMESTAMP,
+    last_error VARCHAR(1024),
+    updated_at TIMESTAMP NOT NULL
+);
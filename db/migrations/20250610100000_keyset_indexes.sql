@@ -0,0 +1,3 @@
+CREATE INDEX IF NOT EXISTS monitoring_events_created_at_id_idx ON monitoring_events (created_at, id);
+
+CREATE INDEX IF NOT EXISTS resources_name_id_idx ON resources (name, id);
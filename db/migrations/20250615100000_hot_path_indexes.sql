@@ -0,0 +1,11 @@
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS monitoring_events_resource_id_created_at_idx ON monitoring_events (resource_id, created_at);
+
+CREATE INDEX IF NOT EXISTS monitoring_events_snapshot_id_idx ON monitoring_events (snapshot_id);
+
+CREATE INDEX IF NOT EXISTS monitoring_events_name_trgm_idx ON monitoring_events USING GIN (name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS channel_resource_resource_id_enabled_idx ON channel_resource (resource_id, enabled);
+
+CREATE INDEX IF NOT EXISTS users_name_idx ON users (name);
@@ -0,0 +1,9 @@
+CREATE TABLE IF NOT EXISTS snapshots (
+    id VARCHAR(46) PRIMARY KEY NOT NULL,
+    resource_id VARCHAR(36) NOT NULL REFERENCES resources(id),
+    has_screenshot BOOLEAN NOT NULL,
+    has_html BOOLEAN NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS snapshots_resource_id_created_at_idx ON snapshots (resource_id, created_at);
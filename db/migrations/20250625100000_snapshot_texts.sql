@@ -0,0 +1,27 @@
+-- content is the normalized page text, lemmas are the pymorphy2 normal forms
+-- of its words; the vector is built by one function so the daemon, the
+-- backfill and the search query agree on the configurations. Inputs are
+-- capped to keep the vector below the 1MB tsvector limit on huge pages.
+CREATE OR REPLACE FUNCTION snapshot_search_vector(content TEXT, lemmas TEXT) RETURNS TSVECTOR AS $$
+    SELECT to_tsvector('russian', left(content, 200000))
+        || to_tsvector('english', left(content, 200000))
+        || to_tsvector('simple', left(lemmas, 200000))
+$$ LANGUAGE SQL IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION snapshot_search_query(query TEXT, lemmas TEXT) RETURNS TSQUERY AS $$
+    SELECT plainto_tsquery('russian', query)
+        || plainto_tsquery('english', query)
+        || plainto_tsquery('simple', lemmas)
+$$ LANGUAGE SQL IMMUTABLE;
+
+CREATE TABLE IF NOT EXISTS snapshot_texts (
+    snapshot_id VARCHAR(46) PRIMARY KEY NOT NULL REFERENCES snapshots(id) ON DELETE CASCADE,
+    resource_id VARCHAR(36) NOT NULL REFERENCES resources(id),
+    created_at TIMESTAMPTZ NOT NULL,
+    content TEXT NOT NULL,
+    search_vector TSVECTOR NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS snapshot_texts_search_vector_idx ON snapshot_texts USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS snapshot_texts_created_at_idx ON snapshot_texts (created_at, snapshot_id);
+CREATE INDEX IF NOT EXISTS snapshot_texts_resource_id_created_at_idx ON snapshot_texts (resource_id, created_at, snapshot_id);
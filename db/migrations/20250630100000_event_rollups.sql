@@ -0,0 +1,63 @@
+-- hourly event counts per resource and event type, kept in step with
+-- monitoring_events by statement triggers so analytics never scan raw events
+CREATE TABLE IF NOT EXISTS monitoring_event_rollups (
+    resource_id VARCHAR(36) NOT NULL REFERENCES resources(id),
+    event_type VARCHAR(16) NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    count BIGINT NOT NULL,
+    PRIMARY KEY (bucket, resource_id, event_type)
+);
+
+CREATE INDEX IF NOT EXISTS monitoring_event_rollups_resource_id_bucket_idx ON monitoring_event_rollups (resource_id, bucket);
+
+CREATE OR REPLACE FUNCTION monitoring_event_type(name TEXT) RETURNS VARCHAR(16) AS $$
+    SELECT CASE WHEN name = 'image changed' THEN 'image' ELSE 'keyword' END
+$$ LANGUAGE SQL IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION monitoring_event_rollups_insert() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO monitoring_event_rollups (resource_id, event_type, bucket, count)
+    SELECT resource_id, monitoring_event_type(name), date_trunc('hour', created_at), COUNT(*)
+    FROM new_events
+    GROUP BY 1, 2, 3
+    ORDER BY 3, 1, 2
+    ON CONFLICT (bucket, resource_id, event_type)
+    DO UPDATE SET count = monitoring_event_rollups.count + EXCLUDED.count;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION monitoring_event_rollups_delete() RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE monitoring_event_rollups r
+    SET count = r.count - d.count
+    FROM (
+        SELECT resource_id, monitoring_event_type(name) AS event_type, date_trunc('hour', created_at) AS bucket, COUNT(*) AS count
+        FROM old_events
+        GROUP BY 1, 2, 3
+    ) d
+    WHERE r.resource_id = d.resource_id AND r.event_type = d.event_type AND r.bucket = d.bucket;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS monitoring_events_rollups_insert ON monitoring_events;
+CREATE TRIGGER monitoring_events_rollups_insert
+    AFTER INSERT ON monitoring_events
+    REFERENCING NEW TABLE AS new_events
+    FOR EACH STATEMENT EXECUTE FUNCTION monitoring_event_rollups_insert();
+
+DROP TRIGGER IF EXISTS monitoring_events_rollups_delete ON monitoring_events;
+CREATE TRIGGER monitoring_events_rollups_delete
+    AFTER DELETE ON monitoring_events
+    REFERENCING OLD TABLE AS old_events
+    FOR EACH STATEMENT EXECUTE FUNCTION monitoring_event_rollups_delete();
+
+-- creating the triggers locked out concurrent inserts until this
+-- transaction commits, so the backfill and the triggers do not overlap
+DELETE FROM monitoring_event_rollups;
+
+INSERT INTO monitoring_event_rollups (resource_id, event_type, bucket, count)
+SELECT resource_id, monitoring_event_type(name), date_trunc('hour', created_at), COUNT(*)
+FROM monitoring_events
+GROUP BY 1, 2, 3;
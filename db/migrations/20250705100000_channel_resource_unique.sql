@@ -0,0 +1,9 @@
+-- relinking a disabled channel used to insert a second row for the pair;
+-- keep one row per pair, enabled if any of the duplicates was
+DELETE FROM channel_resource a
+USING channel_resource b
+WHERE a.channel_id = b.channel_id
+  AND a.resource_id = b.resource_id
+  AND (a.enabled < b.enabled OR (a.enabled = b.enabled AND a.ctid < b.ctid));
+
+ALTER TABLE channel_resource ADD CONSTRAINT channel_resource_channel_id_resource_id_key UNIQUE (channel_id, resource_id);
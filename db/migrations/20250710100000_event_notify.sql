@@ -0,0 +1,24 @@
+-- every inserted event is announced on the monitoring_events channel, the api
+-- fans notifications out to /events/stream subscribers; notifications are
+-- delivered on commit, so listeners never see rolled back events
+CREATE OR REPLACE FUNCTION monitoring_events_notify() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('monitoring_events', json_build_object(
+        'id', id,
+        'resource_id', resource_id,
+        'snapshot_id', snapshot_id,
+        'name', name,
+        'created_at', to_char(created_at, 'YYYY-MM-DD"T"HH24:MI:SS.US'),
+        'status', status
+    )::text)
+    FROM new_events
+    ORDER BY created_at, id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS monitoring_events_notify ON monitoring_events;
+CREATE TRIGGER monitoring_events_notify
+    AFTER INSERT ON monitoring_events
+    REFERENCING NEW TABLE AS new_events
+    FOR EACH STATEMENT EXECUTE FUNCTION monitoring_events_notify();
@@ -0,0 +1,139 @@
+-- monitoring_events is range partitioned by month of created_at: time range
+-- queries only read the matching partitions and retention drops whole
+-- partitions instead of deleting rows. Rows of months without a partition
+-- land in the default partition and are moved out once it is created.
+ALTER TABLE monitoring_events RENAME TO monitoring_events_unpartitioned;
+
+CREATE TABLE monitoring_events (
+    id VARCHAR(36) NOT NULL,
+    name VARCHAR(255) NOT NULL,
+    snapshot_id VARCHAR(46) NOT NULL,
+    resource_id VARCHAR(36) NOT NULL REFERENCES resources(id),
+    created_at TIMESTAMP NOT NULL,
+    status MONITORING_EVENT_STATUS NOT NULL
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE monitoring_events_default PARTITION OF monitoring_events DEFAULT;
+
+-- the triggers are created below, copied rows are already counted in the
+-- rollups and must not be announced to event stream listeners
+INSERT INTO monitoring_events (id, name, snapshot_id, resource_id, created_at, status)
+SELECT id, name, snapshot_id, resource_id, created_at, status FROM monitoring_events_unpartitioned;
+
+DROP TABLE monitoring_events_unpartitioned;
+
+-- unique constraints of a partitioned table have to include the partition key
+ALTER TABLE monitoring_events ADD CONSTRAINT monitoring_events_pkey PRIMARY KEY (id, created_at);
+
+CREATE INDEX IF NOT EXISTS monitoring_events_created_at_id_idx ON monitoring_events (created_at, id);
+
+CREATE INDEX IF NOT EXISTS monitoring_events_resource_id_created_at_idx ON monitoring_events (resource_id, created_at);
+
+CREATE INDEX IF NOT EXISTS monitoring_events_snapshot_id_idx ON monitoring_events (snapshot_id);
+
+CREATE INDEX IF NOT EXISTS monitoring_events_name_trgm_idx ON monitoring_events USING GIN (name gin_trgm_ops);
+
+-- statement triggers on the partitioned table see rows routed to every partition
+CREATE TRIGGER monitoring_events_rollups_insert
+    AFTER INSERT ON monitoring_events
+    REFERENCING NEW TABLE AS new_events
+    FOR EACH STATEMENT EXECUTE FUNCTION monitoring_event_rollups_insert();
+
+CREATE TRIGGER monitoring_events_rollups_delete
+    AFTER DELETE ON monitoring_events
+    REFERENCING OLD TABLE AS old_events
+    FOR EACH STATEMENT EXECUTE FUNCTION monitoring_event_rollups_delete();
+
+CREATE TRIGGER monitoring_events_notify
+    AFTER INSERT ON monitoring_events
+    REFERENCING NEW TABLE AS new_events
+    FOR EACH STATEMENT EXECUTE FUNCTION monitoring_events_notify();
+
+CREATE OR REPLACE FUNCTION monitoring_events_partition_name(month DATE) RETURNS TEXT AS $$
+    SELECT 'monitoring_events_' || to_char(month, '"y"YYYY"m"MM')
+$$ LANGUAGE SQL IMMUTABLE;
+
+-- returns NULL when the partition already exists
+CREATE OR REPLACE FUNCTION create_monitoring_events_partition(month DATE) RETURNS TEXT AS $$
+DECLARE
+    partition_name TEXT := monitoring_events_partition_name(month);
+    range_start TIMESTAMP := date_trunc('month', month);
+    range_end TIMESTAMP := date_trunc('month', month) + INTERVAL '1 month';
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = 'monitoring_events'::regclass AND child.relname = partition_name
+    ) THEN
+        RETURN NULL;
+    END IF;
+    -- a partition can not be attached over rows of the default partition,
+    -- they are moved into the new table first; statements on partitions do
+    -- not fire the triggers of monitoring_events, so rollups stay intact
+    EXECUTE format('CREATE TABLE %I (LIKE monitoring_events INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', partition_name);
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM monitoring_events_default WHERE created_at >= %L AND created_at < %L RETURNING *) '
+        'INSERT INTO %I SELECT * FROM moved',
+        range_start, range_end, partition_name
+    );
+    -- lets ATTACH skip the validation scan of the new partition
+    EXECUTE format(
+        'ALTER TABLE %I ADD CONSTRAINT %I CHECK (created_at >= %L AND created_at < %L)',
+        partition_name, partition_name || '_range', range_start, range_end
+    );
+    EXECUTE format(
+        'ALTER TABLE monitoring_events ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        partition_name, range_start, range_end
+    );
+    EXECUTE format('ALTER TABLE %I DROP CONSTRAINT %I', partition_name, partition_name || '_range');
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- creates partitions up to months_ahead months from now, and for every
+-- older month that has rows in the default partition
+CREATE OR REPLACE FUNCTION create_monitoring_events_partitions(months_ahead INT) RETURNS SETOF TEXT AS $$
+DECLARE
+    month TIMESTAMP;
+    partition_name TEXT;
+BEGIN
+    FOR month IN
+        SELECT date_trunc('month', created_at) FROM monitoring_events_default
+        UNION
+        SELECT generate_series(
+            date_trunc('month', LOCALTIMESTAMP),
+            date_trunc('month', LOCALTIMESTAMP) + make_interval(months => months_ahead),
+            INTERVAL '1 month'
+        )
+        ORDER BY 1
+    LOOP
+        partition_name := create_monitoring_events_partition(month::date);
+        IF partition_name IS NOT NULL THEN
+            RETURN NEXT partition_name;
+        END IF;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- drops partitions of months older than keep_months before the current one;
+-- hourly rollups are kept, so analytics still cover dropped months
+CREATE OR REPLACE FUNCTION drop_monitoring_events_partitions(keep_months INT) RETURNS SETOF TEXT AS $$
+DECLARE
+    expired RECORD;
+BEGIN
+    FOR expired IN
+        SELECT child.oid::regclass AS oid, child.relname AS name
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = 'monitoring_events'::regclass
+          AND child.relname ~ '^monitoring_events_y[0-9]{4}m[0-9]{2}$'
+          AND to_date(substring(child.relname FROM 'y([0-9]{4}m[0-9]{2})$'), 'YYYY"m"MM')
+              < date_trunc('month', LOCALTIMESTAMP) - make_interval(months => keep_months)
+        ORDER BY child.relname
+    LOOP
+        EXECUTE format('DROP TABLE %s', expired.oid);
+        RETURN NEXT expired.name::TEXT;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT create_monitoring_events_partitions(3);